@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+"""Requests per second of a trivial DRF view, building the authentication setup per request vs. the shared provider
+
+Usage: DJANGO_SETTINGS_MODULE=demo.settings PYTHONPATH=src:. python -m benchmarks.drf_authentication
+"""
+
+import logging
+import time
+
+import django
+
+django.setup()
+
+from rest_framework.permissions import AllowAny  # noqa: E402
+from rest_framework.response import Response  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from rest_framework.views import APIView  # noqa: E402
+
+from apigw_manager.drf.authentication import ApiGatewayJWTAuthentication  # noqa: E402
+
+NUMBER = 5000
+
+
+class RebuildingAuthentication(ApiGatewayJWTAuthentication):
+    """The previous behaviour, which builds the provider on every instantiation"""
+
+    def __init__(self):
+        self.provider = self.build_provider()
+
+
+def make_view(authentication_cls):
+    class View(APIView):
+        authentication_classes = [authentication_cls]
+        permission_classes = [AllowAny]
+
+        def get(self, request):
+            return Response({"user": str(request.user)})
+
+    return View.as_view()
+
+
+def report(name, view):
+    # warm up, the shared provider is built at the first request
+    view(APIRequestFactory().get("/"))
+
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        view(APIRequestFactory().get("/"))
+    seconds = time.perf_counter() - start
+
+    print("%-24s %10.0f requests/s" % (name, NUMBER / seconds))
+
+
+if __name__ == "__main__":
+    # the authentication logs an error for every request without jwt
+    logging.disable(logging.CRITICAL)
+
+    report("build per request", make_view(RebuildingAuthentication))
+    report("shared provider", make_view(ApiGatewayJWTAuthentication))
@@ -16,9 +16,15 @@
 # to the current version of the project delivered to anyone in the future.
 
 import abc
+import copy
+import hashlib
 import logging
 import os
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
 
 import jwt
 from django.conf import settings
@@ -35,6 +41,47 @@ class JWTTokenInvalid(Exception):
     pass
 
 
+_MISSING = object()
+
+
+class LocalCache:
+    """A thread-safe in-process LRU cache, every item expires after its own timeout"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: float) -> None:
+        if timeout <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
 # public key provider
 
 
@@ -62,6 +109,10 @@ class SettingsPublicKeyProvider(PublicKeyProvider):
         return public_key
 
 
+# the public keys are shared by the providers of the process, the unknown gateways are cached as None
+_public_key_local_cache = LocalCache(max_size=1024)
+
+
 class CachePublicKeyProvider(SettingsPublicKeyProvider):
     """
     settings.APIGW_JWT_PUBLIC_KEY_CACHE_MINUTES is used to set the public key cache expires,
@@ -70,17 +121,25 @@ class CachePublicKeyProvider(SettingsPublicKeyProvider):
     settings.APIGW_JWT_PUBLIC_KEY_CACHE_NAME is the name of the cache instance.
 
     settings.APIGW_JWT_PUBLIC_KEY_CACHE_VERSION is the current version of cache.
+
+    settings.APIGW_JWT_PUBLIC_KEY_LOCAL_CACHE_SECONDS is used to set the expires of the in-process cache
+    in front of the cache instance, a rotated public key takes effect after it expires,
+    if the value is 0, it does not need to cache in process.
     """
 
     CACHE_MINUTES = 0
     CACHE_NAME = "default"
     CACHE_VERSION = 0
+    LOCAL_CACHE_SECONDS = 10
 
     def __init__(self, default_gateway_name: str):
         super().__init__(default_gateway_name)
 
         self.cache_expires = getattr(settings, "APIGW_JWT_PUBLIC_KEY_CACHE_MINUTES", self.CACHE_MINUTES) * 60
         self.cache_version = getattr(settings, "APIGW_JWT_PUBLIC_KEY_CACHE_VERSION", self.CACHE_VERSION)
+        self.local_cache_expires = getattr(
+            settings, "APIGW_JWT_PUBLIC_KEY_LOCAL_CACHE_SECONDS", self.LOCAL_CACHE_SECONDS
+        )
 
         self.public_key_manager = make_default_public_key_manager()
 
@@ -95,6 +154,16 @@ class CachePublicKeyProvider(SettingsPublicKeyProvider):
     def provide(self, gateway_name: str, jwt_issuer: Optional[str] = None) -> Optional[str]:
         """Get the specified public key from Context model, if not specified, return the default value"""
         cache_key = "apigw:public_key:%s:%s" % (jwt_issuer or "", gateway_name)
+        public_key = _public_key_local_cache.get(cache_key, _MISSING)
+        if public_key is not _MISSING:
+            return public_key
+
+        public_key = self._provide(cache_key, gateway_name, jwt_issuer)
+        # cache the missing public key too, avoid querying the unknown gateway on every request
+        _public_key_local_cache.set(cache_key, public_key, self.local_cache_expires)
+        return public_key
+
+    def _provide(self, cache_key: str, gateway_name: str, jwt_issuer: Optional[str] = None) -> Optional[str]:
         cached_value = self.cache.get(cache_key)
         if cached_value:
             return cached_value
@@ -142,11 +211,49 @@ class JWTProvider(metaclass=abc.ABCMeta):
         """
 
 
+@lru_cache(maxsize=64)
+def load_public_key(public_key: str, algorithm: str) -> Any:
+    """Parse the PEM public key into the key object of the algorithm,
+    the parsed keys are cached by the key content, so a rotated key is parsed again."""
+    try:
+        return jwt.get_algorithm_by_name(algorithm).prepare_key(public_key)
+    except NotImplementedError:
+        # unsupported algorithm, leave it to jwt.decode to report the error
+        return public_key
+
+
+class VerifiedJWT:
+    def __init__(self, gateway_name: str, issuer: str, public_key: str, payload: dict) -> None:
+        self.gateway_name = gateway_name
+        self.issuer = issuer
+        self.public_key = public_key
+        self.payload = payload
+
+
 class DefaultJWTProvider(JWTProvider):
+    """
+    settings.APIGW_JWT_VERIFIED_CACHE_SECONDS is the max seconds to cache a verified token,
+    a token is never cached beyond its `exp`, if the value is 0, every token is verified.
+    The verified tokens are cached by each provider, keyed by the token hash, so a token verified by a provider
+    with other configurations or decoding logic is never trusted.
+    """
+
+    VERIFIED_CACHE_SECONDS = 60
+    VERIFIED_CACHE_SIZE = 1024
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._verified_jwt_cache = LocalCache(max_size=self.VERIFIED_CACHE_SIZE)
+
+        self.verified_cache_seconds = getattr(
+            settings, "APIGW_JWT_VERIFIED_CACHE_SECONDS", self.VERIFIED_CACHE_SECONDS
+        )
+
     def _decode_jwt(self, jwt_payload, public_key, algorithm):
         return jwt.decode(
             jwt_payload,
-            public_key,
+            load_public_key(public_key, algorithm),
             algorithms=[algorithm],
         )
 
@@ -161,6 +268,11 @@ class DefaultJWTProvider(JWTProvider):
         if not jwt_token:
             return None
 
+        cache_key = hashlib.sha256(jwt_token.encode()).hexdigest()
+        decoded_jwt = self._get_verified_jwt(cache_key)
+        if decoded_jwt:
+            return decoded_jwt
+
         try:
             jwt_header = self._decode_jwt_header(jwt_token)
             gateway_name = jwt_header.get("kid") or self.default_gateway_name
@@ -174,6 +286,7 @@ class DefaultJWTProvider(JWTProvider):
             algorithm = jwt_header.get("alg") or self.algorithm
             decoded = self._decode_jwt(jwt_token, public_key, algorithm)
 
+            self._set_verified_jwt(cache_key, gateway_name, iss, public_key, decoded)
             return DecodedJWT(gateway_name=gateway_name, payload=decoded)
 
         except jwt.PyJWTError as e:
@@ -182,6 +295,34 @@ class DefaultJWTProvider(JWTProvider):
 
         return None
 
+    def _get_verified_jwt(self, cache_key: str) -> Optional[DecodedJWT]:
+        if not self.verified_cache_seconds:
+            return None
+
+        verified: Optional[VerifiedJWT] = self._verified_jwt_cache.get(cache_key)
+        if not verified:
+            return None
+
+        # the token must be verified again if the public key has been rotated
+        if self.public_key_provider.provide(verified.gateway_name, verified.issuer) != verified.public_key:
+            return None
+
+        return DecodedJWT(gateway_name=verified.gateway_name, payload=copy.deepcopy(verified.payload))
+
+    def _set_verified_jwt(
+        self, cache_key: str, gateway_name: str, issuer: str, public_key: str, payload: dict
+    ) -> None:
+        if not self.verified_cache_seconds:
+            return
+
+        timeout = self.verified_cache_seconds
+        expires_at = payload.get("exp")
+        if isinstance(expires_at, (int, float)):
+            timeout = min(timeout, expires_at - time.time())
+
+        verified = VerifiedJWT(gateway_name, issuer, public_key, copy.deepcopy(payload))
+        self._verified_jwt_cache.set(cache_key, verified, timeout)
+
 
 class DummyEnvPayloadJWTProvider(JWTProvider):
     def provide(self, request: HttpRequest) -> DecodedJWT:
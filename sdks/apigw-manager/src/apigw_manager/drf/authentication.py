@@ -16,21 +16,37 @@
 # to the current version of the project delivered to anyone in the future.
 
 import logging
+import threading
 from collections import namedtuple
-from typing import ClassVar, Type
+from typing import ClassVar, Dict, Type
 
 from django.conf import settings
 from django.contrib import auth
+from django.test.signals import setting_changed
 from django.utils.module_loading import import_string
 from rest_framework.authentication import BaseAuthentication
 
-from apigw_manager.apigw.providers import CachePublicKeyProvider, PublicKeyProvider
+from apigw_manager.apigw.providers import CachePublicKeyProvider, JWTProvider, PublicKeyProvider
 from apigw_manager.apigw.utils import get_configuration
 
 logger = logging.getLogger(__name__)
 
 App = namedtuple("App", ["bk_app_code", "verified", "tenant_mode", "tenant_id"])
 
+# DRF instantiates the authentication classes on every request,
+# so the providers are built once per authentication class and shared in the process
+_providers: Dict[type, JWTProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def reset_providers(**kwargs):
+    """Discard the built providers, so that the next request picks up the latest settings"""
+    with _providers_lock:
+        _providers.clear()
+
+
+setting_changed.connect(reset_providers)
+
 
 class ApiGatewayJWTAuthentication(BaseAuthentication):
     """the authentication inherit from BaseAuthentication of rest_framework
@@ -46,19 +62,37 @@ class ApiGatewayJWTAuthentication(BaseAuthentication):
     PUBLIC_KEY_PROVIDER_CLS: ClassVar[Type[PublicKeyProvider]] = CachePublicKeyProvider
 
     def __init__(self):
+        self.provider = self.get_provider()
+
+    @classmethod
+    def get_provider(cls) -> JWTProvider:
+        """Return the provider shared by the instances of this class, build it at the first time"""
+        provider = _providers.get(cls)
+        if provider is not None:
+            return provider
+
+        with _providers_lock:
+            provider = _providers.get(cls)
+            if provider is None:
+                provider = _providers[cls] = cls.build_provider()
+
+        return provider
+
+    @classmethod
+    def build_provider(cls) -> JWTProvider:
         configuration = get_configuration()
         jwt_provider_cls = import_string(
             configuration.jwt_provider_cls or "apigw_manager.apigw.providers.DefaultJWTProvider"
         )
-        algorithm = getattr(settings, "APIGW_JWT_ALGORITHM", self.ALGORITHM)
+        algorithm = getattr(settings, "APIGW_JWT_ALGORITHM", cls.ALGORITHM)
         allow_invalid_jwt_token = getattr(settings, "APIGW_ALLOW_INVALID_JWT_TOKEN", False)
 
-        self.provider = jwt_provider_cls(
-            jwt_key_name=self.JWT_KEY_NAME,
+        return jwt_provider_cls(
+            jwt_key_name=cls.JWT_KEY_NAME,
             default_gateway_name=configuration.gateway_name,
             algorithm=algorithm,
             allow_invalid_jwt_token=allow_invalid_jwt_token,
-            public_key_provider=self.PUBLIC_KEY_PROVIDER_CLS(default_gateway_name=configuration.gateway_name),
+            public_key_provider=cls.PUBLIC_KEY_PROVIDER_CLS(default_gateway_name=configuration.gateway_name),
         )
 
     def authenticate(self, request):
@@ -15,6 +15,9 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import time
+
+import jwt
 import pytest
 from django.core.cache import caches
 
@@ -22,7 +25,10 @@ from apigw_manager.apigw.providers import (
     CachePublicKeyProvider,
     DefaultJWTProvider,
     DummyEnvPayloadJWTProvider,
+    JWTTokenInvalid,
+    LocalCache,
     SettingsPublicKeyProvider,
+    load_public_key,
 )
 
 
@@ -108,6 +114,48 @@ class TestCachePublicKeyProvider:
             provider.cache_version,
         )
 
+    def test_provide_from_local_cache(self, fake_gateway_name, django_jwt_cache, public_key_in_db):
+        django_jwt_cache.get.return_value = None
+        provider = CachePublicKeyProvider("testing")
+
+        assert provider.provide(fake_gateway_name) == public_key_in_db
+        assert CachePublicKeyProvider("testing").provide(fake_gateway_name) == public_key_in_db
+
+        django_jwt_cache.get.assert_called_once()
+
+    def test_provide_local_cache_expired(self, mocker, fake_gateway_name, django_jwt_cache, public_key_context):
+        monotonic = mocker.patch("apigw_manager.apigw.providers.time.monotonic", return_value=100)
+        django_jwt_cache.get.return_value = None
+        provider = CachePublicKeyProvider("testing")
+        assert provider.provide(fake_gateway_name) == public_key_context.value
+
+        public_key_context.value = "rotated"
+        public_key_context.save()
+        assert provider.provide(fake_gateway_name) != "rotated"
+
+        monotonic.return_value = 100 + provider.local_cache_expires
+        assert provider.provide(fake_gateway_name) == "rotated"
+
+    def test_provide_unknown_gateway(self, mocker, django_jwt_cache):
+        django_jwt_cache.get.return_value = None
+        provider = CachePublicKeyProvider("testing")
+        get_best_matched = mocker.spy(provider.public_key_manager, "get_best_matched")
+
+        assert provider.provide("unknown") is None
+        assert provider.provide("unknown") is None
+
+        get_best_matched.assert_called_once()
+
+    def test_provide_local_cache_disabled(self, settings, fake_gateway_name, django_jwt_cache, public_key_in_db):
+        settings.APIGW_JWT_PUBLIC_KEY_LOCAL_CACHE_SECONDS = 0
+        django_jwt_cache.get.return_value = None
+        provider = CachePublicKeyProvider("testing")
+
+        provider.provide(fake_gateway_name)
+        provider.provide(fake_gateway_name)
+
+        assert django_jwt_cache.get.call_count == 2
+
 
 class TestDefaultJWTProvider:
     @pytest.fixture()
@@ -145,6 +193,128 @@ class TestDefaultJWTProvider:
         assert decoded.api_name == fake_gateway_name
         assert decoded.payload == jwt_decoded
 
+    def test_provide_verified(self, mocker, provider, public_key, jwt_algorithm, jwt_request, jwt_decoded):
+        decode = mocker.spy(provider, "_decode_jwt")
+
+        assert provider.provide(jwt_request).payload == jwt_decoded
+        # the PEM string is passed to _decode_jwt, the key is parsed inside it
+        decode.assert_called_once_with(jwt_request.META[provider.jwt_key_name], public_key, jwt_algorithm)
+
+        decoded = provider.provide(jwt_request)
+        assert decoded.payload == jwt_decoded
+        assert decode.call_count == 1
+
+        # the cached payload should not be changed by the caller
+        decoded.payload["app"]["app_code"] = "changed"
+        assert provider.provide(jwt_request).payload == jwt_decoded
+
+    def test_provide_verified_by_other_provider(self, provider, public_key_provider, jwt_algorithm, jwt_request):
+        provider.provide(jwt_request)
+
+        class RejectingJWTProvider(DefaultJWTProvider):
+            def _decode_jwt(self, jwt_payload, public_key, algorithm):
+                raise jwt.InvalidTokenError("rejected")
+
+        # the token verified by another provider is not trusted
+        other_provider = RejectingJWTProvider("HTTP_X_BKAPI_JWT", "gateway", jwt_algorithm, False, public_key_provider)
+        with pytest.raises(JWTTokenInvalid):
+            other_provider.provide(jwt_request)
+
+    def test_provide_verified_cache_disabled(self, settings, mocker, public_key_provider, jwt_algorithm, jwt_encoded):
+        settings.APIGW_JWT_VERIFIED_CACHE_SECONDS = 0
+        provider = DefaultJWTProvider("HTTP_X_BKAPI_JWT", "gateway", jwt_algorithm, False, public_key_provider)
+        request = mocker.MagicMock(META={provider.jwt_key_name: jwt_encoded})
+        decode = mocker.spy(provider, "_decode_jwt")
+
+        provider.provide(request)
+        provider.provide(request)
+        assert decode.call_count == 2
+
+    def test_provide_public_key_rotated(self, mocker, public_key_provider, provider, jwt_request):
+        provider.provide(jwt_request)
+
+        public_key_provider.provide.return_value = "rotated"
+        with pytest.raises(JWTTokenInvalid):
+            provider.provide(jwt_request)
+
+    def test_provide_verified_until_exp(
+        self, mocker, provider, raw_request, jwt_header, jwt_decoded, private_key, jwt_algorithm
+    ):
+        cache_set = mocker.patch.object(provider._verified_jwt_cache, "set")
+        raw_request.META = {
+            provider.jwt_key_name: jwt.encode(
+                payload=dict(jwt_decoded, exp=int(time.time()) + 10),
+                key=private_key,
+                algorithm=jwt_algorithm,
+                headers=jwt_header,
+            ),
+        }
+
+        provider.provide(raw_request)
+
+        _, _, timeout = cache_set.call_args.args
+        assert 0 < timeout <= 10
+
+    def test_provide_invalid_not_cached(self, mocker, public_key_provider, provider, jwt_request):
+        public_key_provider.provide.return_value = "invalid"
+        cache_set = mocker.patch.object(provider._verified_jwt_cache, "set")
+
+        with pytest.raises(JWTTokenInvalid):
+            provider.provide(jwt_request)
+
+        cache_set.assert_not_called()
+
+
+class TestLoadPublicKey:
+    def test_cached(self, public_key, jwt_algorithm):
+        load_public_key.cache_clear()
+
+        key = load_public_key(public_key, jwt_algorithm)
+        assert not isinstance(key, str)
+        assert load_public_key(public_key, jwt_algorithm) is key
+        assert load_public_key.cache_info().hits == 1
+
+    def test_unsupported_algorithm(self, public_key):
+        assert load_public_key(public_key, "unknown") == public_key
+
+
+class TestLocalCache:
+    def test_get_set(self):
+        cache = LocalCache(max_size=10)
+        assert cache.get("key") is None
+        assert cache.get("key", "default") == "default"
+
+        cache.set("key", None, 10)
+        assert cache.get("key", "default") is None
+
+    def test_expired(self, mocker):
+        monotonic = mocker.patch("apigw_manager.apigw.providers.time.monotonic", return_value=100)
+        cache = LocalCache(max_size=10)
+        cache.set("key", "value", 10)
+
+        monotonic.return_value = 109
+        assert cache.get("key") == "value"
+
+        monotonic.return_value = 110
+        assert cache.get("key") is None
+
+    def test_not_positive_timeout(self):
+        cache = LocalCache(max_size=10)
+        cache.set("key", "value", 0)
+
+        assert cache.get("key") is None
+
+    def test_max_size(self):
+        cache = LocalCache(max_size=2)
+        cache.set("a", 1, 10)
+        cache.set("b", 2, 10)
+        cache.get("a")
+        cache.set("c", 3, 10)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
 
 class TestDummyEnvPayloadJWTProvider:
     @pytest.mark.parametrize(
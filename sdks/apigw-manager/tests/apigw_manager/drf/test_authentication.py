@@ -20,8 +20,8 @@ from unittest.mock import Mock
 
 import pytest
 
-from apigw_manager.apigw.providers import PublicKeyProvider
-from apigw_manager.drf.authentication import ApiGatewayJWTAuthentication
+from apigw_manager.apigw.providers import PublicKeyProvider, SettingsPublicKeyProvider
+from apigw_manager.drf.authentication import ApiGatewayJWTAuthentication, reset_providers
 
 
 class MockEmptyProvider(PublicKeyProvider):
@@ -86,3 +86,39 @@ class TestApiGatewayJWTAuthentication:
         assert user == "my_user"
 
         assert mock_request.app == authentication.make_app(bk_app_code="mock_app", verified=True)
+
+
+class TestApiGatewayJWTAuthenticationProvider:
+    @pytest.fixture(autouse=True)
+    def _reset_providers(self):
+        reset_providers()
+        yield
+        reset_providers()
+
+    def test_shared(self, mocker):
+        build_provider = mocker.spy(ApiGatewayJWTAuthentication, "build_provider")
+
+        providers = {ApiGatewayJWTAuthentication().provider for _ in range(10)}
+
+        assert len(providers) == 1
+        assert build_provider.call_count == 1
+
+    def test_reset_on_setting_changed(self, settings):
+        provider = ApiGatewayJWTAuthentication().provider
+        assert provider.algorithm == "RS512"
+
+        settings.APIGW_JWT_ALGORITHM = "RS256"
+
+        provider = ApiGatewayJWTAuthentication().provider
+        assert provider.algorithm == "RS256"
+
+    def test_subclass(self):
+        class SettingsAuthentication(ApiGatewayJWTAuthentication):
+            PUBLIC_KEY_PROVIDER_CLS = SettingsPublicKeyProvider
+
+        provider = ApiGatewayJWTAuthentication().provider
+        subclass_provider = SettingsAuthentication().provider
+
+        assert subclass_provider is not provider
+        assert isinstance(subclass_provider.public_key_provider, SettingsPublicKeyProvider)
+        assert SettingsAuthentication().provider is subclass_provider
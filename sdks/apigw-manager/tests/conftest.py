@@ -31,6 +31,13 @@ def _mark_django_db(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def _clear_local_caches():
+    from apigw_manager.apigw.providers import _public_key_local_cache
+
+    _public_key_local_cache.clear()
+
+
 @pytest.fixture()
 def fake_gateway_name(settings, faker):
     gateway_name = faker.pystr()
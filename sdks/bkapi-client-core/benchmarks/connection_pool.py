@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+"""Handshakes per 1000 calls, with and without the shared connection pool
+
+Usage: python -m benchmarks.connection_pool
+"""
+
+import time
+
+from bkapi_client_core import pool
+from bkapi_client_core.base import Operation, OperationGroup
+from bkapi_client_core.client import BaseClient
+from bkapi_client_core.property import bind_property
+
+from .server import LocalServer
+
+CALLS = 1000
+
+
+class Group(OperationGroup):
+    test = bind_property(Operation, name="test", method="GET", path="/test/")
+
+
+class Client(BaseClient):
+    api = bind_property(Group)
+
+
+def run(enable_pool, reuse_client):
+    with LocalServer() as server:
+        client = None
+        started = time.perf_counter()
+        for _ in range(CALLS):
+            if client is None or not reuse_client:
+                client = Client(endpoint=server.endpoint)
+                if enable_pool:
+                    client.enable_connection_pool()
+
+            client.api.test()
+
+        elapsed = time.perf_counter() - started
+        pool.close_shared_adapters()
+
+    print(
+        "pool=%-5s reuse_client=%-5s handshakes/%d calls: %4d, %.3fs"
+        % (enable_pool, reuse_client, CALLS, server.connections, elapsed)
+    )
+
+
+if __name__ == "__main__":
+    for enable_pool in (False, True):
+        for reuse_client in (True, False):
+            run(enable_pool, reuse_client)
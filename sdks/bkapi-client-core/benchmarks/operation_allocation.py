@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+"""Allocations of creating a client and getting one operation, with the shared operation definitions
+
+Usage: python -m benchmarks.operation_allocation
+"""
+
+import gc
+import tracemalloc
+
+from bkapi_client_core.base import Operation, OperationGroup
+from bkapi_client_core.esb import ESBClient
+from bkapi_client_core.property import bind_property
+
+ROUNDS = 1000
+
+
+class LegacyOperation(Operation):
+    """Overriding __init__ disables the definition sharing, every binding creates a full operation"""
+
+    def __init__(self, *args, **kwargs):
+        super(LegacyOperation, self).__init__(*args, **kwargs)
+
+
+def make_client_class(operation_class, operations_count, groups_count=10):
+    groups = {}
+    for group_index in range(groups_count):
+        attrs = {
+            "op_%s" % index: bind_property(
+                operation_class,
+                name="op_%s" % index,
+                method="GET",
+                path="/api/c/compapi{bk_api_ver}/group_%s/op_%s/" % (group_index, index),
+            )
+            for index in range(operations_count // groups_count)
+        }
+        groups["group_%s" % group_index] = bind_property(
+            type("Group%s" % group_index, (OperationGroup,), attrs), name="group_%s" % group_index
+        )
+
+    return type("Client", (ESBClient,), groups)
+
+
+def measure(client_class):
+    def touch():
+        client = client_class(endpoint="http://esb.example.com")
+        return client.group_0.op_0
+
+    touch()  # warm up
+    gc.collect()
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    kept = [touch() for _ in range(ROUNDS)]
+    stats = tracemalloc.take_snapshot().compare_to(snapshot, "filename")
+    tracemalloc.stop()
+
+    del kept
+
+    # the operations and groups are allocated in bkapi_client_core, the session is allocated in requests
+    package_stats = [stat for stat in stats if "/bkapi_client_core/" in stat.traceback[0].filename]
+    return (
+        sum(stat.count_diff for stat in package_stats) / ROUNDS,
+        sum(stat.size_diff for stat in package_stats) / ROUNDS,
+        sum(stat.count_diff for stat in stats) / ROUNDS,
+    )
+
+
+if __name__ == "__main__":
+    for operations_count in (40, 400):
+        for operation_class in (LegacyOperation, Operation):
+            blocks, size, total_blocks = measure(make_client_class(operation_class, operations_count))
+            print(
+                "%-16s operations=%-4d bkapi_client_core blocks/client: %5.1f, bytes: %6.1f, total blocks: %6.1f"
+                % (operation_class.__name__, operations_count, blocks, size, total_blocks)
+            )
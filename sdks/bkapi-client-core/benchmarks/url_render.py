@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+"""Rendering the url of an operation, parsing the template every time vs. the compiled template
+
+Usage: python -m benchmarks.url_render
+"""
+
+import string
+import timeit
+
+from requests.sessions import merge_setting
+
+from bkapi_client_core.apigateway import APIGatewayClient
+from bkapi_client_core.session import _UrlRender
+
+URL = "http://bkapi.example.com/prod/api/c/compapi{bk_api_ver}/cc/{bk_biz_id}/hosts/{host_id}/"
+PATH_PARAMS = {"bk_biz_id": 2, "host_id": 100}
+COMMON_PATH_PARAMS = {"bk_api_ver": "/v2"}
+NUMBER = 100000
+
+
+class _FormatterUrlRender(string.Formatter):
+    """The previous implementation, which parses the template on every rendering"""
+
+    def __init__(self, url, common_path_params=None):
+        self.url = url
+        self.common_path_params = common_path_params
+
+    def render(self, path_params=None):
+        real_path_params = merge_setting(path_params, self.common_path_params)
+        return self.format(self.url, **real_path_params)
+
+    def get_field(self, field_name, args, kwargs):
+        field_name = field_name.strip()
+        return kwargs[field_name], field_name
+
+
+class Client(APIGatewayClient):
+    _gateway_name = "demo"
+
+
+def report(name, seconds):
+    print("%-24s %8.3f us/call" % (name, seconds / NUMBER * 1e6))
+
+
+if __name__ == "__main__":
+    assert _FormatterUrlRender(URL, COMMON_PATH_PARAMS).render(PATH_PARAMS) == _UrlRender(
+        URL, COMMON_PATH_PARAMS
+    ).render(PATH_PARAMS)
+
+    report(
+        "url, string.Formatter",
+        timeit.timeit(lambda: _FormatterUrlRender(URL, COMMON_PATH_PARAMS).render(PATH_PARAMS), number=NUMBER),
+    )
+    report(
+        "url, compiled",
+        timeit.timeit(lambda: _UrlRender(URL, COMMON_PATH_PARAMS).render(PATH_PARAMS), number=NUMBER),
+    )
+
+    client = Client(endpoint="http://{gateway_name}.example.com", stage="prod")
+    endpoint = client._endpoint
+    report(
+        "endpoint, str.format",
+        timeit.timeit(lambda: endpoint.format(gateway_name="demo", api_name="demo", stage_name="prod"), number=NUMBER),
+    )
+    report("endpoint, cached", timeit.timeit(client._get_endpoint, number=NUMBER))
@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+"""Asyncio support for the clients, the HTTP requests are sent by httpx2.
+
+The requests are prepared by `requests` just like the sync clients, so the authorization,
+headers, hooks and the response handling are all shared, only the transport is different.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+import weakref
+from datetime import timedelta
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple  # noqa
+
+from requests import Request, Response
+from requests import exceptions as requests_exceptions
+from requests.hooks import dispatch_hook
+from requests.sessions import merge_setting
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from bkapi_client_core.base import Operation  # noqa
+from bkapi_client_core.client import DEFAULT_BATCH_WORKERS, BaseClient, BatchResult
+from bkapi_client_core.config import HookEvent
+from bkapi_client_core.session import Session, _UrlRender
+
+try:
+    import httpx2
+except ImportError:
+    httpx2 = None
+
+
+class _RejectCookiePolicy(DefaultCookiePolicy):
+    """The async http clients are shared by all clients, so never keep cookies from responses"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+# The pooled connections are bound to the event loop which creates them,
+# so the http clients are cached by event loop, and released with the loop.
+_async_http_clients = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+_async_http_clients_lock = threading.Lock()
+
+
+def get_async_http_client(
+    verify=True,  # type: Any
+    cert=None,  # type: Any
+):
+    """Return the shared async http client of the running event loop"""
+    if httpx2 is None:
+        raise ImportError("httpx2 is required for the async clients, please install bkapi-client-core[async]")
+
+    loop = asyncio.get_running_loop()
+    key = (verify, cert)
+
+    clients = _async_http_clients.get(loop)
+    if clients is None or key not in clients:
+        with _async_http_clients_lock:
+            clients = _async_http_clients.setdefault(loop, {})
+            if key not in clients:
+                clients[key] = httpx2.AsyncClient(
+                    verify=verify,
+                    cert=cert,
+                    cookies=httpx2.Cookies(CookieJar(policy=_RejectCookiePolicy())),
+                )
+
+    return clients[key]
+
+
+def _to_httpx_timeout(timeout):
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx2.Timeout(read, connect=connect)
+
+    return httpx2.Timeout(timeout)
+
+
+def _to_requests_exception(err, request):
+    if isinstance(err, httpx2.ConnectTimeout):
+        exception_class = requests_exceptions.ConnectTimeout
+    elif isinstance(err, httpx2.TimeoutException):
+        exception_class = requests_exceptions.ReadTimeout
+    elif isinstance(err, httpx2.ProxyError):
+        exception_class = requests_exceptions.ProxyError
+    elif isinstance(err, (httpx2.NetworkError, httpx2.RemoteProtocolError)):
+        exception_class = requests_exceptions.ConnectionError
+    elif isinstance(err, httpx2.DecodingError):
+        exception_class = requests_exceptions.ContentDecodingError
+    elif isinstance(err, httpx2.TooManyRedirects):
+        exception_class = requests_exceptions.TooManyRedirects
+    else:
+        exception_class = requests_exceptions.RequestException
+
+    return exception_class(err, request=request)
+
+
+def _build_response(request, httpx_response):
+    response = Response()
+    response.status_code = httpx_response.status_code
+    response.headers = CaseInsensitiveDict(httpx_response.headers.items())
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.reason = httpx_response.reason_phrase
+    response.url = str(httpx_response.url)
+    response.request = request
+    response._content = httpx_response.content
+    return response
+
+
+class AsyncSession(Session):
+    """AsyncSession keeps the same states as Session, but sends requests by the async http client"""
+
+    async def handle(
+        self,
+        url,  # type: str
+        path_params=None,  # type: Optional[Dict[str, Any]]
+        timeout=None,  # type: Optional[float]
+        **kwargs,  # type: Any
+    ):
+        render = _UrlRender(url, self.path_params)
+        rendered_url = render.render(path_params)
+        return await self.async_request(url=rendered_url, timeout=timeout or self.timeout, **kwargs)
+
+    async def async_request(
+        self,
+        method,  # type: str
+        url,  # type: str
+        params=None,  # type: Any
+        data=None,  # type: Any
+        headers=None,  # type: Optional[Dict[str, Any]]
+        cookies=None,  # type: Any
+        files=None,  # type: Any
+        auth=None,  # type: Any
+        timeout=None,  # type: Any
+        allow_redirects=True,  # type: bool
+        proxies=None,  # type: Optional[Dict[str, str]]
+        hooks=None,  # type: Any
+        stream=None,  # type: Any
+        verify=None,  # type: Any
+        cert=None,  # type: Any
+        json=None,  # type: Any
+    ):
+        # type: (...) -> Response
+        """The async version of `requests.Session.request`, proxies are not supported"""
+        if merge_setting(proxies, self.proxies):
+            raise ValueError("proxies are not supported by the async session")
+
+        request = self.prepare_request(
+            Request(
+                method=method.upper(),
+                url=url,
+                headers=headers,
+                files=files,
+                data=data or {},
+                json=json,
+                params=params or {},
+                auth=auth,
+                cookies=cookies,
+                hooks=hooks,
+            )
+        )
+
+        verify = merge_setting(verify, self.verify)
+        cert = merge_setting(cert, self.cert)
+        http_client = get_async_http_client(verify=verify, cert=cert)
+
+        started = time.monotonic()
+        try:
+            httpx_response = await http_client.request(
+                request.method,
+                request.url,
+                headers=dict(request.headers),
+                content=request.body,
+                timeout=_to_httpx_timeout(timeout),
+                follow_redirects=allow_redirects,
+            )
+        except httpx2.HTTPError as err:
+            raise _to_requests_exception(err, request)
+
+        response = _build_response(request, httpx_response)
+        response.elapsed = timedelta(seconds=time.monotonic() - started)
+
+        return dispatch_hook(
+            HookEvent.RESPONSE,
+            request.hooks,
+            response,
+            timeout=timeout,
+            verify=verify,
+            proxies=proxies,
+            stream=stream,
+            cert=cert,
+        )
+
+
+if TYPE_CHECKING:
+    # the mixin relies on the attributes and methods of the client it is mixed into
+    _AsyncClientMixinBase = BaseClient
+else:
+    _AsyncClientMixinBase = object
+
+
+class AsyncClientMixin(_AsyncClientMixinBase):
+    """
+    AsyncClientMixin makes the operations of a client awaitable,
+    the operations declared by `bind_property` are reused, for example:
+
+        class AsyncClient(AsyncClientMixin, Client):
+            pass
+
+        result = await AsyncClient(endpoint="http://example.com").api.test()
+    """
+
+    _session_class = AsyncSession
+
+    def handle_request(
+        self,
+        operation,  # type: Operation
+        context,  # type: Dict[str, Any]
+    ):
+        """Return an awaitable which resolves to the response"""
+        return self._async_handle_request(operation, context)
+
+    def parse_response(
+        self,
+        operation,  # type: Operation
+        response,  # type: Any
+    ):
+        """Return an awaitable which resolves to the parsed result"""
+        return self._async_parse_response(operation, response)
+
+    def batch_call(
+        self,
+        calls,  # type: List[Tuple[Operation, Optional[Dict[str, Any]]]]
+        max_workers=DEFAULT_BATCH_WORKERS,  # type: int
+    ):
+        # type: (...) -> List[BatchResult]
+        """The operations of async clients are awaitable, use `abatch_call` instead"""
+        raise TypeError("batch_call is not supported by async clients, use `await client.abatch_call(...)` instead")
+
+    async def abatch_call(
+        self,
+        calls,  # type: List[Tuple[Operation, Optional[Dict[str, Any]]]]
+        max_workers=DEFAULT_BATCH_WORKERS,  # type: int
+    ):
+        # type: (...) -> List[BatchResult]
+        """
+        Await the operations concurrently, and return the results in the order of calls.
+        The exception of a call does not abort the others, it is set to the error of the result.
+
+        :param calls: (operation, kwargs) pairs, the kwargs are passed to the operation
+        :param max_workers: the max number of concurrent requests
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def call(operation, kwargs):
+            async with semaphore:
+                try:
+                    return BatchResult(result=await operation(**(kwargs or {})))
+                except Exception as err:
+                    return BatchResult(error=err)
+
+        return list(await asyncio.gather(*[call(operation, kwargs) for operation, kwargs in calls]))
+
+    async def _async_handle_request(
+        self,
+        operation,  # type: Operation
+        context,  # type: Dict[str, Any]
+    ):
+        # type: (...) -> Optional[Response]
+        context = self.session.dispatch_hook(HookEvent.OPERATION_PREPARED, context, operation=operation)
+        response_cache = self._get_response_cache(operation, context)
+        try:
+            request_context = self._get_request_context(operation, context)
+            cache_key, response = self._get_cached_response(operation, response_cache, request_context)
+            if response is None:
+                response = await self.session.handle(**request_context)
+                if cache_key:
+                    response_cache.set(cache_key, response)  # type: ignore
+
+            return self._handle_response(operation, context, response)
+        except requests_exceptions.RequestException as err:
+            self.session.dispatch_hook(HookEvent.OPERATION_ERROR, err, operation=operation)
+            return self._handle_exception(operation, context, err)
+
+    async def _async_parse_response(
+        self,
+        operation,  # type: Operation
+        response,  # type: Any
+    ):
+        # type: (...) -> Any
+        if inspect.isawaitable(response):
+            response = await response
+
+        try:
+            return self._handle_response_content(operation, response)
+        except requests_exceptions.RequestException as err:
+            return self._handle_exception(operation, None, err)
+
+
+class AsyncBaseClient(AsyncClientMixin, BaseClient):
+    pass
@@ -15,7 +15,7 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
-from bkapi_client_core.apigateway.client import APIGatewayClient
+from bkapi_client_core.apigateway.client import APIGatewayClient, AsyncAPIGatewayClient
 from bkapi_client_core.base import Operation, OperationGroup
 from bkapi_client_core.property import bind_property
 from bkapi_client_core.utils import generic_type_partial
@@ -26,5 +26,6 @@ __all__ = [
     "OperationGroup",
     "bind_property",
     "APIGatewayClient",
+    "AsyncAPIGatewayClient",
     "generic_type_partial",
 ]
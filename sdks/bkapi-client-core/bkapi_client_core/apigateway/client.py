@@ -15,14 +15,24 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+from functools import lru_cache
 from typing import Optional  # noqa
 
+from bkapi_client_core.aio import AsyncClientMixin
 from bkapi_client_core.client import BaseClient
 from bkapi_client_core.config import SettingKeys, settings
 from bkapi_client_core.session import Session  # noqa
 from bkapi_client_core.utils import urljoin
 
 
+@lru_cache(maxsize=1024)
+def _render_endpoint(endpoint, gateway_name, stage):
+    # type: (str, str, str) -> str
+    """Render the endpoint template, the clients are usually created per request with the same arguments."""
+    # 兼容 endpoint 中包含 gateway_name，api_name
+    return endpoint.format(gateway_name=gateway_name, api_name=gateway_name, stage_name=stage)
+
+
 class APIGatewayClient(BaseClient):
     _default_stage = "prod"
     _gateway_name = ""
@@ -58,10 +68,12 @@ class APIGatewayClient(BaseClient):
 
         # In order to prevent `gateway_name`, `api_name`, `stage_name` from conflicting with other path variables,
         # render the endpoint first.
-        gateway_name = self._get_gateway_name()
-        # 兼容 endpoint 中包含 gateway_name，api_name
-        return self._endpoint.format(gateway_name=gateway_name, api_name=gateway_name, stage_name=self._stage)
+        return _render_endpoint(self._endpoint, self._get_gateway_name(), self._stage)
 
     def _get_gateway_name(self):
         # type: (...) -> str
         return self._gateway_name or self._api_name
+
+
+class AsyncAPIGatewayClient(AsyncClientMixin, APIGatewayClient):
+    """The asyncio version of APIGatewayClient, operations should be awaited"""
@@ -95,6 +95,36 @@ class OperationResource(object):
         self._manager = manager
 
 
+class OperationDefinition(object):
+    """
+    OperationDefinition is the immutable declaration of an Operation,
+    it is shared by the operations bound to different clients.
+    """
+
+    __slots__ = ("name", "method", "path", "bkapi_config", "properties")
+
+    def __init__(
+        self,
+        name="",  # type: str
+        method="",  # type: str
+        path="",  # type: str
+        bkapi_config=None,  # type: Optional[Dict[str, Any]]
+        properties=None,  # type: Optional[Dict[str, Any]]
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.bkapi_config = bkapi_config or {}
+        self.properties = properties or {}
+
+    def replace(self, **changes):
+        # type: (...) -> OperationDefinition
+        """Return a copy of the definition with the given attributes changed"""
+        values = {attr: getattr(self, attr) for attr in self.__slots__}
+        values.update(changes)
+        return OperationDefinition(**values)
+
+
 class Operation(OperationResource):
     """
     Operation is the HTTP method used to manipulate the path,
@@ -110,12 +140,83 @@ class Operation(OperationResource):
         bkapi_config=None,  # type: Optional[Dict[str, Any]]
         **properties,  # type: Dict[str, Any]
     ):
-        self.method = method
-        self.path = path
-        self._bkapi_config = bkapi_config or {}
-        self._properties = properties
+        self._definition = OperationDefinition(name, method, path, bkapi_config, properties)
         super(Operation, self).__init__(name, manager)
 
+    @classmethod
+    def declare(
+        cls,
+        name="",  # type: str
+        manager=None,  # type: Optional[ManagerProtocol]
+        method="",  # type: str
+        path="",  # type: str
+        bkapi_config=None,  # type: Optional[Dict[str, Any]]
+        **properties,  # type: Dict[str, Any]
+    ):
+        # type: (...) -> Optional[OperationDefinition]
+        """
+        Return the definition which can be shared by operations, accept the same arguments as __init__.
+        Return None if the definition can not be shared.
+        """
+        if cls.__init__ is not Operation.__init__:
+            # the subclass may keep its own states in __init__
+            return None
+
+        return OperationDefinition(name, method, path, bkapi_config, properties)
+
+    @classmethod
+    def from_definition(
+        cls,
+        definition,  # type: OperationDefinition
+    ):
+        """Create an operation which shares the definition, only the binding is its own"""
+        operation = cls.__new__(cls)
+        operation._definition = definition
+        OperationResource.__init__(operation, definition.name)
+        return operation
+
+    @property
+    def method(self):
+        # type: () -> str
+        return self._definition.method
+
+    @method.setter
+    def method(self, value):
+        # type: (str) -> None
+        # copy on write, the definition may be shared by other operations
+        self._definition = self._definition.replace(method=value)
+
+    @property
+    def path(self):
+        # type: () -> str
+        return self._definition.path
+
+    @path.setter
+    def path(self, value):
+        # type: (str) -> None
+        # copy on write, the definition may be shared by other operations
+        self._definition = self._definition.replace(path=value)
+
+    @property
+    def _bkapi_config(self):
+        # type: () -> Dict[str, Any]
+        return self._definition.bkapi_config
+
+    @_bkapi_config.setter
+    def _bkapi_config(self, value):
+        # type: (Dict[str, Any]) -> None
+        self._definition = self._definition.replace(bkapi_config=value)
+
+    @property
+    def _properties(self):
+        # type: () -> Dict[str, Any]
+        return self._definition.properties
+
+    @_properties.setter
+    def _properties(self, value):
+        # type: (Dict[str, Any]) -> None
+        self._definition = self._definition.replace(properties=value)
+
     def _get_context(self, **kwargs):
         # type: (...) -> Dict[str, Any]
         context = {
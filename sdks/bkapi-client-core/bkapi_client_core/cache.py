@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple  # noqa
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from bkapi_client_core.session import Session, _UrlRender  # noqa
+
+DEFAULT_CACHE_TTL = 60
+DEFAULT_CACHE_MAX_SIZE = 1000
+
+
+class BaseCacheBackend(object):
+    """BaseCacheBackend is the storage of the cached responses"""
+
+    def get(
+        self,
+        key,  # type: str
+    ):
+        # type: (...) -> Any
+        """Return the cached value, or None if not found or expired"""
+        raise NotImplementedError
+
+    def set(
+        self,
+        key,  # type: str
+        value,  # type: Any
+        ttl,  # type: float
+    ):
+        """Cache the value for ttl seconds"""
+        raise NotImplementedError
+
+
+class LocMemCacheBackend(BaseCacheBackend):
+    """LocMemCacheBackend is a thread-safe in-process LRU cache, which keeps at most max_size items"""
+
+    def __init__(
+        self,
+        max_size=DEFAULT_CACHE_MAX_SIZE,  # type: int
+    ):
+        self.max_size = max_size
+        self._data = OrderedDict()  # type: OrderedDict[str, Tuple[float, Any]]
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoCacheBackend(BaseCacheBackend):
+    """DjangoCacheBackend stores the cached responses in a django cache, such as redis"""
+
+    def __init__(
+        self,
+        cache_name="default",  # type: str
+    ):
+        self.cache_name = cache_name
+
+    @property
+    def _cache(self):
+        from django.core.cache import caches
+
+        return caches[self.cache_name]
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl):
+        self._cache.set(key, value, ttl)
+
+
+class ResponseCache(object):
+    """
+    ResponseCache caches the successful responses of a GET operation,
+    the cache key is derived from the method, rendered url, params, headers and the authorization of the session.
+
+        class Group(OperationGroup):
+            get_user = bind_property(Operation, name="get_user", method="GET", path="/user/",
+                                     response_cache=ResponseCache(ttl=60))
+
+    Pass `use_cache=False` to the operation to bypass the cache for a call.
+    """
+
+    key_prefix = "bkapi:response:"
+    cacheable_methods = ("GET",)
+
+    def __init__(
+        self,
+        ttl=DEFAULT_CACHE_TTL,  # type: float
+        backend=None,  # type: Optional[BaseCacheBackend]
+        max_size=DEFAULT_CACHE_MAX_SIZE,  # type: int
+    ):
+        """
+        :param ttl: seconds to cache the responses
+        :param backend: the storage, the in-process LRU cache is used by default
+        :param max_size: the max number of responses in the default in-process LRU cache
+        """
+        self.ttl = ttl
+        self.backend = backend or LocMemCacheBackend(max_size=max_size)
+
+    def is_cacheable(
+        self,
+        request_context,  # type: Dict[str, Any]
+    ):
+        # type: (...) -> bool
+        return (request_context.get("method") or "").upper() in self.cacheable_methods
+
+    def make_key(
+        self,
+        session,  # type: Session
+        request_context,  # type: Dict[str, Any]
+    ):
+        # type: (...) -> str
+        """Return the cache key of the request, the authorization and headers are hashed into the key"""
+        url = _UrlRender(request_context["url"], session.path_params).render(request_context.get("path_params"))
+        auth = getattr(session.auth, "auth", None)
+        identity = [
+            request_context["method"].upper(),
+            url,
+            request_context.get("params"),
+            request_context.get("headers"),
+            auth,
+            dict(session.params or {}),
+            dict(session.headers),
+        ]
+
+        digest = hashlib.sha256(json.dumps(identity, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        return self.key_prefix + digest
+
+    def get(
+        self,
+        key,  # type: str
+    ):
+        # type: (...) -> Optional[Response]
+        cached = self.backend.get(key)
+        if cached is None:
+            return None
+
+        return self._load_response(cached)
+
+    def set(
+        self,
+        key,  # type: str
+        response,  # type: Response
+    ):
+        if not response.ok or response.headers.get("X-Bkapi-Error-Code"):
+            return
+
+        self.backend.set(key, self._dump_response(response), self.ttl)
+
+    def _dump_response(self, response):
+        # the response itself is not picklable (the hooks of the request), keep the necessary fields only
+        return {
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "content": response.content,
+            "encoding": response.encoding,
+            "url": response.url,
+            "reason": response.reason,
+        }
+
+    def _load_response(self, cached):
+        response = Response()
+        response.status_code = cached["status_code"]
+        response.headers = CaseInsensitiveDict(cached["headers"])
+        response._content = cached["content"]
+        response.encoding = cached["encoding"]
+        response.url = cached["url"]
+        response.reason = cached["reason"]
+        return response
@@ -17,15 +17,20 @@
 
 import json
 import logging
-from typing import Any, Dict, Optional  # noqa
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple  # noqa
 
 from requests import Response  # noqa
 from requests.exceptions import HTTPError, RequestException
 from requests.sessions import merge_setting
 from requests.structures import CaseInsensitiveDict
+from six.moves.urllib.parse import urlparse
 
+from bkapi_client_core import pool
 from bkapi_client_core.auth import BKApiAuthorization
 from bkapi_client_core.base import Operation  # noqa
+from bkapi_client_core.cache import ResponseCache
 from bkapi_client_core.config import HookEvent
 from bkapi_client_core.exceptions import (
     APIGatewayResponseError,
@@ -39,6 +44,8 @@ from bkapi_client_core.utils import CurlRequest, urljoin
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_WORKERS = 10
+
 
 class RequestContextBuilder(object):
     def build(
@@ -131,8 +138,36 @@ class ResponseHeadersRepresenter(object):
         return ", ".join(parts)
 
 
+class BatchResult(object):
+    """The result of an operation called in batch, either the `result` or the `error` is set"""
+
+    def __init__(
+        self,
+        result=None,  # type: Any
+        error=None,  # type: Optional[Exception]
+    ):
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self):
+        # type: (...) -> bool
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return "<BatchResult result=%r>" % (self.result,)
+
+        return "<BatchResult error=%r>" % (self.error,)
+
+
+# The client whose batch is being called by the current worker thread
+_batch_local = threading.local()
+
+
 class BaseClient(object):
     _build_class = RequestContextBuilder
+    _session_class = Session
     _reuse_session_connection = False
     name = "client"
 
@@ -143,7 +178,7 @@ class BaseClient(object):
         name=None,  # type: Optional[str]
     ):
         self._endpoint = endpoint
-        self.session = session or Session()
+        self.session = session or self._session_class()
         self._context_builder = self._build_class()
 
         if name:
@@ -178,17 +213,46 @@ class BaseClient(object):
 
         # you can inject extra context from hooks
         context = self.session.dispatch_hook(HookEvent.OPERATION_PREPARED, context, operation=operation)
+        response_cache = self._get_response_cache(operation, context)
         try:
-            response = self.session.handle(**self._get_request_context(operation, context))
+            request_context = self._get_request_context(operation, context)
+            cache_key, response = self._get_cached_response(operation, response_cache, request_context)
+            if response is None:
+                response = self.session.handle(**request_context)
+                if cache_key:
+                    response_cache.set(cache_key, response)  # type: ignore
+
             return self._handle_response(operation, context, response)
         except RequestException as err:
             self.session.dispatch_hook(HookEvent.OPERATION_ERROR, err, operation=operation)
             return self._handle_exception(operation, context, err)
         finally:
-            if not self._reuse_session_connection:
+            if not self._reuse_session_connection and getattr(_batch_local, "client", None) is not self:
                 # close the pooled connections to avoid connection leaks
                 self.close()
 
+    def batch_call(
+        self,
+        calls,  # type: List[Tuple[Operation, Optional[Dict[str, Any]]]]
+        max_workers=DEFAULT_BATCH_WORKERS,  # type: int
+    ):
+        # type: (...) -> List[BatchResult]
+        """
+        Call the operations concurrently, and return the results in the order of calls.
+        The exception of a call does not abort the others, it is set to the error of the result.
+
+        :param calls: (operation, kwargs) pairs, the kwargs are passed to the operation
+        :param max_workers: the max number of concurrent requests,
+            it should not be greater than the pool size of the session adapter, which is 10 by default
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self._call_in_batch, operation, kwargs) for operation, kwargs in calls]
+                return [self._get_batch_result(future) for future in futures]
+        finally:
+            if not self._reuse_session_connection:
+                self.close()
+
     def parse_response(
         self,
         operation,  # type: Operation
@@ -262,10 +326,80 @@ class BaseClient(object):
         """
         self.session.verify = False
 
+    def enable_connection_pool(self, **options):
+        """
+        Share the pooled connections with other clients of the same endpoint,
+        the connections are kept alive across requests, even if the client is not used as a context manager.
+
+        :param options: options of the shared pool, such as pool_maxsize, idle_timeout,
+            see `bkapi_client_core.pool.get_shared_adapter`
+        """
+        adapter = pool.get_shared_adapter(self._get_connection_pool_key(), **options)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _get_connection_pool_key(self):
+        # type: (...) -> str
+        parsed_url = urlparse(self._get_endpoint())
+        return "%s://%s" % (parsed_url.scheme, parsed_url.netloc)
+
     def _get_endpoint(self):
         # type: (...) -> str
         return self._endpoint
 
+    def _get_response_cache(
+        self,
+        operation,  # type: Operation
+        context,  # type: Dict[str, Any]
+    ):
+        # type: (...) -> Optional[ResponseCache]
+        """Return the response cache of the operation, `use_cache=False` bypasses it for this call"""
+        use_cache = context.pop("use_cache", True)
+        response_cache = getattr(operation, "_properties", {}).get("response_cache")
+        if not use_cache or not isinstance(response_cache, ResponseCache):
+            return None
+
+        if not response_cache.is_cacheable(context):
+            return None
+
+        return response_cache
+
+    def _get_cached_response(
+        self,
+        operation,  # type: Operation
+        response_cache,  # type: Optional[ResponseCache]
+        request_context,  # type: Dict[str, Any]
+    ):
+        # type: (...) -> Tuple[Optional[str], Optional[Response]]
+        if response_cache is None:
+            return None, None
+
+        cache_key = response_cache.make_key(self.session, request_context)
+        response = response_cache.get(cache_key)
+        self.session.dispatch_hook(HookEvent.OPERATION_CACHE, response is not None, operation=operation)
+
+        return cache_key, response
+
+    def _call_in_batch(
+        self,
+        operation,  # type: Operation
+        kwargs,  # type: Optional[Dict[str, Any]]
+    ):
+        # the pooled connections are shared by the workers, keep them until all calls finished,
+        # mark it in the worker thread rather than the client, which may be used by other threads meanwhile
+        _batch_local.client = self
+        try:
+            return operation(**(kwargs or {}))
+        finally:
+            _batch_local.client = None
+
+    def _get_batch_result(self, future):
+        # type: (...) -> BatchResult
+        try:
+            return BatchResult(result=future.result())
+        except Exception as err:
+            return BatchResult(error=err)
+
     def _get_request_context(
         self,
         operation,  # type: Operation
@@ -29,6 +29,8 @@ class HookEvent:
     OPERATION_PREPARED = "operation-prepared"
     # 请求异常
     OPERATION_ERROR = "operation-error"
+    # 查询响应缓存
+    OPERATION_CACHE = "operation-cache"
     # 请求
     REQUEST = "request"
     # 响应
@@ -44,6 +46,7 @@ class SettingKeys:
     # apigateway
     DEFAULT_STAGE_MAPPINGS = "BK_API_DEFAULT_STAGE_MAPPINGS"
     BK_API_CLIENT_ENABLE_SSL_VERIFY = "BK_API_CLIENT_ENABLE_SSL_VERIFY"
+    BK_API_CLIENT_CONNECTION_POOL = "BK_API_CLIENT_CONNECTION_POOL"
     BK_API_AUTHORIZATION_COOKIES_MAPPING = "BK_API_AUTHORIZATION_COOKIES_MAPPING"
     BK_API_URL_TMPL = "BK_API_URL_TMPL"
 
@@ -52,6 +52,11 @@ def _get_client_by_settings(
     if accept_language:
         client.session.set_accept_language(accept_language)
 
+    # share the keep-alive connections with other clients
+    connection_pool = settings.get(SettingKeys.BK_API_CLIENT_CONNECTION_POOL)
+    if connection_pool:
+        client.enable_connection_pool(**(connection_pool if isinstance(connection_pool, dict) else {}))
+
     return client
 
 
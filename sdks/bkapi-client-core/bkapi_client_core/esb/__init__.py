@@ -16,7 +16,7 @@
 # to the current version of the project delivered to anyone in the future.
 
 from bkapi_client_core.base import Operation, OperationGroup
-from bkapi_client_core.esb.client import ESBClient
+from bkapi_client_core.esb.client import AsyncESBClient, ESBClient
 from bkapi_client_core.property import bind_property
 from bkapi_client_core.utils import generic_type_partial
 
@@ -26,5 +26,6 @@ __all__ = [
     "OperationGroup",
     "bind_property",
     "ESBClient",
+    "AsyncESBClient",
     "generic_type_partial",
 ]
@@ -17,6 +17,7 @@
 
 from typing import Optional  # noqa
 
+from bkapi_client_core.aio import AsyncClientMixin
 from bkapi_client_core.client import BaseClient
 from bkapi_client_core.session import Session  # noqa
 
@@ -83,3 +84,7 @@ class ESBClient(BaseClient):
     ):
         if key in self.session.headers:
             del self.session.headers[key]
+
+
+class AsyncESBClient(AsyncClientMixin, ESBClient):
+    """The asyncio version of ESBClient, operations should be awaited"""
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple  # noqa
+
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """PooledHTTPAdapter is a HTTPAdapter shared by many sessions.
+
+    The pooled connections live with the process, `close` will not release them,
+    so a session can be closed after every request without losing the keep-alive connections.
+    Connections idle for longer than `idle_timeout` are dropped before the next request.
+    """
+
+    def __init__(
+        self,
+        idle_timeout=DEFAULT_IDLE_TIMEOUT,  # type: Optional[float]
+        **kwargs,  # type: Any
+    ):
+        self.idle_timeout = idle_timeout
+        self._last_used = time.monotonic()
+        self._idle_lock = threading.Lock()
+        super(PooledHTTPAdapter, self).__init__(**kwargs)
+
+    def send(self, request, *args, **kwargs):
+        self._clear_idle_connections()
+        try:
+            return super(PooledHTTPAdapter, self).send(request, *args, **kwargs)
+        finally:
+            self._last_used = time.monotonic()
+
+    def close(self):
+        """Keep the pooled connections, they are shared by other sessions"""
+
+    def shutdown(self):
+        """Release all the pooled connections"""
+        super(PooledHTTPAdapter, self).close()
+
+    def _clear_idle_connections(self):
+        if not self.idle_timeout:
+            return
+
+        with self._idle_lock:
+            now = time.monotonic()
+            if now - self._last_used > self.idle_timeout:
+                # the server or load balancer may have closed these connections already
+                self.poolmanager.clear()
+
+            self._last_used = now
+
+
+_SHARED_ADAPTERS = {}  # type: Dict[Tuple[Any, ...], PooledHTTPAdapter]
+_SHARED_ADAPTERS_LOCK = threading.Lock()
+
+
+def get_shared_adapter(
+    key,  # type: str
+    pool_connections=DEFAULT_POOLSIZE,  # type: int
+    pool_maxsize=DEFAULT_POOLSIZE,  # type: int
+    idle_timeout=DEFAULT_IDLE_TIMEOUT,  # type: Optional[float]
+    pool_block=DEFAULT_POOLBLOCK,  # type: bool
+):
+    # type: (...) -> PooledHTTPAdapter
+    """
+    Return the process-wide adapter for the given key, create it if not exists.
+
+    :param key: the key to share the adapter, such as the netloc of the endpoint
+    :param pool_connections: the number of host pools to cache
+    :param pool_maxsize: the maximum number of connections to save in each host pool
+    :param idle_timeout: seconds before the idle connections are dropped, None means never
+    :param pool_block: whether the pool should block for connections when it is full
+    """
+    adapter_key = (key, pool_connections, pool_maxsize, idle_timeout, pool_block)
+
+    with _SHARED_ADAPTERS_LOCK:
+        adapter = _SHARED_ADAPTERS.get(adapter_key)
+        if adapter is None:
+            adapter = _SHARED_ADAPTERS[adapter_key] = PooledHTTPAdapter(
+                idle_timeout=idle_timeout,
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+            )
+
+    return adapter
+
+
+def close_shared_adapters():
+    """Release the connections of all shared adapters, e.g. after forking a worker process"""
+    with _SHARED_ADAPTERS_LOCK:
+        adapters = list(_SHARED_ADAPTERS.values())
+        _SHARED_ADAPTERS.clear()
+
+    for adapter in adapters:
+        adapter.shutdown()
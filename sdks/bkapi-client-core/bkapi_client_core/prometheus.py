@@ -125,6 +125,15 @@ class HookCollector:
             registry=registry,
         )
 
+        self.metric_cache_requests_total = Counter(
+            "bkapi_cache_requests_total",
+            "Count of response cache lookups by operation, method, result",
+            ["operation", "method", "result"],
+            namespace=namespace,
+            subsystem=subsystem,
+            registry=registry,
+        )
+
     @allow_fail
     def response_hook(
         self,
@@ -191,9 +200,22 @@ class HookCollector:
             error=error.__class__.__name__,
         ).inc()
 
+    @allow_fail
+    def cache_hook(
+        self,
+        hit,  # type: bool
+        operation,  # type: Operation
+    ):
+        self.metric_cache_requests_total.labels(
+            operation=str(operation),
+            method=operation.method,
+            result="hit" if hit else "miss",
+        ).inc()
+
     def enable_hooks(self):
         session.register_global_hook(HookEvent.OPERATION_PREPARED, self.request_hook)
         session.register_global_hook(HookEvent.OPERATION_ERROR, self.error_hook)
+        session.register_global_hook(HookEvent.OPERATION_CACHE, self.cache_hook)
 
 
 _GLOBAL_COLLECTOR = None  # type: Optional[HookCollector]
@@ -15,6 +15,7 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import inspect
 from typing import Any, Type, TypeVar  # noqa
 
 from typing_extensions import Protocol
@@ -32,6 +33,9 @@ class BindableProtocol(Protocol):
         raise NotImplementedError
 
 
+_NOT_SHAREABLE = object()
+
+
 class BindProperty(object):
     """
     BindProperty is a API declaration specification of lazy initialization of Property.
@@ -50,6 +54,7 @@ class BindProperty(object):
         self._cls = cls
         self._args = args
         self._kwargs = kwargs
+        self._definition = None  # type: Any
 
     def __set_name__(self, obj_type, name):
         self._name = name
@@ -66,13 +71,26 @@ class BindProperty(object):
         if hasattr(obj, self._property_id):
             return getattr(obj, self._property_id)
 
-        value = self._cls(*self._args, **self._kwargs)  # type: ignore
+        value = self._new_value()
         value.bind(self._name, obj)
 
         setattr(obj, self._name or self._property_id, value)
 
         return value
 
+    def _new_value(self):
+        # The class which supports definition sharing, such as Operation,
+        # declares the immutable definition only once, and the values bound to each manager share it.
+        if self._definition is None:
+            self._definition = _NOT_SHAREABLE
+            if inspect.isclass(self._cls) and hasattr(self._cls, "from_definition"):
+                self._definition = self._cls.declare(*self._args, **self._kwargs) or _NOT_SHAREABLE  # type: ignore
+
+        if self._definition is _NOT_SHAREABLE:
+            return self._cls(*self._args, **self._kwargs)  # type: ignore
+
+        return self._cls.from_definition(self._definition)  # type: ignore
+
 
 T = TypeVar("T", bound=BindableProtocol)
 
@@ -16,50 +16,94 @@
 # to the current version of the project delivered to anyone in the future.
 
 import string
+from functools import lru_cache
 from typing import Any, Dict, List, Optional  # noqa
 
 from requests import Request  # noqa
 from requests import Session as RequestSession
 from requests.hooks import dispatch_hook
 from requests.models import RequestHooksMixin
-from requests.sessions import merge_setting
 
 from bkapi_client_core import __version__
 from bkapi_client_core.config import HookEvent
 from bkapi_client_core.exceptions import PathParamsMissing
 
 
-class _UrlRender(string.Formatter):
-    """_UrlRender should format the url by path parameters."""
+_FORMATTER = string.Formatter()
 
-    def __init__(self, url, common_path_params=None):
-        self.url = url
-        self.common_path_params = common_path_params
 
-    def render(self, path_params=None):
+class _UrlTemplate(object):
+    """_UrlTemplate is a parsed url template, which can be rendered many times without parsing again."""
+
+    def __init__(self, url):
+        self.url = url
+        # list of (literal_text, field_name, conversion, format_spec)
+        self._parts = [
+            (literal_text, field_name if field_name is None else field_name.strip(), conversion, format_spec)
+            for literal_text, field_name, format_spec, conversion in _FORMATTER.parse(url)
+        ]
+        self._has_fields = any(part[1] is not None for part in self._parts)
+
+    def render(self, path_params):
         """Render the url with path_params."""
-        real_path_params = merge_setting(path_params, self.common_path_params)
+        if not self._has_fields:
+            # the escaped braces should be unescaped even though there are no fields
+            return "".join(part[0] for part in self._parts)
+
+        rendered = []
+        for literal_text, field_name, conversion, format_spec in self._parts:
+            rendered.append(literal_text)
+            if field_name is None:
+                continue
+
+            # Different from str.format, the field name is not allowed to drill down the attributes by `.`,
+            # which is unnecessary and unsafe.
+            if field_name not in path_params:
+                raise PathParamsMissing(
+                    "url {url} path parameter is required: {field_name}".format(
+                        field_name=field_name,
+                        url=self.url,
+                    ),
+                )
 
-        return self.format(self.url, **real_path_params)
+            value = path_params[field_name]
+            if conversion:
+                value = _FORMATTER.convert_field(value, conversion)
 
-    def get_field(self, field_name, args, kwargs):
-        """Get the path parameter."""
+            rendered.append(format(value, format_spec))
 
-        # Why should I override `get_field` but not `get_value`?
-        # Because the `get_field` implementation allow to drill down the attributes by `.`.
-        # This feature is unnecessary and unsafe.
+        return "".join(rendered)
 
-        field_name = field_name.strip()
 
-        if field_name not in kwargs:
-            raise PathParamsMissing(
-                "url {url} path parameter is required: {field_name}".format(
-                    field_name=field_name,
-                    url=self.url,
-                ),
-            )
+@lru_cache(maxsize=1024)
+def _compile_url(url):
+    # type: (str) -> _UrlTemplate
+    """Parse the url template once, the templates are usually the paths of operations, which are limited."""
+    return _UrlTemplate(url)
 
-        return kwargs[field_name], field_name
+
+class _UrlRender(object):
+    """_UrlRender should format the url by path parameters."""
+
+    def __init__(self, url, common_path_params=None):
+        self.url = url
+        self.common_path_params = common_path_params
+
+    def render(self, path_params=None):
+        """Render the url with path_params."""
+        return _compile_url(self.url).render(self._merge_path_params(path_params))
+
+    def _merge_path_params(self, path_params):
+        # the same as `merge_setting(path_params, self.common_path_params)`, but faster,
+        # the parameters which are set to None are removed
+        merged = dict(self.common_path_params) if self.common_path_params else {}
+        for key, value in (path_params or {}).items():
+            if value is None:
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+
+        return merged
 
 
 _SESSION_HOOKS = {}  # type: Dict[str, List[Any]]
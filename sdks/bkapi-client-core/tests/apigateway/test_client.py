@@ -65,6 +65,18 @@ class TestAPIGatewayClient:
         client = APIGatewayClient(endpoint=endpoint, stage=stage)
         assert client._get_endpoint() == expected
 
+    def test_get_endpoint_cached(self, mocker):
+        class MyClient(APIGatewayClient):
+            _gateway_name = "demo"
+
+        client = MyClient(endpoint="http://{gateway_name}.example.com", stage="prod")
+        assert client._get_endpoint() == "http://demo.example.com/prod"
+        # the rendered endpoint is shared by the clients created with the same arguments
+        assert client._get_endpoint() is MyClient(endpoint="http://{gateway_name}.example.com")._get_endpoint()
+
+        client._stage = "test"
+        assert client._get_endpoint() == "http://demo.example.com/test"
+
     @pytest.mark.parametrize(
         ("stage", "mappings", "expected"),
         [
@@ -16,6 +16,9 @@
 # to the current version of the project delivered to anyone in the future.
 
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
 
 import pytest
 
@@ -28,3 +31,47 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.django_settings")
 def core_settings():
     settings.reset()
     return settings
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # send headers and body in one packet, avoid the delayed ACK
+    wbufsize = -1
+
+    def do_GET(self):  # noqa: N802
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _LocalServer(ThreadingMixIn, HTTPServer):
+    """A local HTTP server which counts the accepted connections"""
+
+    # http.server.ThreadingHTTPServer is not available until python 3.7
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _JSONHandler)
+        self.connections = 0
+        self.endpoint = "http://%s:%s" % self.server_address
+
+    def process_request(self, request, client_address):
+        # every accepted connection means a new handshake from the client side
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+@pytest.fixture
+def local_server():
+    server = _LocalServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import asyncio
+import json
+
+import pytest
+from requests.exceptions import ConnectionError, ReadTimeout
+
+from bkapi_client_core import aio
+from bkapi_client_core.apigateway import AsyncAPIGatewayClient
+from bkapi_client_core.base import Operation, OperationGroup
+from bkapi_client_core.cache import ResponseCache
+from bkapi_client_core.config import HookEvent
+from bkapi_client_core.esb import AsyncESBClient, ESBClient
+from bkapi_client_core.exceptions import HTTPResponseError, PathParamsMissing
+from bkapi_client_core.property import bind_property
+
+httpx2 = pytest.importorskip("httpx2")
+
+
+class Group(OperationGroup):
+    get_color = bind_property(Operation, name="get_color", method="GET", path="/colors/{color}/")
+    set_color = bind_property(Operation, name="set_color", method="POST", path="/colors/")
+
+
+class Client(ESBClient):
+    api = bind_property(Group)
+
+
+class AsyncClient(aio.AsyncClientMixin, Client):
+    pass
+
+
+@pytest.fixture
+def requests_history():
+    return []
+
+
+@pytest.fixture
+def handler(requests_history):
+    def handle(request):
+        requests_history.append(request)
+        if request.url.path == "/error/":
+            return httpx2.Response(500, json={"ok": False})
+
+        return httpx2.Response(200, json={"ok": True, "path": request.url.path})
+
+    return handle
+
+
+@pytest.fixture(autouse=True)
+def mock_http_client(mocker, handler):
+    def get_async_http_client(verify=True, cert=None):
+        return httpx2.AsyncClient(transport=httpx2.MockTransport(handler))
+
+    return mocker.patch.object(aio, "get_async_http_client", side_effect=get_async_http_client)
+
+
+class TestAsyncClient:
+    def test_call(self, requests_history):
+        client = AsyncClient(endpoint="http://example.com")
+        client.update_bkapi_authorization(bk_app_code="test", bk_app_secret="secret")
+
+        result = asyncio.run(client.api.get_color({"x": 1}, path_params={"color": "red"}))
+
+        assert result == {"ok": True, "path": "/colors/red/"}
+        request = requests_history[0]
+        assert request.method == "GET"
+        assert request.url.params["x"] == "1"
+        assert json.loads(request.headers["X-Bkapi-Authorization"]) == {
+            "bk_app_code": "test",
+            "bk_app_secret": "secret",
+        }
+        assert request.headers["User-Agent"] == client.session.default_user_agent
+
+    def test_post_json(self, requests_history):
+        client = AsyncClient(endpoint="http://example.com")
+
+        asyncio.run(client.api.set_color({"color": "red"}))
+
+        assert json.loads(requests_history[0].content) == {"color": "red"}
+
+    def test_request(self):
+        client = AsyncClient(endpoint="http://example.com")
+
+        response = asyncio.run(client.api.get_color.request(path_params={"color": "red"}))
+
+        assert response.status_code == 200
+        assert response.json() == {"ok": True, "path": "/colors/red/"}
+        assert response.request.method == "GET"
+
+    def test_http_error(self):
+        class ErrorGroup(OperationGroup):
+            error = bind_property(Operation, name="error", method="GET", path="/error/")
+
+        class ErrorClient(AsyncESBClient):
+            api = bind_property(ErrorGroup)
+
+        client = ErrorClient(endpoint="http://example.com")
+
+        with pytest.raises(HTTPResponseError):
+            asyncio.run(client.api.error())
+
+    def test_path_params_missing(self):
+        client = AsyncClient(endpoint="http://example.com")
+
+        with pytest.raises(PathParamsMissing):
+            asyncio.run(client.api.get_color())
+
+    def test_hooks(self, mocker):
+        client = AsyncClient(endpoint="http://example.com")
+        response_hook = mocker.MagicMock(side_effect=lambda response, **kwargs: response)
+
+        def prepared_hook(context, operation):
+            context["hooks"] = {HookEvent.RESPONSE: [response_hook]}
+            return context
+
+        client.session.register_hook(HookEvent.OPERATION_PREPARED, prepared_hook)
+        asyncio.run(client.api.get_color(path_params={"color": "red"}))
+
+        response_hook.assert_called_once()
+
+    def test_proxies_not_supported(self):
+        client = AsyncClient(endpoint="http://example.com")
+
+        with pytest.raises(ValueError, match="proxies"):
+            asyncio.run(client.api.get_color(path_params={"color": "red"}, proxies={"http": "http://proxy"}))
+
+    def test_apigateway_client(self, requests_history):
+        class GatewayClient(AsyncAPIGatewayClient):
+            _gateway_name = "demo"
+            api = bind_property(Group)
+
+        client = GatewayClient(endpoint="http://{gateway_name}.example.com", stage="test")
+        asyncio.run(client.api.get_color(path_params={"color": "red"}))
+
+        assert str(requests_history[0].url) == "http://demo.example.com/test/colors/red/"
+
+    def test_concurrent(self, requests_history):
+        client = AsyncClient(endpoint="http://example.com")
+
+        async def gather():
+            return await asyncio.gather(
+                *[client.api.get_color(path_params={"color": str(i)}) for i in range(10)],
+            )
+
+        results = asyncio.run(gather())
+
+        assert [result["path"] for result in results] == ["/colors/%s/" % i for i in range(10)]
+
+    def test_abatch_call(self, mocker):
+        client = AsyncClient(endpoint="http://example.com")
+        calls = [(client.api.get_color, {"path_params": {"color": str(i)}}) for i in range(10)]
+        calls.insert(3, (client.api.get_color, None))
+
+        results = asyncio.run(client.abatch_call(calls, max_workers=2))
+
+        assert len(results) == 11
+        assert isinstance(results[3].error, PathParamsMissing)
+        assert [result.result["path"] for result in results if result.ok] == ["/colors/%s/" % i for i in range(10)]
+
+        with pytest.raises(TypeError):
+            client.batch_call(calls)
+
+    def test_response_cache(self, requests_history):
+        class CachedGroup(OperationGroup):
+            get_color = bind_property(
+                Operation,
+                name="get_color",
+                method="GET",
+                path="/colors/{color}/",
+                response_cache=ResponseCache(),
+            )
+
+        class CachedClient(AsyncESBClient):
+            api = bind_property(CachedGroup)
+
+        client = CachedClient(endpoint="http://example.com")
+
+        async def call():
+            first = await client.api.get_color(path_params={"color": "red"})
+            second = await client.api.get_color(path_params={"color": "red"})
+            await client.api.get_color(path_params={"color": "red"}, use_cache=False)
+            return first, second
+
+        first, second = asyncio.run(call())
+
+        assert first == second == {"ok": True, "path": "/colors/red/"}
+        assert len(requests_history) == 2
+
+
+class TestRequestErrors:
+    @pytest.mark.parametrize(
+        ("error", "expected"),
+        [
+            (httpx2.ConnectError("error"), ConnectionError),
+            (httpx2.ReadTimeout("error"), ReadTimeout),
+        ],
+    )
+    def test_error(self, mocker, error, expected):
+        def raise_error(request):
+            raise error
+
+        mocker.patch.object(
+            aio,
+            "get_async_http_client",
+            return_value=httpx2.AsyncClient(transport=httpx2.MockTransport(raise_error)),
+        )
+        client = AsyncClient(endpoint="http://example.com")
+        error_hook = mocker.MagicMock()
+        client.session.register_hook(HookEvent.OPERATION_ERROR, error_hook)
+
+        with pytest.raises(expected):
+            asyncio.run(client.api.get_color(path_params={"color": "red"}))
+
+        error_hook.assert_called_once()
+
+
+class TestGetAsyncHttpClient:
+    def test_shared_in_event_loop(self, mocker):
+        mocker.stopall()
+
+        async def get_clients():
+            return aio.get_async_http_client(), aio.get_async_http_client(), aio.get_async_http_client(verify=False)
+
+        client1, client2, client3 = asyncio.run(get_clients())
+        assert client1 is client2
+        assert client1 is not client3
+
+    def test_different_event_loops(self, mocker):
+        mocker.stopall()
+
+        async def get_client():
+            return aio.get_async_http_client()
+
+        assert asyncio.run(get_client()) is not asyncio.run(get_client())
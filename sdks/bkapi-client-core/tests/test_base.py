@@ -107,6 +107,56 @@ class TestOperation:
         context = operation._get_context(data=call_data, **call_args)
         assert context == excepted
 
+    def test_declare(self):
+        definition = Operation.declare(name="test", method="GET", path="/test/", bkapi_config={"a": 1}, x=1)
+
+        assert definition.name == "test"
+        assert definition.method == "GET"
+        assert definition.path == "/test/"
+        assert definition.bkapi_config == {"a": 1}
+        assert definition.properties == {"x": 1}
+
+    def test_declare_by_subclass_with_init(self):
+        class MyOperation(Operation):
+            def __init__(self, *args, **kwargs):
+                super(MyOperation, self).__init__(*args, **kwargs)
+
+        assert MyOperation.declare(name="test") is None
+
+    def test_from_definition(self):
+        definition = Operation.declare(name="test", method="GET", path="/test/")
+
+        operation1 = Operation.from_definition(definition)
+        operation2 = Operation.from_definition(definition)
+        operation1.bind("", self.manager)
+
+        assert operation1 is not operation2
+        assert operation1.name == operation2.name == "test"
+        assert operation1.method == "GET"
+        assert operation1.path == "/test/"
+        assert operation1._manager is self.manager
+        assert operation2._manager is None
+
+    def test_set_attributes(self):
+        definition = Operation.declare(name="test", method="GET", path="/test/", bkapi_config={"a": 1}, x=1)
+        operation1 = Operation.from_definition(definition)
+        operation2 = Operation.from_definition(definition)
+
+        operation1.method = "POST"
+        operation1.path = "/other/"
+        operation1._bkapi_config = {"b": 2}
+        operation1._properties = {"y": 2}
+
+        assert operation1.method == "POST"
+        assert operation1.path == "/other/"
+        assert operation1._bkapi_config == {"b": 2}
+        assert operation1._properties == {"y": 2}
+        # the shared definition is not changed
+        assert operation2.method == "GET"
+        assert operation2.path == "/test/"
+        assert operation2._bkapi_config == {"a": 1}
+        assert operation2._properties == {"x": 1}
+
 
 class TestOperationGroup:
     @pytest.fixture(autouse=True)
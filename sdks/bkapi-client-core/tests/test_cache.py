@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import pytest
+
+from bkapi_client_core.auth import BKApiAuthorization
+from bkapi_client_core.base import Operation, OperationGroup
+from bkapi_client_core.cache import DjangoCacheBackend, LocMemCacheBackend, ResponseCache
+from bkapi_client_core.client import BaseClient
+from bkapi_client_core.config import HookEvent
+from bkapi_client_core.property import bind_property
+from bkapi_client_core.session import Session
+
+host_cache = ResponseCache(ttl=60)
+
+
+class Group(OperationGroup):
+    get_host = bind_property(
+        Operation,
+        name="get_host",
+        method="GET",
+        path="/hosts/{bk_host_id}/",
+        response_cache=host_cache,
+    )
+    update_host = bind_property(
+        Operation,
+        name="update_host",
+        method="POST",
+        path="/hosts/{bk_host_id}/",
+        response_cache=ResponseCache(ttl=60),
+    )
+    list_hosts = bind_property(Operation, name="list_hosts", method="GET", path="/hosts/")
+
+
+class Client(BaseClient):
+    api = bind_property(Group)
+
+
+class TestLocMemCacheBackend:
+    def test_get_set(self):
+        backend = LocMemCacheBackend()
+        assert backend.get("key") is None
+
+        backend.set("key", "value", 60)
+        assert backend.get("key") == "value"
+
+    def test_expired(self, mocker):
+        monotonic = mocker.patch("bkapi_client_core.cache.time.monotonic", return_value=100)
+        backend = LocMemCacheBackend()
+        backend.set("key", "value", 10)
+
+        monotonic.return_value = 109
+        assert backend.get("key") == "value"
+
+        monotonic.return_value = 110
+        assert backend.get("key") is None
+
+    def test_max_size(self):
+        backend = LocMemCacheBackend(max_size=2)
+        backend.set("a", 1, 60)
+        backend.set("b", 2, 60)
+        # "a" is recently used, "b" will be evicted
+        backend.get("a")
+        backend.set("c", 3, 60)
+
+        assert backend.get("a") == 1
+        assert backend.get("b") is None
+        assert backend.get("c") == 3
+
+    def test_clear(self):
+        backend = LocMemCacheBackend()
+        backend.set("key", "value", 60)
+        backend.clear()
+
+        assert backend.get("key") is None
+
+
+class TestDjangoCacheBackend:
+    def test_get_set(self, mocker):
+        cache = mocker.MagicMock()
+        mocker.patch("django.core.cache.caches", {"default": cache})
+        backend = DjangoCacheBackend()
+
+        backend.set("key", "value", 60)
+        cache.set.assert_called_once_with("key", "value", 60)
+
+        assert backend.get("key") == cache.get.return_value
+
+
+class TestResponseCache:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.cache = ResponseCache()
+        self.session = Session()
+
+    @pytest.mark.parametrize(
+        ("method", "expected"),
+        [
+            ("GET", True),
+            ("get", True),
+            ("POST", False),
+            ("DELETE", False),
+        ],
+    )
+    def test_is_cacheable(self, method, expected):
+        assert self.cache.is_cacheable({"method": method}) is expected
+
+    def test_make_key(self):
+        context = {"method": "GET", "url": "http://example.com/hosts/{id}/", "path_params": {"id": 1}}
+        key = self.cache.make_key(self.session, context)
+
+        assert key.startswith(ResponseCache.key_prefix)
+        assert key == self.cache.make_key(self.session, dict(context))
+        assert key != self.cache.make_key(self.session, dict(context, path_params={"id": 2}))
+        assert key != self.cache.make_key(self.session, dict(context, params={"x": 1}))
+
+    def test_make_key_by_authorization(self):
+        context = {"method": "GET", "url": "http://example.com/"}
+        key = self.cache.make_key(self.session, context)
+
+        self.session.auth = BKApiAuthorization(bk_username="admin")
+        assert key != self.cache.make_key(self.session, context)
+        assert "admin" not in self.cache.make_key(self.session, context)
+
+    def test_set_get(self, requests_mock):
+        requests_mock.get("http://example.com/", json={"result": True}, headers={"X-Test": "1"})
+        response = self.session.get("http://example.com/")
+
+        self.cache.set("key", response)
+        cached = self.cache.get("key")
+
+        assert cached is not response
+        assert cached.status_code == 200
+        assert cached.json() == {"result": True}
+        assert cached.headers["x-test"] == "1"
+        assert cached.url == "http://example.com/"
+
+    @pytest.mark.parametrize(
+        ("status_code", "headers"),
+        [
+            (500, {}),
+            (404, {}),
+            (200, {"X-Bkapi-Error-Code": "1640001"}),
+        ],
+    )
+    def test_set_error_response(self, requests_mock, status_code, headers):
+        requests_mock.get("http://example.com/", json={}, status_code=status_code, headers=headers)
+        self.cache.set("key", self.session.get("http://example.com/"))
+
+        assert self.cache.get("key") is None
+
+
+class TestClientResponseCache:
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.client = Client(endpoint="http://example.com")
+        host_cache.backend.clear()
+
+    def test_cached(self, requests_mock):
+        requests_mock.get("http://example.com/hosts/1/", json={"bk_host_id": 1})
+
+        assert self.client.api.get_host(path_params={"bk_host_id": 1}) == {"bk_host_id": 1}
+        assert self.client.api.get_host(path_params={"bk_host_id": 1}) == {"bk_host_id": 1}
+        assert requests_mock.call_count == 1
+
+    def test_shared_by_clients(self, requests_mock):
+        requests_mock.get("http://example.com/hosts/1/", json={"bk_host_id": 1})
+
+        for _ in range(3):
+            assert Client(endpoint="http://example.com").api.get_host(path_params={"bk_host_id": 1})
+
+        assert requests_mock.call_count == 1
+
+    def test_different_path_params(self, requests_mock):
+        requests_mock.get("http://example.com/hosts/1/", json={"bk_host_id": 1})
+        requests_mock.get("http://example.com/hosts/2/", json={"bk_host_id": 2})
+
+        assert self.client.api.get_host(path_params={"bk_host_id": 1}) == {"bk_host_id": 1}
+        assert self.client.api.get_host(path_params={"bk_host_id": 2}) == {"bk_host_id": 2}
+        assert requests_mock.call_count == 2
+
+    def test_different_users(self, requests_mock):
+        requests_mock.get("http://example.com/hosts/1/", json={"bk_host_id": 1})
+
+        for username in ["admin", "guest"]:
+            client = Client(endpoint="http://example.com")
+            client.update_bkapi_authorization(bk_username=username)
+            client.api.get_host(path_params={"bk_host_id": 1})
+
+        assert requests_mock.call_count == 2
+
+    def test_use_cache_false(self, requests_mock):
+        requests_mock.get("http://example.com/hosts/1/", json={"bk_host_id": 1})
+
+        self.client.api.get_host(path_params={"bk_host_id": 1})
+        self.client.api.get_host(path_params={"bk_host_id": 1}, use_cache=False)
+        assert requests_mock.call_count == 2
+        assert "use_cache" not in requests_mock.last_request.qs
+
+    def test_error_not_cached(self, requests_mock):
+        requests_mock.get("http://example.com/hosts/1/", status_code=500)
+
+        for _ in range(2):
+            assert self.client.api.get_host.request(path_params={"bk_host_id": 1}).status_code == 500
+
+        assert requests_mock.call_count == 2
+
+    def test_not_cacheable_method(self, requests_mock):
+        requests_mock.post("http://example.com/hosts/1/", json={"result": True})
+
+        for _ in range(2):
+            self.client.api.update_host(path_params={"bk_host_id": 1})
+
+        assert requests_mock.call_count == 2
+
+    def test_without_cache(self, requests_mock):
+        requests_mock.get("http://example.com/hosts/", json=[])
+
+        for _ in range(2):
+            self.client.api.list_hosts(use_cache=True)
+
+        assert requests_mock.call_count == 2
+
+    def test_cache_hook(self, mocker, requests_mock):
+        requests_mock.get("http://example.com/hosts/1/", json={"bk_host_id": 1})
+        hook = mocker.MagicMock(return_value=None)
+        self.client.session.register_hook(HookEvent.OPERATION_CACHE, hook)
+
+        self.client.api.get_host(path_params={"bk_host_id": 1})
+        self.client.api.get_host(path_params={"bk_host_id": 1})
+
+        assert [call.args[0] for call in hook.call_args_list] == [False, True]
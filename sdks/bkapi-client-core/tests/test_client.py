@@ -15,13 +15,20 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import threading
+
 import pytest
 from requests.exceptions import RequestException
 
 from bkapi_client_core.base import Operation, OperationGroup
-from bkapi_client_core.client import BaseClient, RequestContextBuilder, ResponseHeadersRepresenter
+from bkapi_client_core.client import BaseClient, BatchResult, RequestContextBuilder, ResponseHeadersRepresenter
 from bkapi_client_core.config import HookEvent
-from bkapi_client_core.exceptions import APIGatewayResponseError, EndpointNotSetError, ResponseError
+from bkapi_client_core.exceptions import (
+    APIGatewayResponseError,
+    EndpointNotSetError,
+    HTTPResponseError,
+    ResponseError,
+)
 from bkapi_client_core.property import bind_property
 from bkapi_client_core.session import Session
 
@@ -290,6 +297,79 @@ class TestBaseClient:
         assert client._reuse_session_connection is False
         mock_close.assert_called_once_with()
 
+    def test_batch_call(self, mocker, requests_mock):
+        class Group(OperationGroup):
+            get_host = bind_property(Operation, method="GET", path="/hosts/{bk_biz_id}/", name="get_host")
+
+        class Client(BaseClient):
+            api = bind_property(Group, name="api")
+
+        for bk_biz_id in range(20):
+            requests_mock.get("http://example.com/hosts/%s/" % bk_biz_id, json={"bk_biz_id": bk_biz_id})
+        requests_mock.get("http://example.com/hosts/error/", status_code=500)
+
+        client = Client("http://example.com")
+        prepared_hook = mocker.MagicMock(side_effect=lambda context, operation: context)
+        client.session.register_hook(HookEvent.OPERATION_PREPARED, prepared_hook)
+        mock_close = mocker.patch.object(client, "close")
+
+        calls = [(client.api.get_host, {"path_params": {"bk_biz_id": bk_biz_id}}) for bk_biz_id in range(20)]
+        calls.insert(5, (client.api.get_host, {"path_params": {"bk_biz_id": "error"}}))
+        results = client.batch_call(calls, max_workers=4)
+
+        assert len(results) == 21
+        assert isinstance(results[5].error, HTTPResponseError)
+        assert not results[5].ok
+        assert [result.result["bk_biz_id"] for result in results if result.ok] == list(range(20))
+        assert prepared_hook.call_count == 21
+        # the connections are reused by all calls, and closed at last
+        mock_close.assert_called_once_with()
+        assert client._reuse_session_connection is False
+
+    def test_batch_call_not_affect_other_threads(self, mocker, requests_mock):
+        requests_mock.get("http://example.com/echo", json={})
+
+        class Group(OperationGroup):
+            echo = bind_property(Operation, method="GET", path="echo", name="echo")
+
+        class Client(BaseClient):
+            api = bind_property(Group, name="api")
+
+        client = Client("http://example.com")
+        mock_close = mocker.patch.object(client, "close")
+
+        def call_in_batch():
+            # a request of another thread in the middle of the batch closes the session as usual
+            thread = threading.Thread(target=client.api.echo)
+            thread.start()
+            thread.join()
+            assert mock_close.call_count == 1
+
+            # the requests of the batch keep the connections
+            client.api.echo()
+            assert mock_close.call_count == 1
+            return {}
+
+        client.batch_call([(call_in_batch, None)])
+        assert mock_close.call_count == 2
+
+    def test_batch_call_in_with(self, mocker, requests_mock):
+        requests_mock.get("http://example.com/echo", json={})
+
+        class Group(OperationGroup):
+            echo = bind_property(Operation, method="GET", path="echo", name="echo")
+
+        class Client(BaseClient):
+            api = bind_property(Group, name="api")
+
+        client = Client("http://example.com")
+        mock_close = mocker.patch.object(client, "close")
+
+        with client:
+            client.batch_call([(client.api.echo, None)])
+            mock_close.assert_not_called()
+            assert client._reuse_session_connection is True
+
     @pytest.mark.parametrize(
         ("endpoint", "operation_path", "excepted_url"),
         [
@@ -506,3 +586,16 @@ class TestBaseClient:
                 mocker.MagicMock(),
                 response and mocker.MagicMock(**response),
             )
+
+
+class TestBatchResult:
+    def test_ok(self):
+        result = BatchResult(result={"ok": True})
+        assert result.ok
+        assert result.result == {"ok": True}
+
+    def test_error(self):
+        error = RequestException("error")
+        result = BatchResult(error=error)
+        assert not result.ok
+        assert result.error is error
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+
+import threading
+
+import pytest
+
+from bkapi_client_core import django_helper, pool
+from bkapi_client_core.base import Operation, OperationGroup
+from bkapi_client_core.client import BaseClient
+from bkapi_client_core.config import SettingKeys
+from bkapi_client_core.property import bind_property
+
+
+@pytest.fixture(autouse=True)
+def _clean_shared_adapters():
+    yield
+    pool.close_shared_adapters()
+
+
+class Group(OperationGroup):
+    test = bind_property(Operation, name="test", method="GET", path="/test/")
+
+
+class Client(BaseClient):
+    api = bind_property(Group)
+
+
+class TestPooledHTTPAdapter:
+    def test_close(self, mocker):
+        adapter = pool.PooledHTTPAdapter()
+        clear = mocker.patch.object(adapter.poolmanager, "clear")
+
+        adapter.close()
+        clear.assert_not_called()
+
+        adapter.shutdown()
+        clear.assert_called_once()
+
+    def test_clear_idle_connections(self, mocker):
+        adapter = pool.PooledHTTPAdapter(idle_timeout=10)
+        clear = mocker.patch.object(adapter.poolmanager, "clear")
+        monotonic = mocker.patch("bkapi_client_core.pool.time.monotonic")
+
+        monotonic.return_value = adapter._last_used + 5
+        adapter._clear_idle_connections()
+        clear.assert_not_called()
+
+        monotonic.return_value = adapter._last_used + 11
+        adapter._clear_idle_connections()
+        clear.assert_called_once()
+
+    def test_never_clear_without_idle_timeout(self, mocker):
+        adapter = pool.PooledHTTPAdapter(idle_timeout=None)
+        clear = mocker.patch.object(adapter.poolmanager, "clear")
+        mocker.patch("bkapi_client_core.pool.time.monotonic", return_value=adapter._last_used + 3600)
+
+        adapter._clear_idle_connections()
+        clear.assert_not_called()
+
+
+class TestSharedAdapter:
+    def test_same_key(self):
+        assert pool.get_shared_adapter("http://a.example.com") is pool.get_shared_adapter("http://a.example.com")
+
+    def test_different_key(self):
+        assert pool.get_shared_adapter("http://a.example.com") is not pool.get_shared_adapter("http://b.example.com")
+
+    def test_different_options(self):
+        assert pool.get_shared_adapter("http://a.example.com", pool_maxsize=1) is not pool.get_shared_adapter(
+            "http://a.example.com", pool_maxsize=2
+        )
+
+    def test_close_shared_adapters(self, mocker):
+        adapter = pool.get_shared_adapter("http://a.example.com")
+        shutdown = mocker.patch.object(adapter, "shutdown")
+
+        pool.close_shared_adapters()
+
+        shutdown.assert_called_once()
+        assert pool.get_shared_adapter("http://a.example.com") is not adapter
+
+
+class TestConnectionPool:
+    def test_without_pool(self, local_server):
+        client = Client(endpoint=local_server.endpoint)
+        for _ in range(10):
+            assert client.api.test() == {"ok": True}
+
+        assert local_server.connections == 10
+
+    def test_with_pool(self, local_server):
+        client = Client(endpoint=local_server.endpoint)
+        client.enable_connection_pool()
+        for _ in range(10):
+            assert client.api.test() == {"ok": True}
+
+        assert local_server.connections == 1
+
+    def test_shared_by_clients(self, local_server):
+        for _ in range(10):
+            client = Client(endpoint=local_server.endpoint)
+            client.enable_connection_pool(pool_maxsize=2)
+            assert client.api.test() == {"ok": True}
+
+        assert local_server.connections == 1
+
+    def test_enable_by_settings(self, core_settings, local_server):
+        core_settings.set(SettingKeys.BK_API_CLIENT_CONNECTION_POOL, {"pool_maxsize": 2, "idle_timeout": 30})
+
+        for _ in range(10):
+            client = django_helper._get_client_by_settings(Client, endpoint=local_server.endpoint)
+            assert client.api.test() == {"ok": True}
+
+        assert local_server.connections == 1
+
+    def test_concurrent_requests(self, local_server):
+        def request():
+            client = Client(endpoint=local_server.endpoint)
+            client.enable_connection_pool(pool_maxsize=4)
+            for _ in range(10):
+                client.api.test()
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert local_server.connections <= 4
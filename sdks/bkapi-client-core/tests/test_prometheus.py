@@ -42,9 +42,10 @@ def test_enable_collector(mocker, mock_registry, mock_register_global_hook):
     enable(registry=mock_registry)
     enable(registry=mock_registry)  # this is not work
 
-    assert mock_register_global_hook.call_count == 2
+    assert mock_register_global_hook.call_count == 3
     mock_register_global_hook.assert_any_call(HookEvent.OPERATION_PREPARED, mocker.ANY)
     mock_register_global_hook.assert_any_call(HookEvent.OPERATION_ERROR, mocker.ANY)
+    mock_register_global_hook.assert_any_call(HookEvent.OPERATION_CACHE, mocker.ANY)
 
 
 class TestHookCollector:
@@ -167,3 +168,25 @@ class TestHookCollector:
             )
             == 1.0
         )
+
+    @pytest.mark.parametrize(
+        ("hit", "result"),
+        [
+            (True, "hit"),
+            (False, "miss"),
+        ],
+    )
+    def test_cache_hook(self, mock_operation, mock_registry, hit, result):
+        self.collector.cache_hook(hit, mock_operation)
+
+        assert (
+            mock_registry.get_sample_value(
+                "bkapi_cache_requests_total",
+                {
+                    "operation": str(mock_operation),
+                    "method": str(mock_operation.method),
+                    "result": result,
+                },
+            )
+            == 1.0
+        )
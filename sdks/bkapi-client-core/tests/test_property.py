@@ -15,6 +15,7 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+from bkapi_client_core.base import Operation
 from bkapi_client_core.property import BindProperty
 
 
@@ -81,3 +82,33 @@ class TestBindProperty:
         manager2 = Manager()
 
         assert manager1.attr is not manager2.attr
+
+    def test_share_operation_definition(self):
+        class Manager(object):
+            attr = BindProperty(Operation, name="test", method="GET", path="/test/")
+
+        manager1 = Manager()
+        manager2 = Manager()
+
+        assert manager1.attr is not manager2.attr
+        assert manager1.attr._definition is manager2.attr._definition
+        assert manager1.attr._manager is manager1
+        assert manager2.attr._manager is manager2
+        assert manager1.attr.name == "attr"
+        assert manager1.attr.method == "GET"
+        assert manager1.attr.path == "/test/"
+
+    def test_not_share_operation_definition(self):
+        class MyOperation(Operation):
+            def __init__(self, *args, **kwargs):
+                super(MyOperation, self).__init__(*args, **kwargs)
+                self.extra = True
+
+        class Manager(object):
+            attr = BindProperty(MyOperation, name="test", method="GET", path="/test/")
+
+        manager1 = Manager()
+        manager2 = Manager()
+
+        assert manager1.attr.extra
+        assert manager1.attr._definition is not manager2.attr._definition
@@ -19,7 +19,7 @@ import pytest
 
 from bkapi_client_core.config import HookEvent
 from bkapi_client_core.exceptions import PathParamsMissing
-from bkapi_client_core.session import Session, deregister_global_hook, register_global_hook
+from bkapi_client_core.session import Session, _compile_url, _UrlRender, deregister_global_hook, register_global_hook
 
 
 class TestSession:
@@ -122,3 +122,37 @@ class TestSession:
         assert response.request.headers["X-Testing"] == "1"
 
         assert deregister_global_hook(HookEvent.REQUEST, hook)
+
+
+class TestUrlRender:
+    @pytest.mark.parametrize(
+        ("url", "path_params", "common_path_params", "expected"),
+        [
+            ("http://example.com/red/", None, None, "http://example.com/red/"),
+            ("http://example.com/{{red}}/", None, None, "http://example.com/{red}/"),
+            ("http://example.com/{ color }/", {"color": "red"}, None, "http://example.com/red/"),
+            ("http://example.com/{color}/{id}/", {"color": "red"}, {"id": 1}, "http://example.com/red/1/"),
+            ("http://example.com/{color}/", {"color": "red"}, {"color": "green"}, "http://example.com/red/"),
+            ("http://example.com/{color!r}/", {"color": "red"}, None, "http://example.com/'red'/"),
+            ("http://example.com/{id:03d}/", {"id": 1}, None, "http://example.com/001/"),
+        ],
+    )
+    def test_render(self, url, path_params, common_path_params, expected):
+        assert _UrlRender(url, common_path_params).render(path_params) == expected
+        # the second rendering uses the cached template
+        assert _UrlRender(url, common_path_params).render(path_params) == expected
+
+    def test_render_missing(self):
+        with pytest.raises(PathParamsMissing, match="path parameter is required: id"):
+            _UrlRender("http://example.com/{color}/{id}/").render({"color": "red"})
+
+    def test_render_none_removed(self):
+        with pytest.raises(PathParamsMissing, match="path parameter is required: color"):
+            _UrlRender("http://example.com/{color}/", {"color": "green"}).render({"color": None})
+
+    def test_render_without_attribute_access(self):
+        with pytest.raises(PathParamsMissing, match="path parameter is required: color.real"):
+            _UrlRender("http://example.com/{color.real}/").render({"color": 1})
+
+    def test_compile_once(self):
+        assert _compile_url("http://example.com/{color}/") is _compile_url("http://example.com/{color}/")
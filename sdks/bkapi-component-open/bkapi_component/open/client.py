@@ -15,6 +15,7 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+from bkapi_client_core.aio import AsyncClientMixin
 from bkapi_client_core.esb import ESBClient, Operation, OperationGroup, bind_property
 
 
@@ -3156,3 +3157,7 @@ class Client(ESBClient):
     monitor_v3 = bind_property(MonitorV3Group, name="monitor_v3")
     sops = bind_property(SopsGroup, name="sops")
     usermanage = bind_property(UsermanageGroup, name="usermanage")
+
+
+class AsyncClient(AsyncClientMixin, Client):
+    """ESB Components, the operations should be awaited"""
@@ -15,6 +15,7 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+from bkapi_client_core.aio import AsyncClientMixin
 from bkapi_client_core.esb import ESBClient, Operation, OperationGroup
 
 
@@ -1635,3 +1636,7 @@ class Client(ESBClient):
     @property
     def usermanage(self) -> OperationGroup:
         """usermanage apis"""
+
+
+class AsyncClient(AsyncClientMixin, Client):
+    """ESB Components, the operations should be awaited"""
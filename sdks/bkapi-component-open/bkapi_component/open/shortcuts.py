@@ -20,8 +20,12 @@ from bkapi_client_core.esb.django_helper import get_client_by_request as _get_cl
 from bkapi_client_core.esb.django_helper import get_client_by_user as _get_client_by_user
 from bkapi_client_core.esb.django_helper import get_client_by_username as _get_client_by_username
 
-from .client import Client
+from .client import AsyncClient, Client
 
 get_client_by_request = _partial(Client, _get_client_by_request)
 get_client_by_username = _partial(Client, _get_client_by_username)
 get_client_by_user = _partial(Client, _get_client_by_user)
+
+get_async_client_by_request = _partial(AsyncClient, _get_client_by_request)
+get_async_client_by_username = _partial(AsyncClient, _get_client_by_username)
+get_async_client_by_user = _partial(AsyncClient, _get_client_by_user)
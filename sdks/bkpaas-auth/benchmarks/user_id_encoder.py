@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Time of encoding and decoding 100k user ids, a fresh ARC4 per id vs. the precomputed key stream
+
+Usage: python -m benchmarks.user_id_encoder
+"""
+
+import time
+
+from bkpaas_auth.core.constants import ProviderType
+from bkpaas_auth.core.encoder import BluekingUserIdEncoder
+
+NUMBER = 100_000
+
+
+def legacy_arc4(key: bytes, data: bytes) -> bytes:
+    """The previous behaviour, which runs the key schedule and a generator-driven key stream for every call"""
+    s = list(range(0x100))
+    j = 0
+    for i in range(0x100):
+        j = (s[i] + key[i % len(key)] + j) & 0xFF
+        s[i], s[j] = s[j], s[i]
+
+    def key_stream():
+        x = y = 0
+        while True:
+            x = (x + 1) & 0xFF
+            y = (s[x] + y) & 0xFF
+            s[x], s[y] = s[y], s[x]
+            yield s[(s[x] + s[y]) & 0xFF]
+
+    return bytes([a ^ b for a, b in zip(data, key_stream())])
+
+
+def legacy_encode(username: str) -> str:
+    return "03" + legacy_arc4(BluekingUserIdEncoder.secret_key.encode(), username.encode()).hex()
+
+
+def legacy_decode(user_id: str) -> tuple[int, str]:
+    return int(user_id[:2]), legacy_arc4(
+        BluekingUserIdEncoder.secret_key.encode(), bytes.fromhex(user_id[2:])
+    ).decode()
+
+
+def report(name, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {elapsed * 1000:9.1f} ms  {NUMBER / elapsed:12.0f} ids/s")
+    return result
+
+
+def main():
+    usernames = [f"user-{i}" for i in range(NUMBER)]
+    encoder = BluekingUserIdEncoder()
+
+    expected = report("legacy", lambda: [legacy_encode(username) for username in usernames])
+    assert report("encode", lambda: [encoder.encode(ProviderType.BK, username) for username in usernames]) == expected
+    assert report("encode_many", lambda: encoder.encode_many(ProviderType.BK, usernames)) == expected
+
+    decoded = [(ProviderType.BK.value, username) for username in usernames]
+    assert report("legacy", lambda: [legacy_decode(user_id) for user_id in expected]) == decoded
+    assert report("decode", lambda: [encoder.decode(user_id) for user_id in expected]) == decoded
+    assert report("decode_many", lambda: encoder.decode_many(expected)) == decoded
+
+
+if __name__ == "__main__":
+    main()
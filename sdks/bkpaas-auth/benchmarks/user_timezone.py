@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Per-request cost of UserTimezoneMiddleware for valid, invalid and missing time zones, before and after caching
+the zones by name
+
+Usage: python -m benchmarks.user_timezone
+"""
+
+import logging
+import time
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import django
+from django.conf import settings
+
+settings.configure(
+    USE_TZ=True,
+    TIME_ZONE="Asia/Shanghai",
+    INSTALLED_APPS=["django.contrib.auth", "django.contrib.contenttypes", "django.contrib.sessions"],
+)
+django.setup()
+
+from django.utils import timezone as dj_timezone  # noqa: E402
+
+from bkpaas_auth.middlewares import UserTimezoneMiddleware, logger  # noqa: E402
+
+NUMBER = 100_000
+
+
+class LegacyUserTimezoneMiddleware(UserTimezoneMiddleware):
+    """The previous behaviour, which constructs the zone and logs the invalid one for every request"""
+
+    @staticmethod
+    def _activate_user_timezone(user):
+        if user is None or not user.is_authenticated:
+            return
+
+        tz_name = getattr(user, "time_zone", None)
+        if tz_name and isinstance(tz_name, str):
+            try:
+                user_tz = ZoneInfo(tz_name)
+                dj_timezone.activate(user_tz)
+            except ZoneInfoNotFoundError as e:
+                logger.warning(
+                    "Invalid time_zone '%s' for user '%s', fallback to default. Error: %s",
+                    tz_name,
+                    user.username,
+                    str(e),
+                )
+            else:
+                logger.debug("Activated timezone '%s' for user '%s'", tz_name, user.username)
+                return
+
+        dj_timezone.activate(dj_timezone.get_default_timezone())
+
+
+def report(name, middleware_class, time_zone):
+    middleware = middleware_class(lambda request: None)
+    request = SimpleNamespace(user=SimpleNamespace(is_authenticated=True, username="admin", time_zone=time_zone))
+
+    start = time.perf_counter()
+    for _ in range(NUMBER):
+        middleware.process_request(request)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<8} {time_zone!r:<20} {elapsed / NUMBER * 1e6:8.2f} us/request")
+
+
+def main():
+    # 告警日志被丢弃，只比较解析时区和处理异常的开销
+    logging.basicConfig(level=logging.ERROR)
+
+    for time_zone in ["America/New_York", "Invalid/Timezone", ""]:
+        report("legacy", LegacyUserTimezoneMiddleware, time_zone)
+        report("cached", UserTimezoneMiddleware, time_zone)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import copy
 import inspect
 import logging
 from typing import TYPE_CHECKING, Any, overload
@@ -11,6 +12,7 @@ from django.core.exceptions import ImproperlyConfigured
 from django.http import HttpRequest
 
 from bkpaas_auth.conf import bkauth_settings
+from bkpaas_auth.core.cache import LocalCache, SingleFlight, UserAccountCache
 from bkpaas_auth.core.constants import ProviderType
 from bkpaas_auth.core.exceptions import InvalidTokenCredentialsError, ResponseError, ServiceError
 from bkpaas_auth.core.plugins import BkTicketPlugin, BkTokenPlugin
@@ -28,6 +30,13 @@ from bkpaas_auth.models import User
 
 logger = logging.getLogger(__name__)
 
+# 登录态校验结果在同步、异步调用链之间共享；并发校验同一登录态时只请求一次登录服务
+user_account_cache = UserAccountCache()
+_user_account_flight = SingleFlight()
+_async_user_account_flight = SingleFlight()
+# DjangoAuthUserCompatibleBackend 已关联过的数据库用户，缓存期内认证已存在的用户无需查询数据库
+django_user_cache = LocalCache(max_size=10000)
+
 
 class UniversalAuthBackend(BaseBackend):
     """An universal cookie auth backend.
@@ -82,7 +91,7 @@ class UniversalAuthBackend(BaseBackend):
 
     def authenticate(self, request: HttpRequest, auth_credentials: dict[str, Any]) -> User | None:
         try:
-            user_account: UserAccount = self.request_backend.request_user_account(**auth_credentials)
+            user_account: UserAccount = self.request_user_account(auth_credentials)
         except (ResponseError, InvalidTokenCredentialsError, ServiceError) as exc:
             self._log_authentication_error(exc)
             return None
@@ -91,13 +100,44 @@ class UniversalAuthBackend(BaseBackend):
 
     async def aauthenticate(self, request: HttpRequest, auth_credentials: dict[str, Any]) -> User | None:
         try:
-            user_account = await self.request_backend.async_request_user_account(**auth_credentials)
+            user_account = await self.async_request_user_account(auth_credentials)
         except (ResponseError, InvalidTokenCredentialsError, ServiceError) as exc:
             self._log_authentication_error(exc)
             return None
 
         return self._create_user_from_account(user_account)
 
+    def _get_user_account_cache_key(self, auth_credentials: dict[str, Any]) -> str:
+        return user_account_cache.make_key(type(self.request_backend).__name__, auth_credentials)
+
+    def request_user_account(self, auth_credentials: dict[str, Any]) -> UserAccount:
+        """Get the user account verified by the credentials, from the cache or the request backend."""
+        cache_key = self._get_user_account_cache_key(auth_credentials)
+        user_account = user_account_cache.get(cache_key)
+        if user_account:
+            return user_account
+
+        def request() -> UserAccount:
+            user_account = self.request_backend.request_user_account(**auth_credentials)
+            user_account_cache.set(cache_key, user_account)
+            return user_account
+
+        return _user_account_flight.do(cache_key, request)
+
+    async def async_request_user_account(self, auth_credentials: dict[str, Any]) -> UserAccount:
+        """Asynchronous version of :meth:`request_user_account`."""
+        cache_key = self._get_user_account_cache_key(auth_credentials)
+        user_account = await user_account_cache.aget(cache_key)
+        if user_account:
+            return user_account
+
+        async def request() -> UserAccount:
+            user_account = await self.request_backend.async_request_user_account(**auth_credentials)
+            await user_account_cache.aset(cache_key, user_account)
+            return user_account
+
+        return await _async_user_account_flight.ado(cache_key, request)
+
     def get_user(self, user_id: Any) -> User | None:
         """Get user from current session"""
         if not hasattr(self, "request"):
@@ -216,9 +256,34 @@ class DjangoAuthUserCompatibleBackend(UniversalAuthBackend):
             db_user.time_zone = getattr(user, "time_zone", None)
         return db_user
 
+    @staticmethod
+    def _get_django_user_cache_key(user_model: Any, username: str | None) -> tuple[str, str | None]:
+        return user_model._meta.label_lower, username
+
+    @staticmethod
+    def _get_known_django_user(cache_key: tuple[str, str | None]) -> Any:
+        db_user = django_user_cache.get(cache_key)
+        # 返回副本：兼容属性（token 等）是按请求写入的，不能写到缓存中的对象上
+        return copy.copy(db_user) if db_user is not None else None
+
+    @staticmethod
+    def _remember_django_user(cache_key: tuple[str, str | None], db_user: Any) -> None:
+        # 只缓存已存在的用户：不存在的用户随时可能被创建，不做否定缓存
+        if db_user is not None:
+            django_user_cache.set(cache_key, copy.copy(db_user), bkauth_settings.DJANGO_USER_CACHE_TIMEOUT)
+
     def connect_to_django_user(self, user: User) -> Any:
-        """Connect bkpaas_auth.User to the UserModel in the database."""
+        """Connect bkpaas_auth.User to the UserModel in the database.
+
+        已存在的数据库用户会在进程内缓存 BKAUTH_DJANGO_USER_CACHE_TIMEOUT 秒，缓存期内不再查询数据库，
+        因此对数据库用户的修改（如 is_active）最迟在该时间后生效。
+        """
         UserModel = get_user_model()  # noqa: N806
+        cache_key = self._get_django_user_cache_key(UserModel, user.username)
+        db_user = self._get_known_django_user(cache_key)
+        if db_user is not None:
+            return self._apply_compatible_attributes(db_user, user)
+
         if self.create_unknown_user:
             db_user, created = UserModel._default_manager.get_or_create(**{UserModel.USERNAME_FIELD: user.username})
             if created:
@@ -231,6 +296,7 @@ class DjangoAuthUserCompatibleBackend(UniversalAuthBackend):
                 logger.warning("User named %s not found!", user.username)
                 db_user = None
 
+        self._remember_django_user(cache_key, db_user)
         return self._apply_compatible_attributes(db_user, user)
 
     async def async_connect_to_django_user(self, user: User) -> Any:
@@ -243,6 +309,11 @@ class DjangoAuthUserCompatibleBackend(UniversalAuthBackend):
         异步请求链，应当同时重写本方法。
         """
         UserModel = get_user_model()  # noqa: N806
+        cache_key = self._get_django_user_cache_key(UserModel, user.username)
+        db_user = self._get_known_django_user(cache_key)
+        if db_user is not None:
+            return self._apply_compatible_attributes(db_user, user)
+
         lookup = {UserModel.USERNAME_FIELD: user.username}
         if self.create_unknown_user:
             db_user, created = await UserModel._default_manager.aget_or_create(**lookup)
@@ -256,6 +327,7 @@ class DjangoAuthUserCompatibleBackend(UniversalAuthBackend):
                 logger.warning("User named %s not found!", user.username)
                 db_user = None
 
+        self._remember_django_user(cache_key, db_user)
         return self._apply_compatible_attributes(db_user, user)
 
     @staticmethod
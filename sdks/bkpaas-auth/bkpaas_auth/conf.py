@@ -52,13 +52,39 @@ class Settings:
     TOKEN_USER_INFO_ENDPOINT: str | None = field(default_factory=get_settings("TOKEN_USER_INFO_ENDPOINT"))
     TOKEN_APP_CODE: str | None = field(default_factory=get_settings("TOKEN_APP_CODE"))
     TOKEN_SECRET_KEY: str | None = field(default_factory=get_settings("TOKEN_SECRET_KEY"))
+    # 批量获取用户详情时，同时请求 API 的最大并发数
+    USER_INFO_FETCH_CONCURRENCY: int = field(default_factory=get_settings("USER_INFO_FETCH_CONCURRENCY", default=10))
 
     LOGIN_TOKEN_EXPIRE_IN: int = field(default_factory=get_settings("LOGIN_TOKEN_EXPIRE_IN", default=24 * 60 * 60))
     SESSION_TIMEOUT: int = field(default_factory=get_settings("SESSION_TIMEOUT", default=5 * 60))
 
+    # 登录态校验结果（登录态哈希 -> 用户账号）的缓存秒数，不超过 SESSION_TIMEOUT，默认为 0 即不缓存。
+    # 开启后，已注销或被吊销的登录态在缓存过期前（最长为该秒数）仍会被认为有效
+    USER_ACCOUNT_CACHE_TIMEOUT: int = field(default_factory=get_settings("USER_ACCOUNT_CACHE_TIMEOUT", default=0))
+    # 缓存登录态校验结果的 Django cache 名称，为空时使用进程内缓存
+    USER_ACCOUNT_CACHE_NAME: str | None = field(default_factory=get_settings("USER_ACCOUNT_CACHE_NAME"))
+    # DjangoAuthUserCompatibleBackend 在进程内缓存已存在的数据库用户的秒数，为 0 时每次认证都查询数据库
+    DJANGO_USER_CACHE_TIMEOUT: int = field(default_factory=get_settings("DJANGO_USER_CACHE_TIMEOUT", default=60))
+
     # 请求第三方 API 设置
     REQUESTS_VERIFY: bool = field(default_factory=get_settings("REQUESTS_VERIFY", default=False))
     REQUESTS_CERT: str | None = field(default_factory=get_settings("REQUESTS_CERT"))
+    # 连接池中的最大连接数，超出后请求会排队等待，最多等待 HTTP_POOL_TIMEOUT 秒
+    HTTP_MAX_CONNECTIONS: int | None = field(default_factory=get_settings("HTTP_MAX_CONNECTIONS", default=20))
+    # 连接池中保持的最大空闲（keep-alive）连接数
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int | None = field(
+        default_factory=get_settings("HTTP_MAX_KEEPALIVE_CONNECTIONS", default=20)
+    )
+    # 空闲连接的最长保持秒数
+    HTTP_KEEPALIVE_EXPIRY: float | None = field(default_factory=get_settings("HTTP_KEEPALIVE_EXPIRY", default=5.0))
+    # 按 URL 前缀单独设置连接池上限，如 {"https://bk-login.example.com": {"max_connections": 50}}
+    HTTP_HOST_LIMITS: dict[str, dict[str, Any]] = field(default_factory=get_settings("HTTP_HOST_LIMITS", default={}))
+    # 单次请求总超时秒数，以及建立连接、等待连接池空闲连接的超时秒数（为空时与总超时相同）
+    HTTP_TIMEOUT: float = field(default_factory=get_settings("HTTP_TIMEOUT", default=30.0))
+    HTTP_CONNECT_TIMEOUT: float | None = field(default_factory=get_settings("HTTP_CONNECT_TIMEOUT", default=5.0))
+    HTTP_POOL_TIMEOUT: float | None = field(default_factory=get_settings("HTTP_POOL_TIMEOUT"))
+    # 是否启用 HTTP/2，需要额外安装 h2：pip install "httpx2[http2]"
+    HTTP_ENABLE_HTTP2: bool = field(default_factory=get_settings("HTTP_ENABLE_HTTP2", default=False))
 
     # Test data, optional
     USE_MOCKED_USER_INFO: bool = field(default_factory=get_settings("USE_MOCKED_USER_INFO", default=False))
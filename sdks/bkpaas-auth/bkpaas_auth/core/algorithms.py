@@ -1,5 +1,18 @@
 # -*- coding: utf-8 -*-
 from collections.abc import Iterator
+from functools import lru_cache
+from itertools import islice
+
+
+@lru_cache(maxsize=32)
+def _key_schedule(key: bytes) -> tuple[int, ...]:
+    """Run the key-scheduling algorithm, the result only depends on the key so it is computed once per key"""
+    s = list(range(0x100))
+    j = 0
+    for i in range(0x100):
+        j = (s[i] + key[i % len(key)] + j) & 0xFF
+        s[i], s[j] = s[j], s[i]
+    return tuple(s)
 
 
 class ARC4:
@@ -11,13 +24,7 @@ class ARC4:
     def __init__(self, key: bytes | bytearray) -> None:
         assert isinstance(key, (bytes, bytearray))
 
-        s = list(range(0x100))
-        j = 0
-        for i in range(0x100):
-            j = (s[i] + key[i % len(key)] + j) & 0xFF
-            s[i], s[j] = s[j], s[i]
-
-        self.s = s
+        self.s = list(_key_schedule(bytes(key)))
         self.key_stream = self._key_stream_generator()
 
     def encrypt(self, data: bytes | bytearray) -> bytes:
@@ -28,6 +35,13 @@ class ARC4:
         """解密数据"""
         return self._crypt(data)
 
+    def key_stream_prefix(self, length: int) -> bytes:
+        """Return the first `length` bytes of the key stream, the state of the instance is not affected
+
+        相同密钥下密钥流是固定的，调用方可以缓存该结果，加解密时直接与数据做异或，见 xor_bytes()
+        """
+        return bytes(islice(self._key_stream_generator(), length))
+
     def _crypt(self, data: bytes | bytearray) -> bytes:
         assert isinstance(data, (bytes, bytearray))
         return bytes([a ^ b for a, b in zip(data, self.key_stream)])
@@ -41,3 +55,11 @@ class ARC4:
             s[x], s[y] = s[y], s[x]
             i = (s[x] + s[y]) & 0xFF
             yield s[i]
+
+
+def xor_bytes(data: bytes | bytearray, key_stream: bytes) -> bytes:
+    """XOR the data with the head of a precomputed key stream, which must not be shorter than the data"""
+    length = len(data)
+    # 借助大整数异或一次完成，避免逐字节在 Python 层循环
+    mixed = int.from_bytes(data, "big") ^ int.from_bytes(key_stream[:length], "big")
+    return mixed.to_bytes(length, "big")
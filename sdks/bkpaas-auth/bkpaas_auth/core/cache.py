@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""进程内缓存与并发请求合并工具"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import CancelledError, Future
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from django.core.cache import BaseCache, caches
+
+from bkpaas_auth.conf import bkauth_settings
+
+if TYPE_CHECKING:
+    from bkpaas_auth.core.token import UserAccount
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class LocalCache:
+    """A thread-safe in-process LRU cache, every item expires after its own timeout."""
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, timeout: float) -> None:
+        if timeout <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SingleFlight:
+    """Collapse the concurrent calls with the same key into one call, the others wait for its result.
+
+    进行中的调用以 concurrent.futures.Future 表示，既可以被其他线程阻塞等待，也可以被任意事件循环中的
+    协程通过 asyncio.wrap_future 等待。同步调用与异步调用需使用不同的实例：如果同步调用在事件循环线程中
+    等待一个异步调用的结果，会阻塞该事件循环导致死锁。
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Any, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Any) -> tuple[Future, bool]:
+        """Return the call in flight and whether the caller should perform it."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _leave(self, key: Any, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key: Any, fn: Callable[[], _T]) -> _T:
+        future, is_leader = self._join(key)
+        if not is_leader:
+            try:
+                return future.result()
+            except CancelledError:
+                return fn()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._leave(key, future)
+
+    async def ado(self, key: Any, fn: Callable[[], Awaitable[_T]]) -> _T:
+        future, is_leader = self._join(key)
+        if not is_leader:
+            try:
+                # shield it, or the cancellation of a follower would cancel the call of the leader
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # the leader has been cancelled, call it by ourselves
+                return await fn()
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._leave(key, future)
+
+
+class UserAccountCache:
+    """Cache the user accounts verified by login credentials, keyed by the hash of the credentials.
+
+    默认使用进程内缓存，配置 BKAUTH_USER_ACCOUNT_CACHE_NAME 后使用对应的 Django cache，以便在多个进程间共享。
+    缓存时间不超过 BKAUTH_SESSION_TIMEOUT，保证登录态失效后最迟在该时间后被重新校验。
+    """
+
+    key_prefix = "bkauth::user_account::"
+
+    def __init__(self, max_size: int = 10000) -> None:
+        self._local_cache = LocalCache(max_size=max_size)
+
+    def make_key(self, namespace: str, credentials: dict[str, Any]) -> str:
+        """Make the cache key, the credentials are hashed to avoid leaking them"""
+        raw = json.dumps([namespace, credentials], sort_keys=True)
+        return self.key_prefix + hashlib.sha256(raw.encode()).hexdigest()
+
+    @property
+    def timeout(self) -> int:
+        return max(
+            min(
+                bkauth_settings.USER_ACCOUNT_CACHE_TIMEOUT,
+                bkauth_settings.SESSION_TIMEOUT,
+                bkauth_settings.LOGIN_TOKEN_EXPIRE_IN,
+            ),
+            0,
+        )
+
+    def _get_django_cache(self) -> BaseCache | None:
+        if not bkauth_settings.USER_ACCOUNT_CACHE_NAME:
+            return None
+        return caches[bkauth_settings.USER_ACCOUNT_CACHE_NAME]
+
+    def get(self, key: str) -> UserAccount | None:
+        if not self.timeout:
+            return None
+
+        django_cache = self._get_django_cache()
+        if django_cache is None:
+            return self._local_cache.get(key)
+
+        try:
+            return django_cache.get(key)
+        except Exception as e:
+            logger.warning("unable to get user account from cache: %s", e)
+            return None
+
+    def set(self, key: str, user_account: UserAccount) -> None:
+        timeout = self.timeout
+        if not timeout:
+            return
+
+        django_cache = self._get_django_cache()
+        if django_cache is None:
+            self._local_cache.set(key, user_account, timeout)
+            return
+
+        try:
+            django_cache.set(key, user_account, timeout=timeout)
+        except Exception as e:
+            logger.warning("unable to cache user account: %s", e)
+
+    async def aget(self, key: str) -> UserAccount | None:
+        """Asynchronous version of :meth:`get`."""
+        if not self.timeout:
+            return None
+
+        django_cache = self._get_django_cache()
+        if django_cache is None:
+            return self._local_cache.get(key)
+
+        try:
+            return await django_cache.aget(key)
+        except Exception as e:
+            logger.warning("unable to get user account from cache: %s", e)
+            return None
+
+    async def aset(self, key: str, user_account: UserAccount) -> None:
+        """Asynchronous version of :meth:`set`."""
+        timeout = self.timeout
+        if not timeout:
+            return
+
+        django_cache = self._get_django_cache()
+        if django_cache is None:
+            self._local_cache.set(key, user_account, timeout)
+            return
+
+        try:
+            await django_cache.aset(key, user_account, timeout=timeout)
+        except Exception as e:
+            logger.warning("unable to cache user account: %s", e)
+
+    def clear(self) -> None:
+        """Clear the in-process cache"""
+        self._local_cache.clear()
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import binascii
+from collections.abc import Iterable
 
-from bkpaas_auth.core.algorithms import ARC4
+from bkpaas_auth.core.algorithms import ARC4, xor_bytes
 from bkpaas_auth.core.constants import ProviderType
 
 
@@ -19,6 +20,14 @@ class BluekingUserIdEncoder:
     # It is not a real secret key, just for encoding the username
     secret_key = "jdvoqu3o4"
 
+    # 密钥固定时密钥流也是固定的，预先生成一段能覆盖常见用户名长度的密钥流，
+    # 编解码时直接异或，无需每次重新初始化 ARC4；遇到更长的用户名时按需扩展。
+    key_stream_prefix_size = 64
+
+    def __init__(self) -> None:
+        # (secret_key, key_stream)，作为一个整体替换，多线程下无需加锁
+        self._key_stream_cache: tuple[str, bytes] = ("", b"")
+
     def encode(self, provider_type: int | ProviderType, username: str | bytes) -> str:
         """Generate a hex string used as blueking user id
 
@@ -28,8 +37,8 @@ class BluekingUserIdEncoder:
         """
         id_prefix = ProviderType(provider_type).get_id_prefix()
 
-        encoded = ARC4(_ensure_binary(self.secret_key)).encrypt(_ensure_binary(username))
-        return id_prefix + _ensure_text(binascii.hexlify(encoded))
+        raw = _ensure_binary(username)
+        return id_prefix + xor_bytes(raw, self._get_key_stream(len(raw))).hex()
 
     def decode(self, user_id: str | bytes) -> tuple[int, str]:
         """Decode a given bk_user_id to the combination of (provider_type, username)
@@ -39,10 +48,46 @@ class BluekingUserIdEncoder:
         """
         text_id = _ensure_text(user_id)
         provider_type = int(text_id[:2])
-        encoded_username = text_id[2:]
+        encoded_username = binascii.unhexlify(text_id[2:])
 
-        decoded = ARC4(_ensure_binary(self.secret_key)).decrypt(binascii.unhexlify(encoded_username))
+        decoded = xor_bytes(encoded_username, self._get_key_stream(len(encoded_username)))
         return provider_type, _ensure_text(decoded)
 
+    def encode_many(self, provider_type: int | ProviderType, usernames: Iterable[str | bytes]) -> list[str]:
+        """Generate the blueking user ids for many usernames of the same provider type
+
+        :param provider_type: See constants.ProviderType
+        :param usernames: User uins or user rtx usernames
+        :returns: A list of hex strings, in the same order as usernames
+        """
+        id_prefix = ProviderType(provider_type).get_id_prefix()
+
+        raw_usernames = [_ensure_binary(username) for username in usernames]
+        key_stream = self._get_key_stream(max(map(len, raw_usernames), default=0))
+        return [id_prefix + xor_bytes(raw, key_stream).hex() for raw in raw_usernames]
+
+    def decode_many(self, user_ids: Iterable[str | bytes]) -> list[tuple[int, str]]:
+        """Decode many bk_user_ids to the combinations of (provider_type, username)
+
+        :param user_ids: Blueking user ids
+        :returns: A list of (provider_type, username), in the same order as user_ids
+        """
+        parsed = []
+        for user_id in user_ids:
+            text_id = _ensure_text(user_id)
+            parsed.append((int(text_id[:2]), binascii.unhexlify(text_id[2:])))
+
+        key_stream = self._get_key_stream(max((len(encoded) for _, encoded in parsed), default=0))
+        return [(provider_type, _ensure_text(xor_bytes(encoded, key_stream))) for provider_type, encoded in parsed]
+
+    def _get_key_stream(self, length: int) -> bytes:
+        """Return the key stream of secret_key, which is at least `length` bytes long"""
+        secret_key, key_stream = self._key_stream_cache
+        if secret_key != self.secret_key or len(key_stream) < length:
+            size = max(length, self.key_stream_prefix_size, len(key_stream) * 2)
+            key_stream = ARC4(_ensure_binary(self.secret_key)).key_stream_prefix(size)
+            self._key_stream_cache = (self.secret_key, key_stream)
+        return key_stream
+
 
 user_id_encoder = BluekingUserIdEncoder()
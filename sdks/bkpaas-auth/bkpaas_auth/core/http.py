@@ -13,7 +13,9 @@ import atexit
 import json
 import logging
 import threading
+import time
 import weakref
+from dataclasses import dataclass
 from typing import Any, TypeAlias
 
 import httpx2
@@ -27,11 +29,6 @@ logger = logging.getLogger(__name__)
 
 JSONValue: TypeAlias = dict[str, Any] | list[Any] | str | int | float | bool | None
 
-_HTTP_CLIENT_LIMITS = httpx2.Limits(max_connections=20, max_keepalive_connections=20)
-# 单次请求总耗时最多 30 秒，其中建立连接最多 5 秒。认证请求处于 Web 请求的关键路径上，
-# 必须有明确的超时上限，否则对端 hang 住会一直占用 worker。
-_HTTP_CLIENT_TIMEOUT = httpx2.Timeout(30.0, connect=5.0)
-
 _http_client: httpx2.Client | None = None
 
 # 异步客户端按事件循环分别保存，原因见 get_async_http_client() 的文档。使用弱引用字典，
@@ -43,15 +40,51 @@ _async_http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx
 _client_lock = threading.Lock()
 
 
-def _build_client_kwargs() -> dict[str, Any]:
+def _build_limits(overrides: dict[str, Any] | None = None) -> httpx2.Limits:
+    options: dict[str, Any] = {
+        "max_connections": bkauth_settings.HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": bkauth_settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "keepalive_expiry": bkauth_settings.HTTP_KEEPALIVE_EXPIRY,
+    }
+    options.update(overrides or {})
+    return httpx2.Limits(**options)
+
+
+def _build_timeout() -> httpx2.Timeout:
+    # 认证请求处于 Web 请求的关键路径上，必须有明确的超时上限，否则对端 hang 住会一直占用 worker。
+    # 连接池打满时等待空闲连接同样受超时限制，未单独配置时与总超时相同。
+    timeout = bkauth_settings.HTTP_TIMEOUT
+    return httpx2.Timeout(
+        timeout,
+        connect=bkauth_settings.HTTP_CONNECT_TIMEOUT or timeout,
+        pool=bkauth_settings.HTTP_POOL_TIMEOUT or timeout,
+    )
+
+
+def _build_client_kwargs(
+    transport_class: type[httpx2.HTTPTransport] | type[httpx2.AsyncHTTPTransport],
+) -> dict[str, Any]:
     """Build the shared keyword arguments for creating httpx clients."""
-    return {
+    kwargs: dict[str, Any] = {
         "verify": bkauth_settings.REQUESTS_VERIFY,
         "cert": bkauth_settings.REQUESTS_CERT,
-        "timeout": _HTTP_CLIENT_TIMEOUT,
+        "timeout": _build_timeout(),
         "follow_redirects": True,
-        "limits": _HTTP_CLIENT_LIMITS,
+        "limits": _build_limits(),
+        "http2": bkauth_settings.HTTP_ENABLE_HTTP2,
     }
+    if bkauth_settings.HTTP_HOST_LIMITS:
+        # httpx 的连接池上限是整个客户端共享的，为单独设置上限的 host 挂载独立的 transport
+        kwargs["mounts"] = {
+            pattern: transport_class(
+                verify=kwargs["verify"],
+                cert=kwargs["cert"],
+                http2=kwargs["http2"],
+                limits=_build_limits(overrides),
+            )
+            for pattern, overrides in bkauth_settings.HTTP_HOST_LIMITS.items()
+        }
+    return kwargs
 
 
 def get_http_client() -> httpx2.Client:
@@ -61,7 +94,7 @@ def get_http_client() -> httpx2.Client:
     if _http_client is None:
         with _client_lock:
             if _http_client is None:
-                _http_client = httpx2.Client(**_build_client_kwargs())
+                _http_client = httpx2.Client(**_build_client_kwargs(httpx2.HTTPTransport))
     return _http_client
 
 
@@ -87,7 +120,7 @@ def get_async_http_client() -> httpx2.AsyncClient:
         with _client_lock:
             client = _async_http_clients.get(loop)
             if client is None:
-                client = httpx2.AsyncClient(**_build_client_kwargs())
+                client = httpx2.AsyncClient(**_build_client_kwargs(httpx2.AsyncHTTPTransport))
                 _async_http_clients[loop] = client
     return client
 
@@ -105,9 +138,25 @@ def reset_http_clients() -> None:
         _async_http_clients.clear()
 
 
+# 这些配置在创建客户端时读取，变更后需要重建客户端，其余配置在每次请求时读取
+_CLIENT_SETTINGS = frozenset(
+    (
+        "BKAUTH_REQUESTS_VERIFY",
+        "BKAUTH_REQUESTS_CERT",
+        "BKAUTH_HTTP_MAX_CONNECTIONS",
+        "BKAUTH_HTTP_MAX_KEEPALIVE_CONNECTIONS",
+        "BKAUTH_HTTP_KEEPALIVE_EXPIRY",
+        "BKAUTH_HTTP_HOST_LIMITS",
+        "BKAUTH_HTTP_TIMEOUT",
+        "BKAUTH_HTTP_CONNECT_TIMEOUT",
+        "BKAUTH_HTTP_POOL_TIMEOUT",
+        "BKAUTH_HTTP_ENABLE_HTTP2",
+    )
+)
+
+
 def _reset_http_clients_on_setting_changed(*args, **kwargs) -> None:
-    # 只有 SSL 相关配置会影响已创建的客户端，其余配置在每次请求时读取，无需重建。
-    if kwargs.get("setting") in ("BKAUTH_REQUESTS_VERIFY", "BKAUTH_REQUESTS_CERT"):
+    if kwargs.get("setting") in _CLIENT_SETTINGS:
         reset_http_clients()
 
 
@@ -128,6 +177,90 @@ def _close_http_client_at_exit() -> None:
         client.close()
 
 
+@dataclass
+class HttpPoolStats:
+    """The usage of a connection pool, used to find out whether the pool limits are large enough
+
+    :param client: "sync" or "async", the stats of the async clients in all event loops are summed up
+    :param pattern: the URL pattern of the mounted transport, "all" for the default one
+    :param max_connections: the limit of connections, None means unlimited
+    :param active_connections: the connections serving requests
+    :param idle_connections: the keep-alive connections waiting for reuse
+    :param active_requests: the requests which have acquired a connection
+    :param waiting_requests: the requests waiting for a connection, the pool is saturated if it keeps above 0
+    """
+
+    client: str
+    pattern: str
+    max_connections: int | None
+    active_connections: int = 0
+    idle_connections: int = 0
+    active_requests: int = 0
+    waiting_requests: int = 0
+
+
+def get_http_pool_stats() -> list[HttpPoolStats]:
+    """Return the current usage of the connection pools of the shared clients."""
+    with _client_lock:
+        clients: list[tuple[str, httpx2.Client | httpx2.AsyncClient]] = [
+            ("async", client) for client in list(_async_http_clients.values())
+        ]
+        if _http_client is not None:
+            clients.insert(0, ("sync", _http_client))
+
+    stats: dict[tuple[str, str], HttpPoolStats] = {}
+    for client_type, client in clients:
+        for pattern, transport in _iter_transports(client):
+            pool = getattr(transport, "_pool", None)
+            if pool is None:
+                # 非默认的 transport（如测试中的 MockTransport）没有连接池
+                continue
+
+            key = (client_type, pattern)
+            if key not in stats:
+                stats[key] = HttpPoolStats(
+                    client_type, pattern, max_connections=getattr(pool, "_max_connections", None)
+                )
+            _collect_pool_stats(stats[key], pool)
+    return list(stats.values())
+
+
+# httpx/httpcore 没有公开 transport 与连接池的排队情况，以下私有属性都通过 getattr 读取，
+# 版本升级后属性不存在时只是统计项缺失（按 0 计），不会影响调用方
+
+
+def _iter_transports(client: httpx2.Client | httpx2.AsyncClient) -> list[tuple[str, Any]]:
+    transports = []
+    if (transport := getattr(client, "_transport", None)) is not None:
+        transports.append(("all", transport))
+    mounts = getattr(client, "_mounts", None) or {}
+    transports.extend((str(getattr(pattern, "pattern", pattern)), transport) for pattern, transport in mounts.items())
+    return transports
+
+
+def _collect_pool_stats(stats: HttpPoolStats, pool: Any) -> None:
+    # 只读取快照，不加连接池的锁，统计值可能有短暂偏差，不影响观测
+    active_connections = 0
+    for connection in list(getattr(pool, "connections", ())):
+        if connection.is_idle():
+            stats.idle_connections += 1
+        else:
+            active_connections += 1
+    stats.active_connections += active_connections
+
+    pool_requests = getattr(pool, "_requests", None)
+    if pool_requests is None:
+        # 无法获取请求队列时，认为每个使用中的连接上有一个请求
+        stats.active_requests += active_connections
+        return
+    for pool_request in list(pool_requests):
+        is_queued = getattr(pool_request, "is_queued", None)
+        if is_queued is not None and is_queued():
+            stats.waiting_requests += 1
+        else:
+            stats.active_requests += 1
+
+
 def build_req_details_str(
     method: str,
     url: str | httpx2.URL,
@@ -148,15 +281,60 @@ def build_req_details_str(
     return msg
 
 
-def _prepare_request(method: str, url: str | httpx2.URL, kwargs: dict[str, Any]) -> tuple[Any, Any, str]:
+class RequestDetails:
+    """The details of a request for logging, it is formatted only when a log record is actually emitted.
+
+    出站请求都在登录等关键路径上，日志级别未开启时不应为拼装日志付出脱敏和格式化的开销。
+    """
+
+    __slots__ = ("method", "url", "params", "data", "kwargs", "_formatted")
+
+    def __init__(self, method: str, url: str | httpx2.URL, params: Any, data: Any, kwargs: dict[str, Any]) -> None:
+        self.method = method
+        self.url = url
+        self.params = params
+        self.data = data
+        self.kwargs = kwargs
+        self._formatted: str | None = None
+
+    def __str__(self) -> str:
+        if self._formatted is None:
+            self._formatted = build_req_details_str(self.method, self.url, self.params, self.data, **self.kwargs)
+        return self._formatted
+
+    def log_fields(self, **fields: Any) -> dict[str, Any]:
+        """Return the structured fields for the `extra` of a log record, which are cheap to build"""
+        return {"http_method": self.method, "http_url": str(self.url), **fields}
+
+
+def _prepare_request(method: str, url: str | httpx2.URL, kwargs: dict[str, Any]) -> tuple[Any, Any, RequestDetails]:
     params = kwargs.pop("params", None)
     data = kwargs.pop("data", None)
 
-    req_details = build_req_details_str(method, url, params, data, **kwargs)
-    logger.debug("Sending HTTP request, req details: %s", req_details)
+    req_details = RequestDetails(method, url, params, data, kwargs)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sending HTTP request, req details: %s", req_details, extra=req_details.log_fields())
     return params, data, req_details
 
 
+def _log_response(resp: httpx2.Response, req_details: RequestDetails, started_at: float) -> None:
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+
+    elapsed = time.perf_counter() - started_at
+    logger.debug(
+        "Received HTTP response, status code: %s, elapsed: %.3fs, req details: %s",
+        resp.status_code,
+        elapsed,
+        req_details,
+        extra=req_details.log_fields(http_status_code=resp.status_code, http_elapsed=elapsed),
+    )
+
+
+def _log_request_error(req_details: RequestDetails) -> None:
+    logger.exception("http request error! req details: %s", req_details, extra=req_details.log_fields())
+
+
 # 一并捕获以保持“非法 URL 统一转成 HttpRequestError”的对外行为。
 _REQUEST_ERRORS = (httpx2.RequestError, httpx2.InvalidURL, TypeError)
 
@@ -164,24 +342,28 @@ _REQUEST_ERRORS = (httpx2.RequestError, httpx2.InvalidURL, TypeError)
 def _http_request(method: str, url: str | httpx2.URL, **kwargs) -> httpx2.Response:
     params, data, req_details = _prepare_request(method, url, kwargs)
 
+    started_at = time.perf_counter()
     try:
         resp = get_http_client().request(method, url, params=params, data=data, **kwargs)
     except _REQUEST_ERRORS as e:
-        logger.exception("http request error! req details: %s", req_details)
+        _log_request_error(req_details)
         raise HttpRequestError(f"http request error: {e}") from e
 
+    _log_response(resp, req_details, started_at)
     return resp
 
 
 async def _async_http_request(method: str, url: str | httpx2.URL, **kwargs) -> httpx2.Response:
     params, data, req_details = _prepare_request(method, url, kwargs)
 
+    started_at = time.perf_counter()
     try:
         resp = await get_async_http_client().request(method, url, params=params, data=data, **kwargs)
     except _REQUEST_ERRORS as e:
-        logger.exception("http request error! req details: %s", req_details)
+        _log_request_error(req_details)
         raise HttpRequestError(f"http request error: {e}") from e
 
+    _log_response(resp, req_details, started_at)
     return resp
 
 
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Export the usage of the HTTP connection pools as prometheus metrics, requires prometheus_client
+
+Usage::
+
+    from bkpaas_auth.core.prometheus import register_http_pool_collector
+
+    register_http_pool_collector()
+"""
+
+from collections.abc import Iterator
+
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from bkpaas_auth.core.http import get_http_pool_stats
+
+
+class HttpPoolCollector(Collector):
+    """Collect the stats of the connection pools when being scraped"""
+
+    def __init__(self, namespace: str = "bkpaas_auth") -> None:
+        self.namespace = namespace
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        labels = ["client", "pattern", "state"]
+        connections = GaugeMetricFamily(
+            f"{self.namespace}_http_pool_connections", "Connections in the HTTP connection pool", labels=labels
+        )
+        requests = GaugeMetricFamily(
+            f"{self.namespace}_http_pool_requests",
+            "Requests holding (active) or waiting for (waiting) a pooled HTTP connection",
+            labels=labels,
+        )
+        max_connections = GaugeMetricFamily(
+            f"{self.namespace}_http_pool_max_connections",
+            "The limit of connections in the HTTP connection pool",
+            labels=["client", "pattern"],
+        )
+
+        for stats in get_http_pool_stats():
+            connections.add_metric([stats.client, stats.pattern, "active"], stats.active_connections)
+            connections.add_metric([stats.client, stats.pattern, "idle"], stats.idle_connections)
+            requests.add_metric([stats.client, stats.pattern, "active"], stats.active_requests)
+            requests.add_metric([stats.client, stats.pattern, "waiting"], stats.waiting_requests)
+            if stats.max_connections is not None:
+                max_connections.add_metric([stats.client, stats.pattern], stats.max_connections)
+
+        yield connections
+        yield requests
+        yield max_connections
+
+
+def register_http_pool_collector(
+    registry: CollectorRegistry = REGISTRY, namespace: str = "bkpaas_auth"
+) -> HttpPoolCollector:
+    """Register the collector of the HTTP connection pools to the registry"""
+    collector = HttpPoolCollector(namespace)
+    registry.register(collector)
+    return collector
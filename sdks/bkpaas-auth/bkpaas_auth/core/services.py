@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Any, TypeVar
 
 from django.core.cache import cache
@@ -11,6 +14,7 @@ from django.core.exceptions import ImproperlyConfigured
 
 from bkpaas_auth.conf import bkauth_settings as conf
 from bkpaas_auth.conf import require_setting
+from bkpaas_auth.core.cache import SingleFlight
 from bkpaas_auth.core.exceptions import HttpRequestError, ServiceError
 from bkpaas_auth.core.http import async_http_get, http_get, resp_to_json
 from bkpaas_auth.core.user_info import BkUserInfo, RtxUserInfo, UserInfo
@@ -21,6 +25,14 @@ logger = logging.getLogger(__name__)
 TUserInfo = TypeVar("TUserInfo", bound=UserInfo)
 ResponseOkChecker = Callable[[dict[str, Any]], bool]
 
+_RTX_USER_INFO_CACHE_KEY_PREFIX = "bkauth::rests::get_rtx_user_info::"
+_BK_USER_INFO_CACHE_KEY_PREFIX = "bkauth::rests::get_bk_user_info::"
+_USER_INFO_CACHE_TIMEOUT = 86400
+
+# 合并对同一用户信息的并发请求，同步、异步调用需使用不同的实例，原因见 SingleFlight 的文档
+_user_info_flight = SingleFlight()
+_async_user_info_flight = SingleFlight()
+
 
 def get_app_credentials() -> dict[str, str]:
     """Get app credentials to verify app, which is required for requesting user info API"""
@@ -36,14 +48,14 @@ def get_rtx_user_info(username: str) -> RtxUserInfo | None:
     :param str username: RTX username
     """
 
-    cache_key = f"bkauth::rests::get_rtx_user_info::{username}"
+    cache_key = _RTX_USER_INFO_CACHE_KEY_PREFIX + username
     result = _get_and_cache_user_info(cache_key, {"login_name": username}, _rtx_response_ok)
     return _make_user_info(result, _rtx_response_ok, RtxUserInfo)
 
 
 async def async_get_rtx_user_info(username: str) -> RtxUserInfo | None:
     """Asynchronously get RTX user info, using the asynchronous cache and HTTP clients."""
-    cache_key = f"bkauth::rests::get_rtx_user_info::{username}"
+    cache_key = _RTX_USER_INFO_CACHE_KEY_PREFIX + username
     result = await _async_get_and_cache_user_info(cache_key, {"login_name": username}, _rtx_response_ok)
     return _make_user_info(result, _rtx_response_ok, RtxUserInfo)
 
@@ -55,18 +67,56 @@ def get_bk_user_info(username: str) -> BkUserInfo | None:
     :param str username: BK username
     """
 
-    cache_key = f"bkauth::rests::get_bk_user_info::{username}"
+    cache_key = _BK_USER_INFO_CACHE_KEY_PREFIX + username
     result = _get_and_cache_user_info(cache_key, {"bk_username": username}, _bk_response_ok)
     return _make_user_info(result, _bk_response_ok, BkUserInfo)
 
 
 async def async_get_bk_user_info(username: str) -> BkUserInfo | None:
     """Asynchronously get BK user info, using the asynchronous cache and HTTP clients."""
-    cache_key = f"bkauth::rests::get_bk_user_info::{username}"
+    cache_key = _BK_USER_INFO_CACHE_KEY_PREFIX + username
     result = await _async_get_and_cache_user_info(cache_key, {"bk_username": username}, _bk_response_ok)
     return _make_user_info(result, _bk_response_ok, BkUserInfo)
 
 
+def get_rtx_user_infos(usernames: Iterable[str]) -> dict[str, RtxUserInfo | None]:
+    """Get RTX user infos by many RTX usernames, the cache is read and written in batches,
+    only the users missing in cache are requested from the API.
+
+    :param usernames: RTX usernames
+    :returns: A dict of username to user info, the value is None if the user is not found
+    """
+    results = _get_and_cache_user_infos(_RTX_USER_INFO_CACHE_KEY_PREFIX, "login_name", usernames, _rtx_response_ok)
+    return {username: _make_user_info(result, _rtx_response_ok, RtxUserInfo) for username, result in results.items()}
+
+
+async def async_get_rtx_user_infos(usernames: Iterable[str]) -> dict[str, RtxUserInfo | None]:
+    """Asynchronous version of :func:`get_rtx_user_infos`."""
+    results = await _async_get_and_cache_user_infos(
+        _RTX_USER_INFO_CACHE_KEY_PREFIX, "login_name", usernames, _rtx_response_ok
+    )
+    return {username: _make_user_info(result, _rtx_response_ok, RtxUserInfo) for username, result in results.items()}
+
+
+def get_bk_user_infos(usernames: Iterable[str]) -> dict[str, BkUserInfo | None]:
+    """Get BK user infos by many BK usernames, the cache is read and written in batches,
+    only the users missing in cache are requested from the API.
+
+    :param usernames: BK usernames
+    :returns: A dict of username to user info, the value is None if the user is not found
+    """
+    results = _get_and_cache_user_infos(_BK_USER_INFO_CACHE_KEY_PREFIX, "bk_username", usernames, _bk_response_ok)
+    return {username: _make_user_info(result, _bk_response_ok, BkUserInfo) for username, result in results.items()}
+
+
+async def async_get_bk_user_infos(usernames: Iterable[str]) -> dict[str, BkUserInfo | None]:
+    """Asynchronous version of :func:`get_bk_user_infos`."""
+    results = await _async_get_and_cache_user_infos(
+        _BK_USER_INFO_CACHE_KEY_PREFIX, "bk_username", usernames, _bk_response_ok
+    )
+    return {username: _make_user_info(result, _bk_response_ok, BkUserInfo) for username, result in results.items()}
+
+
 def _get_user_info_request_params(user_params: dict[str, str]) -> dict[str, Any]:
     return {
         "headers": {
@@ -111,6 +161,22 @@ async def _async_get_cached_user_info(cache_key: str) -> Any:
         return None
 
 
+def _get_many_cached_user_infos(cache_keys: list[str]) -> dict[str, Any]:
+    try:
+        return cache.get_many(cache_keys)
+    except Exception as e:
+        logger.warning(f"unable to get user infos from cache: {e}")
+        return {}
+
+
+async def _async_get_many_cached_user_infos(cache_keys: list[str]) -> dict[str, Any]:
+    try:
+        return await cache.aget_many(cache_keys)
+    except Exception as e:
+        logger.warning(f"unable to get user infos from cache: {e}")
+        return {}
+
+
 def _fetch_user_info(user_params: dict[str, str], response_ok_checker: ResponseOkChecker) -> dict[str, Any] | None:
     try:
         endpoint = require_setting(conf.TOKEN_USER_INFO_ENDPOINT, "BKAUTH_TOKEN_USER_INFO_ENDPOINT")
@@ -143,13 +209,16 @@ def _get_and_cache_user_info(
     if cached_result:
         return cached_result
 
-    result = _fetch_user_info(user_params, response_ok_checker)
-    if result is None:
-        return None
+    def fetch_and_cache() -> dict[str, Any] | None:
+        result = _fetch_user_info(user_params, response_ok_checker)
+        if result is None:
+            return None
 
-    # 获取用户信息成后才缓存数据
-    cache.set(cache_key, result, timeout=86400)
-    return result
+        # 获取用户信息成后才缓存数据
+        cache.set(cache_key, result, timeout=_USER_INFO_CACHE_TIMEOUT)
+        return result
+
+    return _user_info_flight.do(cache_key, fetch_and_cache)
 
 
 async def _async_get_and_cache_user_info(
@@ -160,12 +229,109 @@ async def _async_get_and_cache_user_info(
     if cached_result:
         return cached_result
 
-    result = await _async_fetch_user_info(user_params, response_ok_checker)
-    if result is None:
-        return None
+    async def fetch_and_cache() -> dict[str, Any] | None:
+        result = await _async_fetch_user_info(user_params, response_ok_checker)
+        if result is None:
+            return None
 
-    await cache.aset(cache_key, result, timeout=86400)
-    return result
+        await cache.aset(cache_key, result, timeout=_USER_INFO_CACHE_TIMEOUT)
+        return result
+
+    return await _async_user_info_flight.ado(cache_key, fetch_and_cache)
+
+
+def _get_and_cache_user_infos(
+    cache_key_prefix: str, param_name: str, usernames: Iterable[str], response_ok_checker: ResponseOkChecker
+) -> dict[str, dict[str, Any] | None]:
+    """Get many user infos from cache by one `get_many`, fetch the missing ones from API concurrently
+    and cache them by one `set_many`.
+
+    :param str param_name: the param name of username, it may be different in different systems
+    :param callable response_ok_checker: determine get user is successful
+    :returns: A dict of username to the API result, in the order of given usernames
+    """
+    cache_keys = {username: cache_key_prefix + username for username in dict.fromkeys(usernames)}
+    cached_results = _get_many_cached_user_infos(list(cache_keys.values()))
+
+    results = {username: cached_results.get(cache_key) or None for username, cache_key in cache_keys.items()}
+    missing = [username for username, result in results.items() if result is None]
+    if not missing:
+        return results
+
+    def fetch(username: str) -> dict[str, Any] | None:
+        return _user_info_flight.do(
+            cache_keys[username], partial(_fetch_user_info, {param_name: username}, response_ok_checker)
+        )
+
+    # 用户信息 API 每次只能查询一个用户，按并发上限同时请求缺失的用户
+    with ThreadPoolExecutor(max_workers=_get_fetch_concurrency(len(missing))) as executor:
+        futures = [executor.submit(fetch, username) for username in missing]
+
+    fetched, error = {}, None
+    for username, future in zip(missing, futures):
+        try:
+            fetched[username] = future.result()
+        except Exception as e:
+            error = error or e
+
+    to_cache = _merge_fetched_user_infos(results, fetched, cache_keys)
+    if to_cache:
+        cache.set_many(to_cache, timeout=_USER_INFO_CACHE_TIMEOUT)
+    if error is not None:
+        raise error
+    return results
+
+
+async def _async_get_and_cache_user_infos(
+    cache_key_prefix: str, param_name: str, usernames: Iterable[str], response_ok_checker: ResponseOkChecker
+) -> dict[str, dict[str, Any] | None]:
+    """Asynchronous version of :func:`_get_and_cache_user_infos`."""
+    cache_keys = {username: cache_key_prefix + username for username in dict.fromkeys(usernames)}
+    cached_results = await _async_get_many_cached_user_infos(list(cache_keys.values()))
+
+    results = {username: cached_results.get(cache_key) or None for username, cache_key in cache_keys.items()}
+    missing = [username for username, result in results.items() if result is None]
+    if not missing:
+        return results
+
+    semaphore = asyncio.Semaphore(_get_fetch_concurrency(len(missing)))
+
+    async def fetch(username: str) -> dict[str, Any] | None:
+        async with semaphore:
+            return await _async_user_info_flight.ado(
+                cache_keys[username], partial(_async_fetch_user_info, {param_name: username}, response_ok_checker)
+            )
+
+    fetched_results = await asyncio.gather(*(fetch(username) for username in missing), return_exceptions=True)
+
+    fetched, error = {}, None
+    for username, result in zip(missing, fetched_results):
+        if isinstance(result, BaseException):
+            error = error or result
+        else:
+            fetched[username] = result
+
+    to_cache = _merge_fetched_user_infos(results, fetched, cache_keys)
+    if to_cache:
+        await cache.aset_many(to_cache, timeout=_USER_INFO_CACHE_TIMEOUT)
+    if error is not None:
+        raise error
+    return results
+
+
+def _get_fetch_concurrency(missing_count: int) -> int:
+    return max(min(missing_count, conf.USER_INFO_FETCH_CONCURRENCY), 1)
+
+
+def _merge_fetched_user_infos(
+    results: dict[str, dict[str, Any] | None],
+    fetched: dict[str, dict[str, Any] | None],
+    cache_keys: dict[str, str],
+) -> dict[str, dict[str, Any]]:
+    """Merge the fetched user infos into results, return the ones to be cached"""
+    results.update(fetched)
+    # 获取用户信息成后才缓存数据
+    return {cache_keys[username]: result for username, result in fetched.items() if result is not None}
 
 
 def _rtx_response_ok(result: dict[str, Any]) -> bool:
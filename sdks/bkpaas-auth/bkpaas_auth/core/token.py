@@ -57,6 +57,19 @@ class UserAccount(NamedTuple):
     tenant_id: str | None = None
 
 
+def _log_get_user_fail(credentials: dict[str, Any], resp_json: dict[str, Any]) -> None:
+    # 无效登录态的请求很常见，日志级别未开启时跳过对凭证的脱敏
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+
+    logger.debug(
+        "Get user fail, url: %s, params: %s, response: %s",
+        bkauth_settings.USER_COOKIE_VERIFY_URL,
+        scrub_data(credentials),
+        resp_json,
+    )
+
+
 class AbstractRequestBackend:
     def request_user_account(self, **credentials: Any) -> UserAccount:
         """Get user account through credentials
@@ -186,10 +199,7 @@ class TokenRequestBackend(AbstractRequestBackend):
             username = resp_json["data"]["bk_username"]
             return UserAccount(bk_username=username, display_name=username)
 
-        logger.debug(
-            f"Get user fail, url: {bkauth_settings.USER_COOKIE_VERIFY_URL}, "
-            f"params: {scrub_data(credentials)}, response: {resp_json}"
-        )
+        _log_get_user_fail(credentials, resp_json)
 
         # 用户认证成功，但用户无应用访问权限
         if code == ACCESS_PERMISSION_DENIED_CODE:
@@ -235,10 +245,7 @@ class RequestBackend(AbstractRequestBackend):
 
         # API 返回格式为：{"msg": "", "data": {"username": "xxx"}, "ret": 0}
         if resp_json.get("ret") != 0:
-            logger.debug(
-                f"Get user fail, url: {bkauth_settings.USER_COOKIE_VERIFY_URL}, "
-                f"params: {scrub_data(credentials)}, response: {resp_json}"
-            )
+            _log_get_user_fail(credentials, resp_json)
             raise InvalidTokenCredentialsError("Invalid credentials given")
 
         username = resp_json["data"]["username"]
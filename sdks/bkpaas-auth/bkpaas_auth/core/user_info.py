@@ -34,9 +34,11 @@ class UserInfo:
         if self.provider_type is None:
             raise ValueError("provider_type is required to provide user")
 
-        user.provider_type = self.provider_type
-        user.username = self.username
-        user.bkpaas_user_id = user_id_encoder.encode(self.provider_type, self.username)
+        # 用户身份未变化时无需重新编码 bkpaas_user_id
+        if user.provider_type != self.provider_type or user.username != self.username:
+            user.provider_type = self.provider_type
+            user.username = self.username
+            user.bkpaas_user_id = user_id_encoder.encode(self.provider_type, self.username)
 
         user.update_user_info(self.__dict__)
         return user
@@ -1,16 +1,20 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
+import threading
 import time
 from collections.abc import Awaitable, Callable
 from enum import Enum
+from functools import lru_cache
 from typing import Any, cast
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.contrib import auth
 from django.http import HttpRequest, HttpResponse
+from django.test.signals import setting_changed
 from django.utils import timezone as dj_timezone
+from django.utils.crypto import constant_time_compare
 from django.utils.functional import SimpleLazyObject, empty
 
 from bkpaas_auth.backends import UniversalAuthBackend
@@ -22,6 +26,45 @@ logger = logging.getLogger(__name__)
 # Django 传入的下一层调用：同步链路直接返回响应，异步链路返回响应的 awaitable
 GetResponse = Callable[[HttpRequest], HttpResponse | Awaitable[HttpResponse]]
 
+# 中间件只用 backend 读取登录凭证和 session 中的 token，进程内共享一个实例即可
+_auth_backend: UniversalAuthBackend | None = None
+_auth_backend_lock = threading.Lock()
+
+
+def get_auth_backend() -> UniversalAuthBackend:
+    """Return the UniversalAuthBackend shared by the middlewares in current process."""
+    global _auth_backend
+
+    if _auth_backend is None:
+        with _auth_backend_lock:
+            if _auth_backend is None:
+                _auth_backend = UniversalAuthBackend()
+    return _auth_backend
+
+
+def _reset_auth_backend(*args, **kwargs) -> None:
+    global _auth_backend
+
+    # backend 的类型由 BKAUTH_BACKEND_TYPE 决定，配置变更后重新创建
+    if str(kwargs.get("setting", "")).startswith("BKAUTH_"):
+        _auth_backend = None
+
+
+setting_changed.connect(_reset_auth_backend)
+
+
+@lru_cache(maxsize=256)
+def get_zone_info(tz_name: str) -> ZoneInfo | None:
+    """Return the zone of the given timezone name, None if it is invalid.
+
+    用户时区的取值有限，进程内缓存名称到时区的映射（包括无效的名称），非法时区不再在每个请求中抛出异常并打印日志
+    """
+    try:
+        return ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        logger.warning("Invalid time_zone '%s', fallback to default. Error: %s", tz_name, str(e))
+        return None
+
 
 class AuthenticationResult(Enum):
     """`CookieLoginMiddleware` 对认证结果的分类"""
@@ -102,6 +145,19 @@ class CookieLoginMiddleware:
             "user_token": user.token.dump_json(),
         }
 
+    @staticmethod
+    def _is_session_user(user: Any, session_user: tuple[Any, Any, Any]) -> bool:
+        """Whether the session has been logged in as the user, in which case `auth.login` is unnecessary
+
+        :param session_user: the user id, backend path and auth hash stored in session by `auth.login`
+        """
+        user_id, backend_path, session_hash = session_user
+        if user_id != user._meta.pk.value_to_string(user) or backend_path != user.backend:
+            return False
+
+        user_hash = user.get_session_auth_hash() if hasattr(user, "get_session_auth_hash") else ""
+        return constant_time_compare(session_hash or "", user_hash)
+
     @staticmethod
     def _clear_async_user_cache(request: HttpRequest) -> None:
         if hasattr(request, "_acached_user"):
@@ -110,7 +166,7 @@ class CookieLoginMiddleware:
     def process_request(self, request: HttpRequest) -> HttpResponse | None:
         self._assert_session_middleware(request)
 
-        backend = UniversalAuthBackend()
+        backend = get_auth_backend()
         credentials = backend.get_credentials(request)
 
         # No credentials, call logout
@@ -130,7 +186,7 @@ class CookieLoginMiddleware:
         """Asynchronous counterpart of :meth:`process_request`."""
         self._assert_session_middleware(request)
 
-        backend = UniversalAuthBackend()
+        backend = get_auth_backend()
         credentials = backend.get_credentials(request)
         if not credentials:
             await auth.alogout(request)
@@ -182,17 +238,29 @@ class CookieLoginMiddleware:
 
         logger.debug("Authentication finished, username: %s", user.username)
 
-        # Calling `auth.login` will rotate CSRF token and modify user session, only do this when the authenticated
-        # user was different with the user stored in session. Otherwise CSRF token validation may fail due to the
-        # rotation.
+        # Calling `auth.login` will rotate CSRF token and cycle the session key, only do this when the session
+        # was not logged in as the authenticated user. Otherwise CSRF token validation may fail due to the
+        # rotation, and the session is written to the store one more time.
         #
         # NOTE: 必须先登录再写入 session 数据。当 session 中已存在其他用户时，`auth.login()`
         # 内部会调用 `session.flush()` 清空整个 session，若先写数据就会被一并清掉，导致
         # user_token / auth_credentials 丢失、每个请求都要重新认证。
-        if getattr(request, "user", None) != user:
+        session = request.session
+        session_user = (
+            session.get(auth.SESSION_KEY),
+            session.get(auth.BACKEND_SESSION_KEY),
+            session.get(auth.HASH_SESSION_KEY),
+        )
+        if self._is_session_user(user, session_user):
+            request.user = user
+        else:
             auth.login(request, user)
 
-        request.session.update(self._get_session_data(user, credentials))
+        # 只写入有变化的数据，数据没有变化时 session 不会被标记为 modified，也就不会写入存储
+        session_data = self._get_session_data(user, credentials)
+        changed = {key: value for key, value in session_data.items() if session.get(key) != value}
+        if changed:
+            session.update(changed)
 
     async def async_authenticate_and_login(self, request: HttpRequest, credentials: dict[str, str]) -> None:
         """Asynchronously authenticate credentials and log the user in or out."""
@@ -210,12 +278,20 @@ class CookieLoginMiddleware:
 
         # NOTE: 与同步版本一样，必须先登录再写入 session 数据，避免 `auth.alogin()` 内部的
         # `session.aflush()` 把刚写入的数据清掉。
-        current_user = await request.auser() if hasattr(request, "auser") else getattr(request, "user", None)
-        if current_user != user:
+        session = request.session
+        session_user = (
+            await session.aget(auth.SESSION_KEY),
+            await session.aget(auth.BACKEND_SESSION_KEY),
+            await session.aget(auth.HASH_SESSION_KEY),
+        )
+        if not self._is_session_user(user, session_user):
             await auth.alogin(request, user)
-            request._acached_user = user
+        request._acached_user = user
 
-        await request.session.aupdate(self._get_session_data(user, credentials))
+        session_data = self._get_session_data(user, credentials)
+        changed = {key: value for key, value in session_data.items() if await session.aget(key) != value}
+        if changed:
+            await session.aupdate(changed)
 
 
 class UserTimezoneMiddleware:
@@ -264,20 +340,11 @@ class UserTimezoneMiddleware:
         tz_name = getattr(user, "time_zone", None)
 
         # Try to activate user's timezone if it's a non-empty string
-        if tz_name and isinstance(tz_name, str):
-            try:
-                user_tz = ZoneInfo(tz_name)
-                dj_timezone.activate(user_tz)
-            except ZoneInfoNotFoundError as e:
-                logger.warning(
-                    "Invalid time_zone '%s' for user '%s', fallback to default. Error: %s",
-                    tz_name,
-                    user.username,
-                    str(e),
-                )
-            else:
-                logger.debug("Activated timezone '%s' for user '%s'", tz_name, user.username)
-                return
+        user_tz = get_zone_info(tz_name) if tz_name and isinstance(tz_name, str) else None
+        if user_tz is not None:
+            dj_timezone.activate(user_tz)
+            logger.debug("Activated timezone '%s' for user '%s'", tz_name, user.username)
+            return
 
         # Fallback to default timezone when time_zone is empty or invalid
         dj_timezone.activate(dj_timezone.get_default_timezone())
@@ -61,19 +61,26 @@ class AbstractUserWithProvider(models.AbstractBaseUser, models.AnonymousUser):
         # Set user info fields to default value: None
         self.update_user_info({}, overwrite_all=True)
 
-    def update_user_info(self, info_dict: dict[str, Any], overwrite_all: bool = False) -> None:
-        """Update current user info by dict
+    def update_user_info(self, info_dict: dict[str, Any], overwrite_all: bool = False) -> list[str]:
+        """Update current user info by dict, the fields whose values are unchanged are skipped
 
         :param overwrite_all: if True, will set emitted field to None if that field is not
             provided by info_dict
+        :returns: the names of the changed fields
         """
+        changed_fields = []
         for field in self.USERINFO_FIELDS:
-            try:
+            if field in info_dict:
                 value = info_dict[field]
+            elif overwrite_all:
+                value = None
+            else:
+                continue
+
+            if field not in self.__dict__ or self.__dict__[field] != value:
                 setattr(self, field, value)
-            except KeyError:
-                if overwrite_all:
-                    setattr(self, field, None)
+                changed_fields.append(field)
+        return changed_fields
 
     def save(self, *args: Any, **kwargs: Any) -> None:
         pass
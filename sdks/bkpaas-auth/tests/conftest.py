@@ -106,3 +106,11 @@ def get_rtx_user_info_response(settings):
         "result": True,
         "request_id": "ed3c8f75-d956-4dcd-b5d0-7bcd6c2e386a",
     }
+
+
+@pytest.fixture(autouse=True)
+def _clear_user_account_cache():
+    from bkpaas_auth.backends import django_user_cache, user_account_cache
+
+    user_account_cache.clear()
+    django_user_cache.clear()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+
+import pytest
+
+from bkpaas_auth.core.cache import LocalCache, SingleFlight, UserAccountCache
+from bkpaas_auth.core.token import UserAccount
+
+
+class TestLocalCache:
+    def test_get_set(self):
+        cache = LocalCache(max_size=10)
+        assert cache.get("key") is None
+        assert cache.get("key", "default") == "default"
+
+        cache.set("key", None, 10)
+        assert cache.get("key", "default") is None
+
+        cache.delete("key")
+        assert cache.get("key", "default") == "default"
+
+    def test_expired(self, mocker):
+        monotonic = mocker.patch("bkpaas_auth.core.cache.time.monotonic", return_value=100)
+        cache = LocalCache(max_size=10)
+        cache.set("key", "value", 10)
+
+        monotonic.return_value = 109
+        assert cache.get("key") == "value"
+
+        monotonic.return_value = 110
+        assert cache.get("key") is None
+
+    def test_max_size(self):
+        cache = LocalCache(max_size=2)
+        cache.set("a", 1, 10)
+        cache.set("b", 2, 10)
+        cache.get("a")
+        cache.set("c", 3, 10)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestSingleFlight:
+    def test_do(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        calls = []
+
+        def call():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "result"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("key", call)))
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=lambda: results.append(flight.do("key", call))) for _ in range(5)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        assert results == ["result"] * 6
+        assert len(calls) == 1
+
+    def test_do_error(self):
+        flight = SingleFlight()
+
+        def call():
+            raise ValueError("error")
+
+        with pytest.raises(ValueError, match="error"):
+            flight.do("key", call)
+
+        # the failed call is not remembered
+        assert flight.do("key", lambda: "result") == "result"
+
+    @pytest.mark.asyncio
+    async def test_ado(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(*[flight.ado("key", call) for _ in range(10)])
+
+        assert results == ["result"] * 10
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_ado_error(self):
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.05)
+            raise ValueError("error")
+
+        results = await asyncio.gather(*[flight.ado("key", call) for _ in range(3)], return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_ado_follower_cancelled(self):
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.ensure_future(flight.ado("key", call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.ado("key", call))
+        await asyncio.sleep(0)
+        follower.cancel()
+
+        assert await leader == "result"
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+
+    @pytest.mark.asyncio
+    async def test_ado_leader_cancelled(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.ensure_future(flight.ado("key", call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.ado("key", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "result"
+        assert len(calls) == 2
+
+
+class TestUserAccountCache:
+    @pytest.fixture(autouse=True)
+    def _enable_cache(self, settings):
+        settings.BKAUTH_USER_ACCOUNT_CACHE_TIMEOUT = 60
+
+    @pytest.fixture
+    def user_account(self):
+        return UserAccount(bk_username="foo", display_name="Foo")
+
+    def test_make_key(self):
+        cache = UserAccountCache()
+        key = cache.make_key("backend", {"bk_token": "secret"})
+
+        assert key.startswith(UserAccountCache.key_prefix)
+        assert "secret" not in key
+        assert key == cache.make_key("backend", {"bk_token": "secret"})
+        assert key != cache.make_key("other", {"bk_token": "secret"})
+
+    def test_timeout(self, settings):
+        settings.BKAUTH_USER_ACCOUNT_CACHE_TIMEOUT = 600
+        settings.BKAUTH_SESSION_TIMEOUT = 300
+        assert UserAccountCache().timeout == 300
+
+        settings.BKAUTH_USER_ACCOUNT_CACHE_TIMEOUT = 30
+        assert UserAccountCache().timeout == 30
+
+    def test_local_cache(self, user_account):
+        cache = UserAccountCache()
+        cache.set("key", user_account)
+
+        assert cache.get("key") == user_account
+
+    def test_disabled(self, settings, user_account):
+        settings.BKAUTH_USER_ACCOUNT_CACHE_TIMEOUT = 0
+        cache = UserAccountCache()
+        cache.set("key", user_account)
+
+        assert cache.get("key") is None
+
+    def test_django_cache(self, settings, user_account):
+        settings.CACHES = {"accounts": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        settings.BKAUTH_USER_ACCOUNT_CACHE_NAME = "accounts"
+        cache = UserAccountCache()
+        cache.set("key", user_account)
+
+        assert cache.get("key") == user_account
+        assert cache._local_cache.get("key") is None
+
+    @pytest.mark.asyncio
+    async def test_async(self, user_account):
+        cache = UserAccountCache()
+        await cache.aset("key", user_account)
+
+        assert await cache.aget("key") == user_account
+        assert cache.get("key") == user_account
+
+
+def test_user_account_cache_disabled_by_default():
+    cache = UserAccountCache()
+    cache.set("key", UserAccount(bk_username="foo", display_name="Foo"))
+
+    assert cache.timeout == 0
+    assert cache.get("key") is None
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 import pytest
 
+from bkpaas_auth.core.algorithms import ARC4, xor_bytes
 from bkpaas_auth.core.constants import ProviderType
-from bkpaas_auth.core.encoder import user_id_encoder
+from bkpaas_auth.core.encoder import BluekingUserIdEncoder, user_id_encoder
 
 
 class TestUserIdGeneration:
@@ -33,3 +34,68 @@ class TestUserIdGeneration:
     )
     def test_decode(self, input, expected_decoded):
         assert user_id_encoder.decode(input) == expected_decoded
+
+
+def _encode_with_arc4(provider_type, username):
+    """The encoding without any precomputation, used as the reference"""
+    encoded = ARC4(BluekingUserIdEncoder.secret_key.encode()).encrypt(username.encode())
+    return ProviderType(provider_type).get_id_prefix() + encoded.hex()
+
+
+USERNAMES = ["", "3", "admin", "blueking", "蓝鲸用户", "a" * 64, "user-" * 30]
+
+
+class TestUserIdFastPath:
+    @pytest.mark.parametrize("username", USERNAMES)
+    def test_same_as_arc4(self, username):
+        encoder = BluekingUserIdEncoder()
+
+        user_id = encoder.encode(ProviderType.BK, username)
+        assert user_id == _encode_with_arc4(ProviderType.BK, username)
+        assert encoder.decode(user_id) == (ProviderType.BK, username)
+
+    def test_encode_many(self):
+        user_ids = BluekingUserIdEncoder().encode_many(ProviderType.RTX, USERNAMES)
+        assert user_ids == [_encode_with_arc4(ProviderType.RTX, username) for username in USERNAMES]
+
+    def test_decode_many(self):
+        user_ids = [_encode_with_arc4(ProviderType.RTX, username) for username in USERNAMES]
+        assert BluekingUserIdEncoder().decode_many(user_ids) == [(2, username) for username in USERNAMES]
+
+    def test_empty_many(self):
+        encoder = BluekingUserIdEncoder()
+        assert encoder.encode_many(ProviderType.RTX, []) == []
+        assert encoder.decode_many([]) == []
+
+    def test_key_stream_extended(self):
+        encoder = BluekingUserIdEncoder()
+        encoder.encode(ProviderType.RTX, "admin")
+        assert len(encoder._key_stream_cache[1]) == encoder.key_stream_prefix_size
+
+        username = "x" * (encoder.key_stream_prefix_size + 1)
+        assert encoder.encode(ProviderType.RTX, username) == _encode_with_arc4(ProviderType.RTX, username)
+        assert len(encoder._key_stream_cache[1]) > encoder.key_stream_prefix_size
+
+    def test_secret_key_changed(self):
+        encoder = BluekingUserIdEncoder()
+        encoder.encode(ProviderType.RTX, "admin")
+
+        encoder.secret_key = "another"
+        expected = ARC4(b"another").encrypt(b"admin").hex()
+        assert encoder.encode(ProviderType.RTX, "admin") == "02" + expected
+
+
+class TestARC4:
+    def test_key_stream_prefix(self):
+        arc4 = ARC4(b"jdvoqu3o4")
+        prefix = arc4.key_stream_prefix(16)
+
+        assert len(prefix) == 16
+        # the state of the instance is not affected
+        assert arc4.encrypt(bytes(16)) == prefix
+        assert arc4.encrypt(bytes(16)) != prefix
+
+    def test_xor_bytes(self):
+        key_stream = ARC4(b"key").key_stream_prefix(32)
+        assert xor_bytes(b"hello", key_stream) == ARC4(b"key").encrypt(b"hello")
+        assert xor_bytes(b"", key_stream) == b""
@@ -2,7 +2,12 @@
 import asyncio
 import gc
 import json
+import logging
+import threading
+import time
 import weakref
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import mock
 
 import httpx2
@@ -23,9 +28,10 @@ from bkpaas_auth.core.http import (
 EXPECTED_CLIENT_KWARGS = {
     "verify": False,
     "cert": None,
-    "timeout": http._HTTP_CLIENT_TIMEOUT,
+    "timeout": httpx2.Timeout(30.0, connect=5.0),
     "follow_redirects": True,
-    "limits": http._HTTP_CLIENT_LIMITS,
+    "limits": httpx2.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=5.0),
+    "http2": False,
 }
 
 
@@ -40,8 +46,10 @@ def isolated_clients():
 
 def test_client_timeout_is_bounded():
     """认证请求位于关键路径上，必须有明确的超时上限"""
-    assert http._HTTP_CLIENT_TIMEOUT.read == 30.0
-    assert http._HTTP_CLIENT_TIMEOUT.connect == 5.0
+    timeout = http._build_timeout()
+    assert timeout.read == 30.0
+    assert timeout.connect == 5.0
+    assert timeout.pool == 30.0
 
 
 def test_get_http_client_reuses_configured_client(isolated_clients):
@@ -101,6 +109,157 @@ def test_clients_are_rebuilt_after_ssl_settings_changed(isolated_clients):
     assert client_class.call_args_list[1].kwargs["verify"] is True
 
 
+def test_client_configured_by_settings(settings, isolated_clients):
+    settings.BKAUTH_HTTP_MAX_CONNECTIONS = 100
+    settings.BKAUTH_HTTP_MAX_KEEPALIVE_CONNECTIONS = 50
+    settings.BKAUTH_HTTP_KEEPALIVE_EXPIRY = 30.0
+    settings.BKAUTH_HTTP_TIMEOUT = 10.0
+    settings.BKAUTH_HTTP_CONNECT_TIMEOUT = 2.0
+    settings.BKAUTH_HTTP_POOL_TIMEOUT = 1.0
+
+    with mock.patch("httpx2.Client") as client_class:
+        get_http_client()
+
+    kwargs = client_class.call_args.kwargs
+    assert kwargs["limits"] == httpx2.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=30.0)
+    assert kwargs["timeout"] == httpx2.Timeout(10.0, connect=2.0, pool=1.0)
+    assert "mounts" not in kwargs
+
+
+def test_client_host_limits(settings, isolated_clients):
+    settings.BKAUTH_HTTP_HOST_LIMITS = {"https://login.example.com": {"max_connections": 50}}
+
+    client = get_http_client()
+
+    stats = {item.pattern: item for item in http.get_http_pool_stats()}
+    assert stats["all"].max_connections == 20
+    assert stats["https://login.example.com"].max_connections == 50
+    assert client._transport_for_url(httpx2.URL("https://login.example.com/user"))._pool._max_connections == 50
+
+
+def test_client_http2(settings, isolated_clients):
+    settings.BKAUTH_HTTP_ENABLE_HTTP2 = True
+
+    with mock.patch("httpx2.Client") as client_class:
+        get_http_client()
+
+    assert client_class.call_args.kwargs["http2"] is True
+
+
+def test_clients_are_rebuilt_after_pool_settings_changed(isolated_clients):
+    first_client = get_http_client()
+
+    with override_settings(BKAUTH_HTTP_MAX_CONNECTIONS=100):
+        second_client = get_http_client()
+
+    assert first_client is not second_client
+
+
+class _PoolHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    release = threading.Event()
+
+    def do_GET(self):  # noqa: N802
+        self.release.wait(timeout=5)
+        body = b'{"result": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def blocking_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PoolHandler)
+    server.daemon_threads = True
+    _PoolHandler.release.clear()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield "http://%s:%s" % server.server_address
+    _PoolHandler.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_http_pool_stats(settings, isolated_clients, blocking_server):
+    settings.BKAUTH_HTTP_MAX_CONNECTIONS = 2
+    assert http.get_http_pool_stats() == []
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(http_get, blocking_server) for _ in range(3)]
+
+        def saturated():
+            (stats,) = http.get_http_pool_stats()
+            return stats.active_requests == 2 and stats.waiting_requests == 1
+
+        _wait_for(saturated)
+        (stats,) = http.get_http_pool_stats()
+        assert stats.client == "sync"
+        assert stats.max_connections == 2
+        assert stats.active_connections == 2
+
+        _PoolHandler.release.set()
+        assert all(future.result().status_code == 200 for future in futures)
+
+    (stats,) = http.get_http_pool_stats()
+    assert (stats.active_requests, stats.waiting_requests, stats.active_connections) == (0, 0, 0)
+    assert stats.idle_connections == 2
+
+
+@pytest.mark.asyncio
+async def test_async_http_pool_stats(isolated_clients):
+    get_async_http_client()
+
+    (stats,) = http.get_http_pool_stats()
+    assert stats.client == "async"
+    assert stats.waiting_requests == 0
+
+
+def test_http_pool_stats_without_private_attributes(isolated_clients):
+    """httpx/httpcore 升级后私有属性不存在时，统计退化为只依据公开的 connections"""
+    connections = [mock.Mock(**{"is_idle.return_value": idle}) for idle in (True, False, False)]
+    transport = mock.Mock(spec=["_pool"], _pool=mock.Mock(spec=["connections"], connections=connections))
+    client = mock.Mock(spec=["_transport"], _transport=transport)
+
+    with mock.patch.object(http, "_http_client", client):
+        (stats,) = http.get_http_pool_stats()
+
+    assert stats == http.HttpPoolStats(
+        "sync", "all", max_connections=None, active_connections=2, idle_connections=1, active_requests=2
+    )
+
+
+def test_http_pool_stats_without_transport(isolated_clients):
+    with mock.patch.object(http, "_http_client", mock.Mock(spec=[])):
+        assert http.get_http_pool_stats() == []
+
+
+def test_prometheus_collector(isolated_clients):
+    from prometheus_client import CollectorRegistry
+
+    from bkpaas_auth.core.prometheus import register_http_pool_collector
+
+    registry = CollectorRegistry()
+    register_http_pool_collector(registry)
+    get_http_client()
+
+    labels = {"client": "sync", "pattern": "all"}
+    assert registry.get_sample_value("bkpaas_auth_http_pool_max_connections", labels) == 20
+    assert registry.get_sample_value("bkpaas_auth_http_pool_requests", dict(labels, state="waiting")) == 0
+    assert registry.get_sample_value("bkpaas_auth_http_pool_connections", dict(labels, state="active")) == 0
+
+
 def test_http_get_uses_sync_client():
     expected_response = httpx2.Response(200, json={"result": True})
 
@@ -175,6 +334,57 @@ async def test_async_http_get_translates_invalid_url_type():
         await async_http_get(None)  # type: ignore[arg-type]
 
 
+class TestRequestLogging:
+    @pytest.fixture
+    def mocked_request(self):
+        with mock.patch("httpx2.Client.request", return_value=httpx2.Response(200, json={"result": True})) as request:
+            yield request
+
+    def test_not_formatted_when_disabled(self, caplog, mocked_request):
+        caplog.set_level(logging.INFO, logger="bkpaas_auth.core.http")
+
+        with mock.patch("bkpaas_auth.core.http.scrub_data") as scrub_data:
+            http_get("https://example.com/user", params={"bk_token": "s3cr3t-token"})
+
+        scrub_data.assert_not_called()
+        assert not caplog.records
+
+    def test_structured_fields(self, caplog, mocked_request):
+        caplog.set_level(logging.DEBUG, logger="bkpaas_auth.core.http")
+
+        http_get("https://example.com/user", params={"bk_token": "s3cr3t-token"})
+
+        sending, received = caplog.records
+        assert sending.http_method == "GET"
+        assert sending.http_url == "https://example.com/user"
+        assert received.http_status_code == 200
+        assert received.http_elapsed >= 0
+        assert "bk_token" in received.getMessage()
+        assert "s3cr3t-token" not in received.getMessage()
+
+    def test_formatted_once(self, caplog, mocked_request):
+        caplog.set_level(logging.DEBUG, logger="bkpaas_auth.core.http")
+
+        with mock.patch("bkpaas_auth.core.http.build_req_details_str", return_value="details") as build:
+            http_get("https://example.com/user")
+            messages = [record.getMessage() for record in caplog.records]
+
+        assert all(message.endswith("details") for message in messages)
+        build.assert_called_once()
+
+    def test_request_error(self, caplog):
+        caplog.set_level(logging.INFO, logger="bkpaas_auth.core.http")
+
+        with mock.patch("httpx2.Client.request", side_effect=httpx2.ConnectError("refused")), pytest.raises(
+            HttpRequestError
+        ):
+            http_get("https://example.com/user", params={"bk_token": "s3cr3t-token"})
+
+        (record,) = caplog.records
+        assert record.http_url == "https://example.com/user"
+        assert "s3cr3t-token" not in record.getMessage()
+
+
 def test_build_req_details_str_scrubs_sensitive_headers():
     """X-Bkapi-Authorization 里含有应用密钥和用户票据，不能明文出现在日志中"""
     msg = build_req_details_str(
@@ -1,14 +1,25 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
 
+from bkpaas_auth.core.exceptions import HttpRequestError, ServiceError
 from bkpaas_auth.core.services import (
     async_get_bk_user_info,
+    async_get_bk_user_infos,
     async_get_rtx_user_info,
+    async_get_rtx_user_infos,
     conf,
     get_app_credentials,
+    get_bk_user_info,
+    get_bk_user_infos,
+    get_rtx_user_infos,
 )
 from tests.utils import mock_json_response
 
@@ -66,3 +77,182 @@ async def test_async_get_bk_user_info_uses_cached_result(async_http_get, cache_g
     assert user_info.chinese_name == "Cached User"
     async_http_get.assert_not_awaited()
     cache_set.assert_not_awaited()
+
+
+def _bk_user_info_response(url, params, **kwargs):
+    username = params["bk_username"]
+    if username.startswith("missing"):
+        return mock_json_response({"code": 1, "message": "user not found"})
+    if username.startswith("broken"):
+        raise HttpRequestError("connection refused")
+    return mock_json_response(
+        {"code": 0, "data": {"bk_username": username, "chname": username.upper(), "email": "", "phone": ""}}
+    )
+
+
+def _rtx_user_info_response(url, params, **kwargs):
+    username = params["login_name"]
+    return mock_json_response({"result": True, "data": {"LoginName": username, "ChineseName": username.upper()}})
+
+
+class TestGetUserInfos:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def http_get(self):
+        with mock.patch("bkpaas_auth.core.services.http_get", side_effect=_bk_user_info_response) as http_get:
+            yield http_get
+
+    def test_batched(self, http_get):
+        cache.set(
+            "bkauth::rests::get_bk_user_info::cached",
+            {"code": 0, "data": {"bk_username": "cached", "chname": "Cached", "email": "", "phone": ""}},
+        )
+
+        with mock.patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            user_infos = get_bk_user_infos(["user1", "cached", "user2", "user1"])
+
+        get_many.assert_called_once()
+        assert list(user_infos) == ["user1", "cached", "user2"]
+        assert user_infos["user1"].chinese_name == "USER1"
+        assert user_infos["cached"].username == "cached"
+        assert sorted(call.kwargs["params"]["bk_username"] for call in http_get.call_args_list) == ["user1", "user2"]
+
+        # the fetched ones are cached, also for the single lookup
+        assert get_bk_user_infos(["user1", "user2"])["user2"].chinese_name == "USER2"
+        assert get_bk_user_info("user1").chinese_name == "USER1"
+        assert http_get.call_count == 2
+
+    def test_not_found(self, http_get):
+        assert get_bk_user_infos(["missing", "user1"])["missing"] is None
+        assert get_bk_user_infos(["missing"])["missing"] is None
+
+        # the failed lookup is not cached
+        assert http_get.call_count == 3
+
+    def test_error(self, http_get):
+        with pytest.raises(ServiceError):
+            get_bk_user_infos(["user1", "broken", "user2"])
+
+        # the successful lookups are cached anyway
+        assert set(get_bk_user_infos(["user1", "user2"])) == {"user1", "user2"}
+        assert http_get.call_count == 3
+
+    def test_empty(self, http_get):
+        assert get_bk_user_infos([]) == {}
+        http_get.assert_not_called()
+
+    @mock.patch("bkpaas_auth.core.services.http_get", side_effect=_rtx_user_info_response)
+    def test_rtx(self, http_get):
+        user_infos = get_rtx_user_infos(["user1", "user2"])
+        assert user_infos["user1"].chinese_name == "USER1"
+        assert user_infos["user2"].username == "user2"
+
+    def test_concurrency_limit(self, http_get):
+        running = peak = 0
+        lock = threading.Lock()
+
+        def slow_response(*args, **kwargs):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+            return _bk_user_info_response(*args, **kwargs)
+
+        http_get.side_effect = slow_response
+        with mock.patch.object(conf, "USER_INFO_FETCH_CONCURRENCY", 3):
+            user_infos = get_bk_user_infos([f"user{i}" for i in range(20)])
+
+        assert len(user_infos) == 20
+        assert http_get.call_count == 20
+        assert peak <= 3
+
+    def test_concurrent_misses_collapsed(self, http_get):
+        def slow_response(*args, **kwargs):
+            time.sleep(0.05)
+            return _bk_user_info_response(*args, **kwargs)
+
+        http_get.side_effect = slow_response
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(get_bk_user_info, "user1") for _ in range(4)]
+            futures += [executor.submit(get_bk_user_infos, ["user1", "user2"]) for _ in range(4)]
+
+        assert all(future.result() for future in futures)
+        assert sorted(call.kwargs["params"]["bk_username"] for call in http_get.call_args_list) == ["user1", "user2"]
+
+
+@pytest.mark.django_db
+class TestAsyncGetUserInfos:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    @pytest.fixture
+    def async_http_get(self):
+        with mock.patch(
+            "bkpaas_auth.core.services.async_http_get",
+            new_callable=mock.AsyncMock,
+            side_effect=_bk_user_info_response,
+        ) as async_http_get:
+            yield async_http_get
+
+    @pytest.mark.asyncio
+    async def test_batched(self, async_http_get):
+        await cache.aset(
+            "bkauth::rests::get_bk_user_info::cached",
+            {"code": 0, "data": {"bk_username": "cached", "chname": "Cached", "email": "", "phone": ""}},
+        )
+
+        user_infos = await async_get_bk_user_infos(["user1", "cached", "missing", "user1"])
+
+        assert list(user_infos) == ["user1", "cached", "missing"]
+        assert user_infos["user1"].chinese_name == "USER1"
+        assert user_infos["cached"].username == "cached"
+        assert user_infos["missing"] is None
+        assert async_http_get.await_count == 2
+
+        await async_get_bk_user_infos(["user1", "cached"])
+        assert async_http_get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_error(self, async_http_get):
+        with pytest.raises(ServiceError):
+            await async_get_bk_user_infos(["user1", "broken"])
+
+        assert await async_get_bk_user_info("user1")
+        assert async_http_get.await_count == 2
+
+    @pytest.mark.asyncio
+    @mock.patch(
+        "bkpaas_auth.core.services.async_http_get", new_callable=mock.AsyncMock, side_effect=_rtx_user_info_response
+    )
+    async def test_rtx(self, async_http_get):
+        user_infos = await async_get_rtx_user_infos(["user1"])
+        assert user_infos["user1"].chinese_name == "USER1"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_collapsed(self, async_http_get):
+        async def slow_response(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return _bk_user_info_response(*args, **kwargs)
+
+        async_http_get.side_effect = slow_response
+        results = await asyncio.gather(
+            *(async_get_bk_user_info("user1") for _ in range(4)),
+            *(async_get_bk_user_infos(["user1", "user2"]) for _ in range(4)),
+        )
+
+        assert all(results)
+        assert sorted(call.kwargs["params"]["bk_username"] for call in async_http_get.await_args_list) == [
+            "user1",
+            "user2",
+        ]
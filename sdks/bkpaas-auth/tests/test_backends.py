@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
@@ -9,8 +12,10 @@ from django.test.utils import override_settings
 
 from bkpaas_auth.backends import APIGatewayAuthBackend, DjangoAuthUserCompatibleBackend, UniversalAuthBackend
 from bkpaas_auth.core.constants import ProviderType
-from bkpaas_auth.core.token import LoginToken, UserAccount
+from bkpaas_auth.core.exceptions import ServiceError
+from bkpaas_auth.core.token import LoginToken, TokenRequestBackend, UserAccount
 from bkpaas_auth.core.user_info import UserInfo
+from bkpaas_auth.models import User
 from tests.utils import generate_random_string, mock_json_response, mock_raw_response
 
 
@@ -214,6 +219,101 @@ class TestUniversalAuthBackend:
         assert await UniversalAuthBackend().aget_user("any-user-id") is None
 
 
+class TestUniversalAuthBackendUserAccountCache:
+    @pytest.fixture
+    def backend(self, settings):
+        settings.BKAUTH_ENABLE_MULTI_TENANT_MODE = False
+        settings.BKAUTH_BACKEND_TYPE = "bk_token"
+        settings.BKAUTH_USER_ACCOUNT_CACHE_TIMEOUT = 60
+        return UniversalAuthBackend()
+
+    @pytest.fixture
+    def user_account(self):
+        return UserAccount(bk_username="foo", display_name="Foo")
+
+    def test_cached(self, mocker, backend, user_account):
+        request = mocker.patch.object(TokenRequestBackend, "request_user_account", return_value=user_account)
+
+        for _ in range(3):
+            user = UniversalAuthBackend().authenticate(request=mocker.MagicMock(), auth_credentials={"bk_token": "a"})
+            assert user.username == "foo"
+        backend.authenticate(request=mocker.MagicMock(), auth_credentials={"bk_token": "b"})
+
+        assert request.call_count == 2
+
+    def test_cache_disabled(self, settings, mocker, backend, user_account):
+        settings.BKAUTH_USER_ACCOUNT_CACHE_TIMEOUT = 0
+        request = mocker.patch.object(backend.request_backend, "request_user_account", return_value=user_account)
+
+        for _ in range(3):
+            backend.authenticate(request=mocker.MagicMock(), auth_credentials={"bk_token": "a"})
+
+        assert request.call_count == 3
+
+    def test_error_not_cached(self, mocker, backend, user_account):
+        request = mocker.patch.object(
+            backend.request_backend,
+            "request_user_account",
+            side_effect=[ServiceError("unavailable"), user_account],
+        )
+
+        assert backend.authenticate(request=mocker.MagicMock(), auth_credentials={"bk_token": "a"}) is None
+        assert backend.authenticate(request=mocker.MagicMock(), auth_credentials={"bk_token": "a"})
+        assert request.call_count == 2
+
+    def test_concurrent_threads(self, mocker, backend, user_account):
+        def request_user_account(**credentials):
+            time.sleep(0.1)
+            return user_account
+
+        request = mocker.patch.object(
+            backend.request_backend, "request_user_account", side_effect=request_user_account
+        )
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            users = list(
+                executor.map(
+                    lambda _: backend.authenticate(request=mocker.MagicMock(), auth_credentials={"bk_token": "a"}),
+                    range(30),
+                )
+            )
+
+        assert all(user.username == "foo" for user in users)
+        assert request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_coroutines(self, mocker, backend, user_account):
+        async def async_request_user_account(**credentials):
+            await asyncio.sleep(0.1)
+            return user_account
+
+        request = mocker.patch.object(
+            backend.request_backend,
+            "async_request_user_account",
+            new=mocker.AsyncMock(side_effect=async_request_user_account),
+        )
+
+        users = await asyncio.gather(
+            *[backend.aauthenticate(request=mocker.MagicMock(), auth_credentials={"bk_token": "a"}) for _ in range(30)]
+        )
+
+        assert all(user.username == "foo" for user in users)
+        request.assert_awaited_once_with(bk_token="a")
+
+    @pytest.mark.asyncio
+    async def test_shared_by_sync_and_async(self, mocker, backend, user_account):
+        mocker.patch.object(backend.request_backend, "request_user_account", return_value=user_account)
+        async_request = mocker.patch.object(
+            backend.request_backend, "async_request_user_account", new=mocker.AsyncMock()
+        )
+
+        backend.authenticate(request=mocker.MagicMock(), auth_credentials={"bk_token": "a"})
+        user = await backend.aauthenticate(request=mocker.MagicMock(), auth_credentials={"bk_token": "a"})
+
+        assert user.username == "foo"
+        async_request.assert_not_awaited()
+
+
 # NOTE: 必须用 transaction=True。异步 ORM 通过 asgiref 的线程池执行，用的是另一条数据库连接，
 # 不受普通 `db` fixture 的 atomic 块约束，写入的数据会真正提交并污染后续用例。
 @pytest.mark.django_db(transaction=True)
@@ -289,6 +389,77 @@ class TestDjangoAuthUserCompatibleBackend:
         assert user.username == "django-async-user"
 
 
+class TestDjangoAuthUserCompatibleBackendUserCache:
+    @pytest.fixture
+    def backend(self):
+        return DjangoAuthUserCompatibleBackend()
+
+    @pytest.fixture
+    def bk_user(self):
+        return User(token=LoginToken("token", expires_in=86400), provider_type=ProviderType.BK, username="cached-user")
+
+    def test_existing_user_cached(self, db, backend, bk_user, django_assert_num_queries):
+        db_user = backend.connect_to_django_user(bk_user)
+
+        with django_assert_num_queries(0):
+            cached_user = backend.connect_to_django_user(bk_user)
+
+        assert cached_user == db_user
+        assert cached_user is not db_user
+        assert cached_user.token is bk_user.token
+
+    def test_compatible_attributes_not_shared(self, db, backend, bk_user):
+        backend.connect_to_django_user(bk_user)
+
+        another_token = LoginToken("another-token", expires_in=86400)
+        another_bk_user = User(token=another_token, provider_type=ProviderType.BK, username="cached-user")
+        assert backend.connect_to_django_user(another_bk_user).token is another_token
+        assert backend.connect_to_django_user(bk_user).token is bk_user.token
+
+    def test_configure_user_once(self, db, backend, bk_user, mocker):
+        configure_user = mocker.spy(backend, "configure_user")
+
+        for _ in range(3):
+            backend.connect_to_django_user(bk_user)
+
+        configure_user.assert_called_once()
+
+    def test_cache_disabled(self, db, backend, bk_user, settings, django_assert_num_queries):
+        settings.BKAUTH_DJANGO_USER_CACHE_TIMEOUT = 0
+        backend.connect_to_django_user(bk_user)
+
+        with django_assert_num_queries(1):
+            backend.connect_to_django_user(bk_user)
+
+    def test_cache_expired(self, db, backend, bk_user, mocker, django_assert_num_queries):
+        backend.connect_to_django_user(bk_user)
+
+        expired_at = time.monotonic() + 61
+        mocker.patch("bkpaas_auth.core.cache.time.monotonic", return_value=expired_at)
+        with django_assert_num_queries(1):
+            backend.connect_to_django_user(bk_user)
+
+    def test_absent_user_not_cached(self, db, backend, bk_user, mocker):
+        mocker.patch.object(backend, "create_unknown_user", False)
+        assert backend.connect_to_django_user(bk_user) is None
+
+        get_user_model()._default_manager.create(username="cached-user")
+        assert backend.connect_to_django_user(bk_user).username == "cached-user"
+
+    @pytest.mark.asyncio
+    @pytest.mark.django_db(transaction=True)
+    async def test_async_existing_user_cached(self, backend, bk_user, mocker):
+        db_user = await backend.async_connect_to_django_user(bk_user)
+
+        aget_or_create = mocker.spy(get_user_model()._default_manager, "aget_or_create")
+        cached_user = await backend.async_connect_to_django_user(bk_user)
+
+        aget_or_create.assert_not_called()
+        assert cached_user == db_user
+        # shared by the sync path
+        assert backend.connect_to_django_user(bk_user) == db_user
+
+
 class TestAPIGatewayAuthBackend:
     @pytest.fixture
     def backend(self):
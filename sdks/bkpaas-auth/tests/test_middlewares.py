@@ -4,9 +4,11 @@ import string
 from contextlib import contextmanager
 from typing import Dict
 from unittest.mock import AsyncMock, MagicMock, patch
+from zoneinfo import ZoneInfo
 
 import pytest
 from asgiref.sync import iscoroutinefunction
+from django.conf import settings
 from django.contrib.auth import SESSION_KEY, get_user_model
 from django.contrib.auth.middleware import AuthenticationMiddleware
 from django.contrib.auth.models import AnonymousUser
@@ -21,7 +23,13 @@ from bkpaas_auth.core.constants import ACCESS_PERMISSION_DENIED_CODE, ProviderTy
 from bkpaas_auth.core.exceptions import AccessPermissionDenied
 from bkpaas_auth.core.token import LoginToken
 from bkpaas_auth.core.user_info import UserInfo
-from bkpaas_auth.middlewares import CookieLoginMiddleware, UserTimezoneMiddleware, auth
+from bkpaas_auth.middlewares import (
+    CookieLoginMiddleware,
+    UserTimezoneMiddleware,
+    auth,
+    get_auth_backend,
+    get_zone_info,
+)
 from bkpaas_auth.models import User
 from tests.utils import generate_random_string
 
@@ -247,6 +255,159 @@ class TestCookieLoginMiddleware:
         assert json.loads(response.content)["code"] == ACCESS_PERMISSION_DENIED_CODE
 
 
+class TestCookieLoginMiddlewareSessionWrites:
+    """Only the changes of the stored token/user should be written to the session store"""
+
+    @pytest.fixture(autouse=True)
+    def _cache_session(self, settings):
+        settings.SESSION_ENGINE = "django.contrib.sessions.backends.cache"
+
+    @pytest.fixture
+    def session_writes(self):
+        """Count the writes to the session store, by both `save` and `asave`"""
+        from django.contrib.sessions.backends.cache import SessionStore
+
+        writes = MagicMock()
+        save, asave = SessionStore.save, SessionStore.asave
+
+        def counted_save(self, *args, **kwargs):
+            writes()
+            return save(self, *args, **kwargs)
+
+        async def counted_asave(self, *args, **kwargs):
+            writes()
+            return await asave(self, *args, **kwargs)
+
+        with patch.object(SessionStore, "save", counted_save), patch.object(SessionStore, "asave", counted_asave):
+            yield writes
+
+    @staticmethod
+    def _make_request(rf, session_key):
+        request = rf.get("/")
+        request.COOKIES["bk_token"] = "token"
+        if session_key:
+            request.COOKIES[settings.SESSION_COOKIE_NAME] = session_key
+        return request
+
+    @staticmethod
+    def _get_session_key(response, session_key):
+        if settings.SESSION_COOKIE_NAME in response.cookies:
+            return response.cookies[settings.SESSION_COOKIE_NAME].value
+        return session_key
+
+    def _run(self, rf, count):
+        middleware = SessionMiddleware(AuthenticationMiddleware(CookieLoginMiddleware(lambda r: HttpResponse("OK"))))
+        session_keys = []
+        session_key = None
+        for _ in range(count):
+            response = middleware(self._make_request(rf, session_key))
+            session_key = self._get_session_key(response, session_key)
+            session_keys.append(session_key)
+        return session_keys
+
+    async def _arun(self, rf, count):
+        async def get_response(request):
+            return HttpResponse("OK")
+
+        middleware = SessionMiddleware(AuthenticationMiddleware(CookieLoginMiddleware(get_response)))
+        session_keys = []
+        session_key = None
+        for _ in range(count):
+            response = await middleware(self._make_request(rf, session_key))
+            session_key = self._get_session_key(response, session_key)
+            session_keys.append(session_key)
+        return session_keys
+
+    def test_authenticated_requests(self, rf, session_writes):
+        with patch.object(auth, "authenticate", side_effect=lambda **kwargs: create_uin_user("admin")) as authenticate:
+            session_keys = self._run(rf, 100)
+
+        authenticate.assert_called_once()
+        assert len(set(session_keys)) == 1
+        # the writes of the login in the first request only
+        first_request_writes = 2
+        assert session_writes.call_count == first_request_writes
+
+    def test_re_authenticated_requests(self, rf, session_writes, settings):
+        # every request re-authenticates the credentials
+        settings.BKAUTH_SESSION_TIMEOUT = 0
+
+        with patch.object(auth, "authenticate", side_effect=lambda **kwargs: create_uin_user("admin")), patch.object(
+            auth, "login", wraps=auth.login
+        ) as login:
+            session_keys = self._run(rf, 100)
+
+        # a new token is written per re-authentication, the session is never logged in again
+        login.assert_called_once()
+        assert len(set(session_keys)) == 1
+        assert session_writes.call_count == 101
+
+    @pytest.mark.asyncio
+    async def test_async_authenticated_requests(self, rf, session_writes):
+        with patch.object(
+            auth, "aauthenticate", new_callable=AsyncMock, side_effect=lambda **kwargs: create_uin_user("admin")
+        ) as aauthenticate:
+            session_keys = await self._arun(rf, 100)
+
+        aauthenticate.assert_awaited_once()
+        assert len(set(session_keys)) == 1
+        assert session_writes.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_async_re_authenticated_requests(self, rf, session_writes, settings):
+        settings.BKAUTH_SESSION_TIMEOUT = 0
+
+        with patch.object(
+            auth, "aauthenticate", new_callable=AsyncMock, side_effect=lambda **kwargs: create_uin_user("admin")
+        ), patch.object(auth, "alogin", wraps=auth.alogin) as alogin:
+            session_keys = await self._arun(rf, 100)
+
+        alogin.assert_called_once()
+        assert len(set(session_keys)) == 1
+        assert session_writes.call_count == 101
+
+    def test_login_again_when_user_changed(self, rf, session_writes):
+        with patch.object(auth, "authenticate", side_effect=lambda **kwargs: create_uin_user("admin")):
+            (session_key,) = self._run(rf, 1)
+
+        request = self._make_request(rf, session_key)
+        request.COOKIES["bk_token"] = "another-token"
+        middleware = SessionMiddleware(AuthenticationMiddleware(CookieLoginMiddleware(lambda r: HttpResponse("OK"))))
+        with patch.object(auth, "authenticate", side_effect=lambda **kwargs: create_uin_user("another")), patch.object(
+            auth, "login", wraps=auth.login
+        ) as login, patch(
+            # the user model of the tests uses an integer primary key
+            "django.contrib.auth._get_user_session_key",
+            side_effect=lambda request: request.session[auth.SESSION_KEY],
+        ):
+            middleware(request)
+
+        login.assert_called_once()
+        assert request.user.username == "another"
+
+
+class TestAuthBackendSharing:
+    def test_shared(self):
+        assert get_auth_backend() is get_auth_backend()
+
+    def test_reset_when_settings_changed(self):
+        backend = get_auth_backend()
+
+        with override_settings(BKAUTH_BACKEND_TYPE="bk_ticket"):
+            assert get_auth_backend() is not backend
+            assert get_auth_backend().backend_type == "bk_ticket"
+
+        assert get_auth_backend().backend_type == "bk_token"
+
+    def test_not_built_per_request(self, dj_request):
+        with patch("bkpaas_auth.middlewares.UniversalAuthBackend", wraps=UniversalAuthBackend) as backend_class:
+            middleware = CookieLoginMiddleware(MagicMock())
+            for _ in range(3):
+                middleware.process_request(dj_request)
+
+        assert backend_class.call_count <= 1
+
+
 class TestCookieLoginMiddlewareWithDjangoUser:
     @override_settings(AUTHENTICATION_BACKENDS=["bkpaas_auth.backends.DjangoAuthUserCompatibleBackend"])
     def test_auth(self, db, bk_token, dj_request):
@@ -310,6 +471,7 @@ class TestUserTimezoneMiddleware:
     @pytest.fixture(autouse=True)
     def setup_timezone(self):
         """Reset timezone before and after each test to avoid pollution"""
+        get_zone_info.cache_clear()
         with override_settings(TIME_ZONE="UTC"):
             dj_timezone.deactivate()
             yield
@@ -376,6 +538,29 @@ class TestUserTimezoneMiddleware:
         middleware.process_request(request)
         assert dj_timezone.get_current_timezone_name() == "Asia/Shanghai"
 
+    @pytest.mark.parametrize("time_zone_value", ["America/New_York", "Invalid/Timezone", "../etc/passwd"])
+    @override_settings(TIME_ZONE="Asia/Shanghai")
+    def test_resolve_zone_once(self, rf, middleware, authenticated_user, time_zone_value, caplog):
+        authenticated_user.time_zone = time_zone_value
+        expected_name = time_zone_value if time_zone_value == "America/New_York" else "Asia/Shanghai"
+        with patch("bkpaas_auth.middlewares.ZoneInfo", wraps=ZoneInfo) as zone_info:
+            for _ in range(10):
+                request = rf.get("/")
+                request.user = authenticated_user
+                middleware.process_request(request)
+                assert dj_timezone.get_current_timezone_name() == expected_name
+
+        zone_info.assert_called_once_with(time_zone_value)
+        # 非法时区只在第一次解析时打印告警
+        warnings = [r for r in caplog.records if r.levelname == "WARNING"]
+        assert len(warnings) == (0 if time_zone_value == "America/New_York" else 1)
+
+    def test_zone_info_cache_is_bounded(self):
+        for i in range(get_zone_info.cache_info().maxsize * 2):
+            assert get_zone_info(f"Invalid/Timezone{i}") is None
+
+        assert get_zone_info.cache_info().currsize == get_zone_info.cache_info().maxsize
+
     @pytest.mark.asyncio
     async def test_async_get_response_uses_user_timezone_and_resets_it(self, rf, authenticated_user):
         request = rf.get("/")
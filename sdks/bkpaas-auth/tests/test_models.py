@@ -39,6 +39,18 @@ class TestUser:
         assert user.is_authenticated is True
         assert user.is_anonymous is False
 
+    def test_update_user_info(self):
+        user = User(token=None, provider_type=ProviderType.RTX, username="alice", email="alice@example.com")
+
+        assert user.update_user_info({"email": "alice@example.com", "phone": None}) == []
+        assert user.update_user_info({"email": "new@example.com", "time_zone": "UTC"}) == ["time_zone", "email"]
+        assert user.email == "new@example.com"
+        assert user.time_zone == "UTC"
+
+        changed_fields = user.update_user_info({"email": "new@example.com"}, overwrite_all=True)
+        assert changed_fields == ["time_zone"]
+        assert user.time_zone is None
+
     def test_user_info(self, get_rtx_user_info_response):
         """Test base user info fields mapping from RTX user info"""
         with mock.patch("httpx2.Client.request") as mocked_request:
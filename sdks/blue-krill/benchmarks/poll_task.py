@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+"""Broker messages sent and time spent of one poll interval of 5000 in-flight pollers, celery task per poller vs. batch mode
+
+Usage: python -m benchmarks.poll_task
+"""
+
+import time
+from unittest import mock
+
+from blue_krill.async_utils.poll_task import (
+    BatchPollTaskScheduler,
+    InMemoryBatchPollingStore,
+    PollingResult,
+    TaskPoller,
+    check_status_until_finished,
+)
+
+POLLERS = 5000
+
+
+class DeploymentPoller(TaskPoller):
+    def query(self) -> PollingResult:
+        return PollingResult.doing(data={"phase": "building"})
+
+
+class BatchDeploymentPoller(DeploymentPoller):
+    store = InMemoryBatchPollingStore()
+
+    @classmethod
+    def query_many(cls, pollers):
+        # Such as one request to the API for the statuses of all deployments in the batch
+        return [PollingResult.doing(data={"phase": "building"}) for _ in pollers]
+
+    @classmethod
+    def get_batch_store(cls):
+        return cls.store
+
+
+def report(name, messages, elapsed):
+    print(f"{name:<8} broker messages {messages:6d}   {elapsed * 1000:8.2f} ms")
+
+
+def main():
+    print(f"{POLLERS} in-flight pollers, one poll interval")
+
+    # Every polling action runs in its own task, which sends a message to schedule the next one
+    with mock.patch.object(check_status_until_finished, "subtask") as subtask:
+        start = time.perf_counter()
+        for i in range(POLLERS):
+            check_status_until_finished(DeploymentPoller.__name__, None, {"deployment_id": i})
+        elapsed = time.perf_counter() - start
+    report("task", subtask.return_value.apply_async.call_count, elapsed)
+
+    for i in range(POLLERS):
+        BatchDeploymentPoller.start({"deployment_id": i})
+    start = time.perf_counter()
+    BatchPollTaskScheduler(BatchDeploymentPoller).tick()
+    # Only the message of the periodic tick is sent by celery beat
+    report("batch", 1, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
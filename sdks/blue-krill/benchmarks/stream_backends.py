@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+"""Cost of publishing events and reading them back, StreamChannel (list + pub/sub) vs. RedisStreamChannel
+
+Runs against REDIS_URL if given, otherwise a local fakeredis server (requires `pip install fakeredis`).
+
+Usage: python -m benchmarks.stream_backends
+"""
+
+import time
+import uuid
+
+from benchmarks.stream_subscriber import connect, start_redis
+from blue_krill.redis_tools.messaging import (
+    RedisStreamChannel,
+    RedisStreamChannelSubscriber,
+    StreamChannel,
+    StreamChannelSubscriber,
+)
+
+EVENTS = 5000
+
+
+def report(name, channel_class, subscriber_class, redis_db):
+    channel = channel_class(uuid.uuid4().hex, redis_db, max_history=1000)
+    channel.initialize()
+
+    start = time.perf_counter()
+    for i in range(EVENTS):
+        channel.publish_msg(f"[{i:06d}] building the image")
+    publish = (time.perf_counter() - start) / EVENTS
+
+    subscriber = subscriber_class(channel.channel_id, redis_db)
+    start = time.perf_counter()
+    events = subscriber.get_history_events()
+    read = time.perf_counter() - start
+    print(f"{name:<8} publish {publish * 1e6:8.1f} us/event   read {len(events)} kept events {read * 1000:7.2f} ms")
+
+    subscriber.close()
+    channel.destroy()
+
+
+def main():
+    redis_url, _ = start_redis()
+    redis_db = connect(redis_url)
+    print(f"{EVENTS} events, max_history=1000, against {redis_url}")
+    report("list", StreamChannel, StreamChannelSubscriber, redis_db)
+    report("stream", RedisStreamChannel, RedisStreamChannelSubscriber, redis_db)
+
+
+if __name__ == "__main__":
+    main()
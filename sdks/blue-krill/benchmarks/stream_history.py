@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+"""Time to the first event, total time and peak memory of reading a long history, all at once vs. in pages
+
+Runs against REDIS_URL if given, otherwise a local fakeredis server (requires `pip install fakeredis`).
+
+Usage: python -m benchmarks.stream_history
+"""
+
+import json
+import time
+import tracemalloc
+
+from benchmarks.stream_subscriber import connect, new_channel, start_redis
+from blue_krill.redis_tools.messaging import StreamChannelSubscriber
+
+EVENTS = 20_000
+
+
+def read_all(subscriber):
+    """The previous behaviour, which reads and decodes the whole history before yielding anything"""
+    events = [json.loads(item) for item in subscriber.redis_db.lrange(subscriber.keys.history, 0, -1)]
+    yield from events
+
+
+def report(name, iter_events):
+    tracemalloc.start()
+    start = time.perf_counter()
+    events = iter_events()
+    next(events)
+    first = time.perf_counter() - start
+    # Consume the events one by one like a streaming viewer
+    for _ in events:
+        pass
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"{name:<8} first event {first * 1000:8.2f} ms   total {total * 1000:8.2f} ms   peak {peak / 2**20:6.2f} MiB"
+    )
+
+
+def main():
+    redis_url, _ = start_redis()
+    redis_db = connect(redis_url)
+    channel = new_channel(redis_db)
+    channel.publish_msgs(f"[{i:06d}] building the image, step {i} of {EVENTS}" for i in range(EVENTS))
+
+    subscriber = StreamChannelSubscriber(channel.channel_id, redis_db)
+    print(f"{EVENTS} events in history against {redis_url}")
+    report("all", lambda: read_all(subscriber))
+    report("paged", subscriber.iter_history_events)
+
+    subscriber.close()
+    channel.destroy()
+
+
+if __name__ == "__main__":
+    main()
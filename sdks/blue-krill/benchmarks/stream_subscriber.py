@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# TencentBlueKing is pleased to support the open source community by making
+# 蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+# Copyright (C) Tencent. All rights reserved.
+# Licensed under the MIT License (the "License"); you may not use this file except
+# in compliance with the License. You may obtain a copy of the License at
+#
+#     http://opensource.org/licenses/MIT
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# We undertake not to change the open source license (MIT license) applicable
+# to the current version of the project delivered to anyone in the future.
+"""CPU usage of 200 idle subscribers and the latency of delivering events, polling vs. blocking vs. asyncio
+
+Runs against REDIS_URL if given, otherwise a local fakeredis server (requires `pip install fakeredis`).
+
+Usage: python -m benchmarks.stream_subscriber
+"""
+
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import threading
+import time
+import uuid
+
+import redis
+import redis.asyncio
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import NoBackoff
+from redis.retry import Retry
+
+from blue_krill.redis_tools.messaging import AsyncStreamChannelSubscriber, StreamChannel, StreamChannelSubscriber
+
+SUBSCRIBERS = 200
+IDLE_SECONDS = 3
+EVENTS = 200
+
+
+def serve_fake_redis(port):
+    from fakeredis import TcpFakeServer
+
+    TcpFakeServer(("127.0.0.1", port), server_type="redis").serve_forever()
+
+
+def start_redis():
+    """Return the url of redis, start a fakeredis server if REDIS_URL is not given"""
+    if os.environ.get("REDIS_URL"):
+        return os.environ["REDIS_URL"], None
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = multiprocessing.Process(target=serve_fake_redis, args=(port,), daemon=True)
+    process.start()
+    redis_url = f"redis://127.0.0.1:{port}/0"
+    for _ in range(100):
+        try:
+            connect(redis_url).ping()
+            break
+        except redis.ConnectionError:
+            time.sleep(0.05)
+    return redis_url, process
+
+
+def connect(redis_url, **kwargs):
+    # fakeredis closes connections occasionally, retry the commands on a new connection
+    return redis.Redis.from_url(
+        redis_url, retry=Retry(NoBackoff(), 3), retry_on_error=[redis.ConnectionError], **kwargs
+    )
+
+
+def connect_async(redis_url, **kwargs):
+    return redis.asyncio.Redis.from_url(
+        redis_url, retry=AsyncRetry(NoBackoff(), 3), retry_on_error=[redis.ConnectionError], **kwargs
+    )
+
+
+def new_channel(redis_db):
+    channel = StreamChannel(uuid.uuid4().hex, redis_db)
+    channel.initialize()
+    return channel
+
+
+def wait_subscribed(redis_db, channel):
+    while redis_db.pubsub_numsub(channel.keys.channel)[0][1] < SUBSCRIBERS:
+        time.sleep(0.05)
+    # Let the subscribers settle down after receiving the confirmations
+    time.sleep(0.5)
+
+
+def idle_threads(redis_url, **get_events_kwargs):
+    redis_db = connect(redis_url, max_connections=SUBSCRIBERS * 2)
+    channel = new_channel(redis_db)
+
+    subscribers = [StreamChannelSubscriber(channel.channel_id, redis_db) for _ in range(SUBSCRIBERS)]
+    threads = [
+        threading.Thread(target=lambda s=s: list(s.get_events(**get_events_kwargs)), daemon=True) for s in subscribers
+    ]
+    for thread in threads:
+        thread.start()
+    wait_subscribed(redis_db, channel)
+
+    # CPU seconds consumed per second while no event is published
+    start = time.process_time()
+    time.sleep(IDLE_SECONDS)
+    cpu = (time.process_time() - start) / IDLE_SECONDS
+
+    channel.close()
+    for thread in threads:
+        thread.join()
+    for subscriber in subscribers:
+        subscriber.close()
+    channel.destroy()
+    return cpu
+
+
+async def idle_coroutines(redis_url):
+    redis_db = connect(redis_url)
+    channel = new_channel(redis_db)
+    async_redis_db = connect_async(redis_url, max_connections=SUBSCRIBERS * 2)
+
+    async def consume():
+        async with AsyncStreamChannelSubscriber(channel.channel_id, async_redis_db) as subscriber:
+            return [event async for event in subscriber.get_events()]
+
+    tasks = [asyncio.create_task(consume()) for _ in range(SUBSCRIBERS)]
+    await asyncio.to_thread(wait_subscribed, redis_db, channel)
+
+    start = time.process_time()
+    await asyncio.sleep(IDLE_SECONDS)
+    cpu = (time.process_time() - start) / IDLE_SECONDS
+
+    channel.close()
+    await asyncio.gather(*tasks)
+    await async_redis_db.aclose()
+    channel.destroy()
+    return cpu
+
+
+def publish_timestamps(channel):
+    for _ in range(EVENTS):
+        channel.publish_msg(time.perf_counter())
+        time.sleep(0.005)
+    channel.close()
+
+
+def latency_thread(redis_url, **get_events_kwargs):
+    redis_db = connect(redis_url)
+    channel = new_channel(redis_db)
+    subscriber = StreamChannelSubscriber(channel.channel_id, redis_db)
+
+    publisher = threading.Thread(target=publish_timestamps, args=(channel,))
+    latencies = []
+    publisher.start()
+    for event in subscriber.get_events(**get_events_kwargs):
+        latencies.append(time.perf_counter() - event["data"])
+    publisher.join()
+
+    subscriber.close()
+    channel.destroy()
+    return latencies
+
+
+async def latency_coroutine(redis_url):
+    redis_db = connect(redis_url)
+    channel = new_channel(redis_db)
+    async_redis_db = connect_async(redis_url)
+
+    latencies = []
+    async with AsyncStreamChannelSubscriber(channel.channel_id, async_redis_db) as subscriber:
+        publisher = asyncio.create_task(asyncio.to_thread(publish_timestamps, channel))
+        async for event in subscriber.get_events():
+            latencies.append(time.perf_counter() - event["data"])
+        await publisher
+
+    await async_redis_db.aclose()
+    channel.destroy()
+    return latencies
+
+
+def report(name, cpu, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:<10} idle CPU {cpu * 100:6.1f}%   "
+        f"latency mean {statistics.mean(latencies) * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms"
+    )
+
+
+def main():
+    redis_url, process = start_redis()
+    print(f"{SUBSCRIBERS} idle subscribers, {EVENTS} events against {redis_url}")
+    try:
+        report("polling", idle_threads(redis_url), latency_thread(redis_url))
+        report(
+            "blocking",
+            idle_threads(redis_url, block_timeout=1.0),
+            latency_thread(redis_url, block_timeout=1.0),
+        )
+        report("asyncio", asyncio.run(idle_coroutines(redis_url)), asyncio.run(latency_coroutine(redis_url)))
+    finally:
+        if process is not None:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,15 +15,21 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import json
 import logging
+import threading
 import time
+import uuid
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from enum import Enum
-from typing import Any, Dict, Optional, Type
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type, Union
 
 from celery import shared_task
 
+if TYPE_CHECKING:
+    from redis.commands.core import Script
+
 """module for creating long-running polling tasks via celery"""
 logger = logging.getLogger(__name__)
 
@@ -84,6 +90,8 @@ class TaskPoller(ABC):
     max_retries_on_error = 10
     overall_timeout_seconds = 3600 * 24 * 7
     default_retry_delay_seconds = 10
+    # The max number of pollers queried by one `query_many()` call in batch mode
+    batch_size = 100
 
     def __init__(self, params: Dict, metadata: PollingMetadata):
         self.params = params
@@ -112,6 +120,12 @@ class TaskPoller(ABC):
             assert issubclass(callback_handler_cls, CallbackHandler)
             handler_name = callback_handler_cls.__name__
 
+        # Poll it in the periodic ticks of the batch mode
+        batch_store = cls.get_batch_store()
+        if batch_store is not None:
+            BatchPollTaskScheduler(cls, batch_store).add(params, handler_name)
+            return
+
         # Start background task
         cls.get_async_task().delay(cls.__name__, handler_name, params)
 
@@ -138,6 +152,21 @@ class TaskPoller(ABC):
         """Start a polling action, subclasses must override this method"""
         raise NotImplementedError()
 
+    @classmethod
+    def query_many(cls, pollers: List["TaskPoller"]) -> List[Union[PollingResult, Exception]]:
+        """Start the polling actions of many pollers in batch mode, return the results in the order of pollers,
+        an exception in place of a result means the polling action of that poller failed.
+
+        Override it to query the statuses of all pollers in bulk, such as one request to the API.
+        """
+        results: List[Union[PollingResult, Exception]] = []
+        for poller in pollers:
+            try:
+                results.append(poller.query())
+            except Exception as e:
+                results.append(e)
+        return results
+
     def get_retry_delay(self) -> int:
         """Get delay of next retry"""
         return self.default_retry_delay_seconds
@@ -162,6 +191,12 @@ class TaskPoller(ABC):
         """Return the async celery task object for polling in backend"""
         return check_status_until_finished
 
+    @classmethod
+    def get_batch_store(cls) -> Optional["BatchPollingStore"]:
+        """Return the store of pollers to enable batch mode, in which the pollers of this class are polled by the
+        periodic task `check_statuses_in_batch` instead of one celery task for every polling action"""
+        return None
+
 
 class CallbackStatus(int, Enum):
     """Status of a finished polling"""
@@ -294,23 +329,34 @@ class PollTaskScheduler:
     def run(self) -> Optional[PollingMetadata]:
         """Start schedule process"""
         if self.poller.exceeded_timeout():
-            logger.info("exceeded total timeout, ts_query_started=%s", self.poller.metadata.query_started_at)
-            self._callback_timeout()
+            self.handle_timeout()
             return None
 
         try:
             polling_result = self._safe_query(self.poller)
         except PollingQueryError as e:
-            if self.poller.exceeded_max_retries():
-                self._callback_exception(e)
-                return None
+            return self.handle_query_error(e)
+        return self.handle_result(polling_result)
+
+    def handle_timeout(self) -> None:
+        """Finish the polling which has exceeded total timeout"""
+        logger.info("exceeded total timeout, ts_query_started=%s", self.poller.metadata.query_started_at)
+        self._callback_timeout()
+
+    def handle_query_error(self, e: PollingQueryError) -> Optional[PollingMetadata]:
+        """Handle the error of a polling action, return the metadata of next polling if it should be retried"""
+        if self.poller.exceeded_max_retries():
+            self._callback_exception(e)
+            return None
 
-            # Retry next polling, set `last_polling_data` field to the value of last succeeded call
-            metadata = self.poller.make_next_metadata(
-                has_error=True, last_polling_data=self.poller.metadata.last_polling_data
-            )
-            return metadata
+        # Retry next polling, set `last_polling_data` field to the value of last succeeded call
+        metadata = self.poller.make_next_metadata(
+            has_error=True, last_polling_data=self.poller.metadata.last_polling_data
+        )
+        return metadata
 
+    def handle_result(self, polling_result: PollingResult) -> Optional[PollingMetadata]:
+        """Handle the result of a polling action, return the metadata of next polling if it should be continued"""
         if polling_result.status == PollingStatus.DONE:
             ret = CallbackResult(status=CallbackStatus.NORMAL, data=polling_result.data)
             self._callback(ret)
@@ -347,3 +393,283 @@ class PollTaskScheduler:
         """Callback handler when exceeds max retries"""
         ret = CallbackResult(status=CallbackStatus.EXCEPTION, message=f"exception: {e}")
         self.handler_cls().handle(ret, self.poller)
+
+
+@dataclass
+class BatchPollingEntry:
+    """A poller polled in batch mode"""
+
+    id: str
+    handler_name: Optional[str]
+    params: Dict
+    metadata: PollingMetadata
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, value: Union[str, bytes]) -> "BatchPollingEntry":
+        data = json.loads(value)
+        return cls(
+            id=data["id"],
+            handler_name=data["handler_name"],
+            params=data["params"],
+            metadata=PollingMetadata(**data["metadata"]),
+        )
+
+
+class BatchPollingStore(ABC):
+    """Store of the pollers in batch mode, every entry is stored with the time when it should be polled"""
+
+    @abstractmethod
+    def save(self, poller_name: str, entries: List[Tuple[BatchPollingEntry, float]]):
+        """Add or update entries, with the unix timestamps when they should be polled"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def claim_due(self, poller_name: str, now: float, limit: int, lease_seconds: float) -> List[BatchPollingEntry]:
+        """Return at most `limit` entries which should be polled at `now`, and postpone them by `lease_seconds`
+        atomically, so other ticks skip them, and they are polled again if the tick crashes"""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def remove(self, poller_name: str, entry_ids: List[str]):
+        """Remove the finished entries"""
+        raise NotImplementedError()
+
+
+class InMemoryBatchPollingStore(BatchPollingStore):
+    """Store the pollers in memory, which only works for a single process, such as in tests"""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Tuple[BatchPollingEntry, float]]] = {}
+        self._lock = threading.Lock()
+
+    def save(self, poller_name: str, entries: List[Tuple[BatchPollingEntry, float]]):
+        with self._lock:
+            for entry, due_at in entries:
+                self._entries.setdefault(poller_name, {})[entry.id] = (entry, due_at)
+
+    def claim_due(self, poller_name: str, now: float, limit: int, lease_seconds: float) -> List[BatchPollingEntry]:
+        with self._lock:
+            entries = self._entries.get(poller_name, {})
+            due = sorted((item for item in entries.values() if item[1] <= now), key=lambda item: item[1])[:limit]
+            for entry, _ in due:
+                entries[entry.id] = (entry, now + lease_seconds)
+            return [entry for entry, _ in due]
+
+    def remove(self, poller_name: str, entry_ids: List[str]):
+        with self._lock:
+            for entry_id in entry_ids:
+                self._entries.get(poller_name, {}).pop(entry_id, None)
+
+
+# Claim the due entries, KEYS: sorted set of due time, hash of entries; ARGV: now, limit, leased due time
+_CLAIM_DUE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #ids == 0 then
+    return {}
+end
+for _, id in ipairs(ids) do
+    redis.call('ZADD', KEYS[1], ARGV[3], id)
+end
+return redis.call('HMGET', KEYS[2], unpack(ids))
+"""
+
+
+class RedisBatchPollingStore(BatchPollingStore):
+    """Store the pollers in redis, which is shared by all celery workers
+
+    :param redis_db: a `redis.Redis` client
+    """
+
+    default_key_prefix = "bk_poll_task::"
+
+    def __init__(self, redis_db, key_prefix: Optional[str] = None):
+        self.redis_db = redis_db
+        self.key_prefix = key_prefix or self.default_key_prefix
+        self._claim_due_script: Optional["Script"] = None
+
+    def _make_keys(self, poller_name: str) -> Tuple[str, str]:
+        return f"{self.key_prefix}{poller_name}::due", f"{self.key_prefix}{poller_name}::entries"
+
+    def save(self, poller_name: str, entries: List[Tuple[BatchPollingEntry, float]]):
+        if not entries:
+            return
+
+        due_key, entries_key = self._make_keys(poller_name)
+        pipe = self.redis_db.pipeline()
+        pipe.hset(entries_key, mapping={entry.id: entry.to_json() for entry, _ in entries})
+        pipe.zadd(due_key, {entry.id: due_at for entry, due_at in entries})
+        pipe.execute()
+
+    def claim_due(self, poller_name: str, now: float, limit: int, lease_seconds: float) -> List[BatchPollingEntry]:
+        if self._claim_due_script is None:
+            self._claim_due_script = self.redis_db.register_script(_CLAIM_DUE_SCRIPT)
+        values = self._claim_due_script(keys=self._make_keys(poller_name), args=[now, limit, now + lease_seconds])
+        # The entry may be removed by another tick after being claimed
+        return [BatchPollingEntry.from_json(value) for value in values if value]
+
+    def remove(self, poller_name: str, entry_ids: List[str]):
+        if not entry_ids:
+            return
+
+        due_key, entries_key = self._make_keys(poller_name)
+        pipe = self.redis_db.pipeline()
+        pipe.zrem(due_key, *entry_ids)
+        pipe.hdel(entries_key, *entry_ids)
+        pipe.execute()
+
+
+@shared_task(acks_late=True, name="poll_task.check_statuses_in_batch")
+def check_statuses_in_batch(poller_name: str):
+    """Periodic task for polling the pollers of a class in batch mode, schedule it by celery beat for every
+    poller class whose `get_batch_store()` returns a store, the interval of it should be shorter than
+    `default_retry_delay_seconds`
+
+    :param poller_name: name of poller class
+    """
+    poller_cls = TaskPoller.get_poller_cls(poller_name)
+    BatchPollTaskScheduler(poller_cls).tick()
+
+
+class BatchPollTaskScheduler:
+    """Schedule the pollers of the same class in batch mode, all due pollers are queried by `query_many()` in one
+    tick, the same as PollTaskScheduler, the finished ones are handled by their callback handlers, the others are
+    polled again after their own `get_retry_delay()` seconds
+
+    :param poller_cls: the class of pollers
+    :param store: the store of pollers, default to `poller_cls.get_batch_store()`
+    """
+
+    # Seconds before the pollers claimed by a crashed tick are polled again
+    lease_seconds = 300
+
+    def __init__(self, poller_cls: Type[TaskPoller], store: Optional[BatchPollingStore] = None):
+        self.poller_cls = poller_cls
+        store = store or poller_cls.get_batch_store()
+        if store is None:
+            raise ValueError(f"batch mode is not enabled for {poller_cls.__name__}")
+        if poller_cls.batch_size < 1:
+            raise ValueError(f"batch_size of {poller_cls.__name__} must be at least 1, got {poller_cls.batch_size}")
+        self.store = store
+
+    def add(self, params: Dict, handler_name: Optional[str] = None) -> BatchPollingEntry:
+        """Add a poller, which will be polled in next tick"""
+        entry = BatchPollingEntry(
+            id=uuid.uuid4().hex,
+            handler_name=handler_name,
+            params=params,
+            metadata=PollingMetadata(retries=0, query_started_at=time.time(), queried_count=0),
+        )
+        self.store.save(self.poller_cls.__name__, [(entry, time.time())])
+        return entry
+
+    def tick(self) -> int:
+        """Poll all the due pollers in batches, return the number of them"""
+        now = time.time()
+        count = 0
+        while True:
+            entries = self.store.claim_due(
+                self.poller_cls.__name__, now, self.poller_cls.batch_size, self.lease_seconds
+            )
+            self.run(entries)
+            count += len(entries)
+            if len(entries) < self.poller_cls.batch_size:
+                return count
+
+    def run(self, entries: List[BatchPollingEntry]):
+        """Poll a batch of entries"""
+        to_save: List[Tuple[BatchPollingEntry, float]] = []
+        to_remove: List[str] = []
+        schedulers: List[Tuple[BatchPollingEntry, PollTaskScheduler]] = []
+        timed_out = set()
+        for entry in entries:
+            try:
+                scheduler = self._make_scheduler(entry)
+                if scheduler.poller.exceeded_timeout():
+                    timed_out.add(entry.id)
+            except Exception:
+                # The entry can not be polled any more (e.g. its handler is not registered), remove it
+                # so that it won't break the other pollers in the batch again and again
+                logger.exception("Invalid polling entry, poll_class=%s, entry=%s", self.poller_cls.__name__, entry)
+                to_remove.append(entry.id)
+            else:
+                schedulers.append((entry, scheduler))
+
+        querying = [(entry, scheduler) for entry, scheduler in schedulers if entry.id not in timed_out]
+        results = dict(
+            zip(
+                [entry.id for entry, _ in querying],
+                self._safe_query_many([scheduler.poller for _, scheduler in querying]),
+            )
+        )
+
+        for entry, scheduler in schedulers:
+            try:
+                if entry.id in timed_out:
+                    scheduler.handle_timeout()
+                    next_metadata = None
+                else:
+                    next_metadata = self._handle(scheduler, results[entry.id])
+            except Exception:
+                # Like the failed celery task in normal mode, stop polling it without affecting others
+                logger.exception("Exception when handling polling result, poll_class=%s", scheduler.poller)
+                next_metadata = None
+
+            if next_metadata:
+                countdown = scheduler.poller.get_retry_delay()
+                logger.debug("Will retry query status for %s after %s seconds.", scheduler.poller, countdown)
+                entry.metadata = next_metadata
+                to_save.append((entry, time.time() + countdown))
+            else:
+                to_remove.append(entry.id)
+
+        self.store.save(self.poller_cls.__name__, to_save)
+        self.store.remove(self.poller_cls.__name__, to_remove)
+
+    def _make_scheduler(self, entry: BatchPollingEntry) -> PollTaskScheduler:
+        poller = self.poller_cls(entry.params, entry.metadata)
+        if entry.handler_name is not None:
+            handler_cls = CallbackHandler.get_handler_cls(entry.handler_name)
+        else:
+            handler_cls = NullResultHandler
+        return PollTaskScheduler(poller, handler_cls)
+
+    @staticmethod
+    def _handle(
+        scheduler: PollTaskScheduler, result: Union[PollingResult, PollingQueryError]
+    ) -> Optional[PollingMetadata]:
+        """Handle the result of a poller the same as `PollTaskScheduler.run()`"""
+        if isinstance(result, PollingQueryError):
+            return scheduler.handle_query_error(result)
+        return scheduler.handle_result(result)
+
+    def _safe_query_many(self, pollers: List[TaskPoller]) -> List[Union[PollingResult, PollingQueryError]]:
+        """call `query_many()` of the poller class with exception handling"""
+        if not pollers:
+            return []
+
+        try:
+            results = self.poller_cls.query_many(pollers)
+        except Exception as e:
+            logger.exception("Exception when query statuses in batch, poll_class=%s", self.poller_cls.__name__)
+            return [PollingQueryError(str(e)) for _ in pollers]
+
+        if len(results) != len(pollers):
+            message = f"got {len(results)} results for {len(pollers)} pollers"
+            logger.error("Invalid results when query statuses in batch, poll_class=%s, %s", self.poller_cls, message)
+            return [PollingQueryError(message) for _ in pollers]
+
+        safe_results: List[Union[PollingResult, PollingQueryError]] = []
+        for poller, result in zip(pollers, results):
+            if isinstance(result, Exception):
+                logger.error("Exception when query status, poll_class=%s", poller, exc_info=result)
+                safe_results.append(PollingQueryError(str(result)))
+            elif not isinstance(result, PollingResult):
+                logger.error("Invalid result when query status, poll_class=%s, result: %r", poller, result)
+                safe_results.append(PollingQueryError(f"invalid polling result: {result!r}"))
+            else:
+                logger.debug("Query status result, poll_class=%s, polling result: %s", poller, result)
+                safe_results.append(result)
+        return safe_results
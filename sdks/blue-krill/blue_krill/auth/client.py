@@ -17,7 +17,8 @@
 
 import logging
 import time
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import jwt
 from django.http import HttpRequest
@@ -61,11 +62,28 @@ class AuthResult:
         self.extra_payload = extra_payload
 
 
+@lru_cache(maxsize=128)
+def _prepare_key(algorithm: str, key: str) -> Any:
+    """Load the key material of a client, such as parsing the PEM of a RSA public key, only once"""
+    return jwt.get_algorithm_by_name(algorithm).prepare_key(key)
+
+
 class JWTClientAuthenticator:
-    """Authenticator using JWT clients"""
+    """Authenticator using JWT clients
+
+    The client is identified by the unverified `kid` header or `iss` claim of the token, then the token is
+    verified against only the keys of that client, instead of trying the keys of all clients one by one.
+    """
 
     def __init__(self, jwt_clients):
         self.jwt_clients = jwt_clients
+        self._clients_by_kid: Dict[str, Dict] = {}
+        self._clients_by_iss: Dict[str, List[Dict]] = {}
+        for client in jwt_clients:
+            if client.get("kid"):
+                self._clients_by_kid[client["kid"]] = client
+            # Multiple clients may share an issuer, e.g. when the key is being rotated
+            self._clients_by_iss.setdefault(client.get("iss"), []).append(client)
 
     def authenticate(self, token: str) -> AuthResult:
         """Authenticate a given token
@@ -86,10 +104,10 @@ class JWTClientAuthenticator:
 
         :raises: ValueError when token is invalid
         """
-        for client in self.jwt_clients:
+        for client in self._get_candidate_clients(token):
             try:
                 algorithm = client.get("algorithm", DEFAULT_ALGORITHM)
-                payload = jwt.decode(token, client["key"], algorithms=[algorithm])
+                payload = jwt.decode(token, _prepare_key(algorithm, client["key"]), algorithms=[algorithm])
             except DecodeError:
                 logger.debug(f"Unable to decode token using {client['iss']}'s secret")
                 continue
@@ -103,6 +121,24 @@ class JWTClientAuthenticator:
             return payload, client_ins
         raise ValueError("invalid JWT token")
 
+    def _get_candidate_clients(self, token: str) -> List[Dict]:
+        """Get the clients which may have issued the token, by the unverified header and payload"""
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            unverified_payload = jwt.decode(token, options={"verify_signature": False})
+        except DecodeError:
+            logger.debug("Unable to decode the header or payload of token")
+            return []
+
+        if kid and kid in self._clients_by_kid:
+            return [self._clients_by_kid[kid]]
+
+        # A valid payload must contain the issuer of the client, the clients of other issuers never match
+        iss = unverified_payload.get("iss")
+        if not isinstance(iss, str):
+            return []
+        return self._clients_by_iss.get(iss, [])
+
     @staticmethod
     def _validate_payload(client: Dict, payload: Dict) -> bool:
         """Validates given JWT payload, a valid payload must contains at least 2 fields:
@@ -135,6 +171,15 @@ class VerifiedClientMiddleware:
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self._authenticator: Optional[JWTClientAuthenticator] = None
+
+    def get_authenticator(self) -> JWTClientAuthenticator:
+        """Get the authenticator shared by all requests, rebuild it only when the clients in settings changed"""
+        jwt_clients = get_paas_service_jwt_clients()
+        authenticator = self._authenticator
+        if authenticator is None or authenticator.jwt_clients is not jwt_clients:
+            authenticator = self._authenticator = JWTClientAuthenticator(jwt_clients)
+        return authenticator
 
     @staticmethod
     def get_token(request) -> Optional[str]:
@@ -157,7 +202,7 @@ class VerifiedClientMiddleware:
         # Only proceed when token format is valid JWT format
         if token and validate_jwt_token(token):
             try:
-                ret = JWTClientAuthenticator(get_paas_service_jwt_clients()).authenticate(token=token)
+                ret = self.get_authenticator().authenticate(token=token)
                 request.client = ret.client
                 request.extra_payload = ret.extra_payload
             except AuthFailedError as e:
@@ -15,10 +15,13 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import json
 import logging
+import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, Optional
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
+from typing import Callable, Dict, Optional, Tuple
 
 import jwt
 from requests.auth import AuthBase
@@ -43,20 +46,83 @@ class JWTAuthConf:
     role: str = DEFAULT_ROLE
 
 
+class _TokenCache:
+    """A thread-safe LRU cache of signed tokens, a token is reused until its refresh time"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data: "OrderedDict[Tuple, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Locks of the keys being signed, so a key is signed only once when requested concurrently
+        self._sign_locks: Dict[Tuple, threading.Lock] = {}
+
+    def get_or_sign(self, key: Tuple, reuse_in: float, sign: Callable[[], str]) -> str:
+        """Get the cached token, or sign a new one which will be reused in the next `reuse_in` seconds"""
+        with self._lock:
+            token = self._get(key)
+            if token is not None:
+                return token
+            sign_lock = self._sign_locks.setdefault(key, threading.Lock())
+
+        # Sign outside the global lock, signing a token does not block the requests of other keys
+        with sign_lock:
+            with self._lock:
+                token = self._get(key)
+            if token is not None:
+                return token
+
+            try:
+                token = sign()
+                with self._lock:
+                    self._data[key] = (time.monotonic() + reuse_in, token)
+                    self._data.move_to_end(key)
+                    while len(self._data) > self.max_size:
+                        self._data.popitem(last=False)
+            finally:
+                with self._lock:
+                    if self._sign_locks.get(key) is sign_lock:
+                        del self._sign_locks[key]
+            return token
+
+    def _get(self, key: Tuple) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None or item[0] <= time.monotonic():
+            return None
+        self._data.move_to_end(key)
+        return item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_token_cache = _TokenCache()
+
+
 class ClientJWTAuth(AuthBase):
     """Auto sign and inject a JWT token in the request headers
 
     :param auth_conf: JWT Auth instance
     :param prefix: Prefix string of header, default to "Bearer"
     :param expires_in: After how many seconds, token will be considered expired, default to 3600
+    :param reuse_ratio: The signed token is reused until this fraction of its lifetime has elapsed, the tokens
+        are shared by the instances with same conf and claims, default to 0.5, 0 means signing for every request
     """
 
     _default_expires_in = 3600
-
-    def __init__(self, auth_conf: JWTAuthConf, prefix: str = "Bearer", expires_in: Optional[int] = None):
+    _default_reuse_ratio = 0.5
+
+    def __init__(
+        self,
+        auth_conf: JWTAuthConf,
+        prefix: str = "Bearer",
+        expires_in: Optional[int] = None,
+        reuse_ratio: Optional[float] = None,
+    ):
         self.auth_conf = auth_conf
         self.prefix = prefix
         self.expires_in = expires_in or self._default_expires_in
+        self.reuse_ratio = self._default_reuse_ratio if reuse_ratio is None else reuse_ratio
 
     def __call__(self, r):
         r.headers["Authorization"] = self.make_authorization_header_value()
@@ -68,6 +134,28 @@ class ClientJWTAuth(AuthBase):
 
         :param extra_payload: extra data which will be injected into token
         """
+        key = self._make_cache_key(extra_payload)
+        if key is None:
+            token = self._sign(extra_payload)
+        else:
+            token = _token_cache.get_or_sign(
+                key, self.expires_in * self.reuse_ratio, lambda: self._sign(extra_payload)
+            )
+        return f"{self.prefix} {token}"
+
+    def _make_cache_key(self, extra_payload: Optional[Dict]) -> Optional[Tuple]:
+        """Make the key to reuse the signed token, None means the token can not be reused"""
+        # The token can not be reused when its expiration time is given by caller
+        if self.reuse_ratio <= 0 or (extra_payload and "expires_at" in extra_payload):
+            return None
+        try:
+            claims = json.dumps(extra_payload or {}, sort_keys=True)
+        except (TypeError, ValueError):
+            # The payload is not JSON serializable (e.g. a datetime "exp" which PyJWT supports), skip the cache
+            return None
+        return astuple(self.auth_conf), self.expires_in, claims
+
+    def _sign(self, extra_payload: Optional[Dict] = None) -> str:
         payload = {
             "iss": self.auth_conf.iss,
             "expires_at": time.time() + self.expires_in,
@@ -76,5 +164,4 @@ class ClientJWTAuth(AuthBase):
         # Mix extra payload content
         payload.update(extra_payload or {})
 
-        token = jwt.encode(payload, key=self.auth_conf.key, algorithm=self.auth_conf.algorithm)
-        return f"{self.prefix} {token}"
+        return jwt.encode(payload, key=self.auth_conf.key, algorithm=self.auth_conf.algorithm)
@@ -15,7 +15,8 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
-from typing import ClassVar, Dict, Optional
+from functools import lru_cache
+from typing import ClassVar, Dict, Iterable, List, Optional
 
 from bkcrypto import constants
 from bkcrypto.contrib.django.ciphers import get_symmetric_cipher
@@ -43,6 +44,12 @@ class _Header:
         return text.startswith(self.header)
 
 
+@lru_cache(maxsize=64)
+def _get_cipher(cipher_class, secret_key):
+    """获取加密算法实例，同一算法与密钥只初始化一次（初始化 SM4 等算法的开销远大于单次加解密）"""
+    return cipher_class(secret_key)
+
+
 class EncryptHandler:
     cipher_classes: ClassVar[Dict] = {}
 
@@ -62,18 +69,20 @@ class EncryptHandler:
         except KeyError:
             raise ValueError(f"Invalid cipher type: {self.encrypt_cipher_type}")
         else:
-            cipher = cipher_class(self.secret_key)
-            return cipher.encrypt(text)
+            return _get_cipher(cipher_class, self.secret_key).encrypt(text)
 
     def decrypt(self, encrypted: str) -> str:
         """根据 header 解密"""
         for cls in self.cipher_classes.values():
             if cls.header.contain_header(encrypted):
-                cipher = cls(self.secret_key)
-                return cipher.decrypt(encrypted)
+                return _get_cipher(cls, self.secret_key).decrypt(encrypted)
         # 若不包含头则直接返回
         return encrypted
 
+    def decrypt_many(self, encrypted_values: Iterable[Optional[str]]) -> List[Optional[str]]:
+        """批量解密，如 queryset.values_list() 查询出的多行数据，None 值原样返回"""
+        return [None if encrypted is None else self.decrypt(encrypted) for encrypted in encrypted_values]
+
 
 def register_cipher(cls):
     EncryptHandler.cipher_classes[cls.__name__] = cls
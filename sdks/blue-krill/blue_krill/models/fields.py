@@ -15,9 +15,10 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
-from typing import Optional
+from typing import Iterable, List, Optional
 
 from django.db import models
+from django.db.models.query_utils import DeferredAttribute
 
 from blue_krill.encrypt.handler import EncryptHandler
 
@@ -27,14 +28,53 @@ class _EncryptedString(str):
     strings and encrypted ones."""
 
 
+class _DecryptOnAccessAttribute(DeferredAttribute):
+    """Decrypt the value loaded from database when the attribute is read for the first time"""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+
+        value = super().__get__(instance, cls)
+        if isinstance(value, _EncryptedString):
+            value = instance.__dict__[self.field.attname] = self.field.handler.decrypt(str(value))
+        return value
+
+    def __set__(self, instance, value):
+        # Being a data descriptor, the value in instance.__dict__ can not shadow `__get__`
+        instance.__dict__[self.field.attname] = value
+
+
 class EncryptField(models.TextField):
-    """a field which will be encrypted via cryptography/fernet"""
+    """a field which will be encrypted via cryptography/fernet
+
+    :param decrypt_lazily: Do not decrypt the values when loading the model instances, but when the attribute is
+        read for the first time. NOTE: values()/values_list() return the encrypted values of such field, which
+        can be decrypted by `decrypt_many`
+    """
 
     description = "a field which will be encrypted"
 
-    def __init__(self, encrypt_cipher_type: Optional[str] = None, secret_key: Optional[bytes] = None, *args, **kwargs):
+    def __init__(
+        self,
+        encrypt_cipher_type: Optional[str] = None,
+        secret_key: Optional[bytes] = None,
+        *args,
+        decrypt_lazily: bool = False,
+        **kwargs,
+    ):
         super(EncryptField, self).__init__(*args, **kwargs)
         self.handler = EncryptHandler(encrypt_cipher_type=encrypt_cipher_type, secret_key=secret_key)
+        self.decrypt_lazily = decrypt_lazily
+        if decrypt_lazily:
+            self.descriptor_class = _DecryptOnAccessAttribute
+
+    def pre_save(self, model_instance, add):
+        # The value never read keeps encrypted, save it as is instead of decrypting and encrypting it again
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, _EncryptedString):
+            return value
+        return super().pre_save(model_instance, add)
 
     def get_prep_value(self, value):
         if value is None:
@@ -50,4 +90,10 @@ class EncryptField(models.TextField):
     def from_db_value(self, value, expression, connection):
         if value is None:
             return value
+        if self.decrypt_lazily:
+            return _EncryptedString(value)
         return self.handler.decrypt(value)
+
+    def decrypt_many(self, values: Iterable[Optional[str]]) -> List[Optional[str]]:
+        """Decrypt the values of this field in bulk, such as the ones queried by values_list()"""
+        return self.handler.decrypt_many(values)
@@ -18,22 +18,63 @@
 import json
 import logging
 import time
+from typing import Any, AsyncIterator, Iterable, List, Optional, Tuple
 
 from blue_krill.encoding import force_text
 
 logger = logging.getLogger(__name__)
 
+# Assign ids to the serialized events, append them to history and publish them, all in one round trip.
+# KEYS: counter, history; ARGV: channel, max length of history (0 means unlimited), events serialized without id,
+# such as '{"event": "msg", "data": ""}'
+_PUBLISH_SCRIPT = """
+local count = #ARGV - 2
+local last_id = redis.call('INCRBY', KEYS[1], count)
+local payloads = {}
+for i = 1, count do
+    payloads[i] = '{"id": ' .. (last_id - count + i) .. ', ' .. string.sub(ARGV[i + 2], 2)
+end
+-- unpack() is limited by the size of lua stack, push the payloads in chunks
+for i = 1, count, 1000 do
+    redis.call('RPUSH', KEYS[2], unpack(payloads, i, math.min(i + 999, count)))
+end
+local max_history = tonumber(ARGV[2])
+if max_history > 0 then
+    redis.call('LTRIM', KEYS[2], -max_history, -1)
+end
+for i = 1, count do
+    redis.call('PUBLISH', ARGV[1], payloads[i])
+end
+return last_id
+"""
+
+# Read a page of history events whose id is greater than the given one.
+# KEYS: counter, history; ARGV: last event id, page size
+_READ_HISTORY_SCRIPT = """
+local length = redis.call('LLEN', KEYS[2])
+local last_id = tonumber(redis.call('GET', KEYS[1]) or 0)
+-- The oldest events may have been trimmed, the id of the first event in history is (last_id - length + 1)
+local start = math.max(tonumber(ARGV[1]) - (last_id - length), 0)
+return redis.call('LRANGE', KEYS[2], start, start + tonumber(ARGV[2]) - 1)
+"""
+
 
 class StreamChannel(object):
-    """A simple stream channel implemention"""
+    """A simple stream channel implemention
+
+    :param int max_history: If given, only keep the latest events of this number in history, so the memory of
+        redis is bounded for a chatty channel, subscribers can not read the trimmed events any more
+    """
 
     default_expires_seconds = 3600 * 24
 
-    def __init__(self, channel_id, redis_db=None, expires_seconds=None):
+    def __init__(self, channel_id, redis_db=None, expires_seconds=None, max_history=None):
         self.channel_id = channel_id
         self.keys = KeyManager(channel_id)
         self.redis_db = redis_db
         self.expires_seconds = expires_seconds or self.default_expires_seconds
+        self.max_history = max_history
+        self._publish_script = None
 
     def initialize(self):
         """Initialize channel"""
@@ -50,14 +91,29 @@ class StreamChannel(object):
             pipe.expire(key, self.expires_seconds)
         pipe.execute()
 
-    def publish_msg(self, message):
-        self.publish("msg", data=message)
+    def publish_msg(self, message) -> int:
+        return self.publish("msg", data=message)
+
+    def publish_msgs(self, messages: Iterable[Any]) -> List[int]:
+        return self.publish_many(("msg", message) for message in messages)
 
-    def publish(self, event, data=""):
-        index = self.redis_db.incr(self.keys.counter)
-        payload = {"id": index, "event": event, "data": data}
-        self.redis_db.rpush(self.keys.history, json.dumps(payload))
-        self.redis_db.publish(self.keys.channel, json.dumps(payload))
+    def publish(self, event, data="") -> int:
+        """Publish an event atomically, return the id of it"""
+        return self.publish_many([(event, data)])[0]
+
+    def publish_many(self, events: Iterable[Tuple[str, Any]]) -> List[int]:
+        """Publish many events of (event, data) atomically in one round trip, return the ids of them"""
+        # The id is assigned by redis, and spliced into the event serialized only once
+        serialized = [json.dumps({"event": event, "data": data}) for event, data in events]
+        if not serialized:
+            return []
+
+        if self._publish_script is None:
+            self._publish_script = self.redis_db.register_script(_PUBLISH_SCRIPT)
+        last_id = self._publish_script(
+            keys=[self.keys.counter, self.keys.history], args=[self.keys.channel, self.max_history or 0, *serialized]
+        )
+        return list(range(last_id - len(serialized) + 1, last_id + 1))
 
     def close(self):
         self.redis_db.set(self.keys.state, "closed", self.expires_seconds)
@@ -77,10 +133,14 @@ class StreamChannel(object):
 class StreamChannelSubscriber(object):
     """Subscriber for StreamChannel"""
 
+    # The number of history events read in every round trip
+    history_page_size = 500
+
     def __init__(self, channel_id, redis_db=None):
         self.channel_id = channel_id
         self.keys = KeyManager(channel_id)
         self.redis_db = redis_db
+        self._read_history_script = None
 
         self.sub_pipe = self.redis_db.pubsub(ignore_subscribe_messages=True)
         self.sub_pipe.subscribe(self.keys.channel)
@@ -94,15 +154,7 @@ class StreamChannelSubscriber(object):
         self._channel_state = self.read_channel_state()
 
     def read_channel_state(self):
-        state = self.redis_db.get(self.keys.state)
-        state = force_text(state)
-        if state is None:
-            return "none"
-        elif state == "open":
-            return "open"
-        elif state == "closed":
-            return "closed"
-        return "unknown"
+        return _parse_channel_state(self.redis_db.get(self.keys.state))
 
     def is_closed(self):
         return self.get_channel_state() == "closed"
@@ -112,37 +164,62 @@ class StreamChannelSubscriber(object):
 
         :param int last_event_id: If given, result will start from last_event_id
         """
-        results = []
-        for item in self.redis_db.lrange(self.keys.history, last_event_id, -1):
-            event = json.loads(item)
-            # Update Channel status if event is special
-            if self.is_special_event(event):
-                self.update_channel_state()
-            if ignore_special and self.is_special_event(event):
-                continue
-            results.append(event)
-        return results
+        return list(self.iter_history_events(last_event_id=last_event_id, ignore_special=ignore_special))
+
+    def iter_history_events(self, last_event_id=0, ignore_special=True, page_size=None):
+        """Iterate history events, which are read page by page and yielded once a page arrives
 
-    def get_events(self, last_event_id=0, wait=0.05, ignore_special=True):
+        :param int last_event_id: If given, result will start from last_event_id
+        :param int page_size: The number of events read in every round trip, default to `history_page_size`
+        """
+        page_size = page_size or self.history_page_size
+        if self._read_history_script is None:
+            self._read_history_script = self.redis_db.register_script(_READ_HISTORY_SCRIPT)
+
+        while True:
+            items = self._read_history_script(
+                keys=[self.keys.counter, self.keys.history], args=[last_event_id, page_size]
+            )
+            for item in items:
+                event = json.loads(item)
+                last_event_id = event["id"]
+                # Update Channel status if event is special
+                if self.is_special_event(event):
+                    self.update_channel_state()
+                if ignore_special and self.is_special_event(event):
+                    continue
+                yield event
+            if len(items) < page_size:
+                return
+
+    def get_events(self, last_event_id=0, wait=0.05, ignore_special=True, block_timeout=None):
         """Get all history events and follow new one.
 
         :param int last_event_id: Ignore every events whose id is lower than this
         :param int wait: Wait for seconds for every cycle
+        :param float block_timeout: If given, block on the connection for at most these seconds in every cycle
+            instead of polling it every `wait` seconds, so an idle subscriber costs nothing and the new events
+            are delivered without delay
         """
         # TODO: If a channel is not open for a long time, raise an exception
-        events = self.get_history_events(last_event_id=last_event_id, ignore_special=ignore_special)
-        for event in events:
+        max_event_id = last_event_id
+        for event in self.iter_history_events(last_event_id=last_event_id, ignore_special=ignore_special):
+            max_event_id = event["id"]
             yield event
 
-        max_event_id = events[-1]["id"] if events else last_event_id
         while True:
             if self.is_closed():
                 break
-            event = self.get_event(block=False)
-            # Be nice to your system, sleep for a while
-            if not event:
-                time.sleep(wait)
-                continue
+            if block_timeout is not None:
+                event = self.get_event(timeout=block_timeout)
+                if not event:
+                    continue
+            else:
+                event = self.get_event(block=False)
+                # Be nice to your system, sleep for a while
+                if not event:
+                    time.sleep(wait)
+                    continue
             # Ignore event that already fetched from history events
             if event["id"] <= max_event_id:
                 continue
@@ -150,15 +227,16 @@ class StreamChannelSubscriber(object):
                 continue
             yield event
 
-    def get_event(self, block=False):
+    def get_event(self, block=False, timeout=0.0):
         """Get event from subscribe
 
         :param block bool: if True, will use .listen method to do a sync read
+        :param timeout float: when not blocking, wait for at most these seconds on the connection
         """
         if block:
             _data = next(self.sub_pipe.listen())
         else:
-            _data = self.sub_pipe.get_message()
+            _data = self.sub_pipe.get_message(timeout=timeout)
         if not _data:
             return None
 
@@ -179,6 +257,333 @@ class StreamChannelSubscriber(object):
         return "StreamChannelSubscriber: {}".format(self.channel_id)
 
 
+class AsyncStreamChannelSubscriber:
+    """asyncio version of StreamChannelSubscriber, which waits for the events on the connection without polling
+
+    :param redis_db: a `redis.asyncio.Redis` client
+
+    Usage::
+
+        async with AsyncStreamChannelSubscriber(channel_id, redis_db) as subscriber:
+            async for event in subscriber.get_events():
+                ...
+    """
+
+    history_page_size = StreamChannelSubscriber.history_page_size
+
+    def __init__(self, channel_id, redis_db):
+        self.channel_id = channel_id
+        self.keys = KeyManager(channel_id)
+        self.redis_db = redis_db
+        self._read_history_script = None
+
+        self.sub_pipe = self.redis_db.pubsub(ignore_subscribe_messages=True)
+        self._channel_state = "none"
+
+    async def subscribe(self):
+        """Subscribe the channel, must be called before getting events"""
+        await self.sub_pipe.subscribe(self.keys.channel)
+        await self.update_channel_state()
+
+    async def __aenter__(self):
+        await self.subscribe()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def get_channel_state(self):
+        return self._channel_state
+
+    async def update_channel_state(self):
+        self._channel_state = await self.read_channel_state()
+
+    async def read_channel_state(self):
+        return _parse_channel_state(await self.redis_db.get(self.keys.state))
+
+    def is_closed(self):
+        return self.get_channel_state() == "closed"
+
+    async def get_history_events(self, last_event_id=0, ignore_special=True) -> List[dict]:
+        """Get history events
+
+        :param int last_event_id: If given, result will start from last_event_id
+        """
+        return [
+            event
+            async for event in self.iter_history_events(last_event_id=last_event_id, ignore_special=ignore_special)
+        ]
+
+    async def iter_history_events(self, last_event_id=0, ignore_special=True, page_size=None) -> AsyncIterator[dict]:
+        """Iterate history events, which are read page by page and yielded once a page arrives
+
+        :param int last_event_id: If given, result will start from last_event_id
+        :param int page_size: The number of events read in every round trip, default to `history_page_size`
+        """
+        page_size = page_size or self.history_page_size
+        if self._read_history_script is None:
+            self._read_history_script = self.redis_db.register_script(_READ_HISTORY_SCRIPT)
+
+        while True:
+            items = await self._read_history_script(
+                keys=[self.keys.counter, self.keys.history], args=[last_event_id, page_size]
+            )
+            for item in items:
+                event = json.loads(item)
+                last_event_id = event["id"]
+                # Update Channel status if event is special
+                if self.is_special_event(event):
+                    await self.update_channel_state()
+                if ignore_special and self.is_special_event(event):
+                    continue
+                yield event
+            if len(items) < page_size:
+                return
+
+    async def get_events(
+        self, last_event_id=0, ignore_special=True, block_timeout: Optional[float] = None
+    ) -> AsyncIterator[dict]:
+        """Get all history events and follow new one.
+
+        :param int last_event_id: Ignore every events whose id is lower than this
+        :param float block_timeout: Wait on the connection for at most these seconds in every cycle, None means
+            waiting until a new event arrives, cancel the task to stop waiting
+        """
+        max_event_id = last_event_id
+        async for event in self.iter_history_events(last_event_id=last_event_id, ignore_special=ignore_special):
+            max_event_id = event["id"]
+            yield event
+
+        while not self.is_closed():
+            new_event = await self.get_event(timeout=block_timeout)
+            # Ignore event that already fetched from history events
+            if not new_event or new_event["id"] <= max_event_id:
+                continue
+            if ignore_special and self.is_special_event(new_event):
+                continue
+            yield new_event
+
+    async def get_event(self, timeout: Optional[float] = 0.0) -> Optional[dict]:
+        """Get event from subscribe
+
+        :param timeout float: wait for at most these seconds on the connection, None means waiting forever
+        """
+        _data = await self.sub_pipe.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if not _data:
+            return None
+
+        data = json.loads(_data["data"])
+
+        # Update Channel status if event is special
+        if self.is_special_event(data):
+            await self.update_channel_state()
+        return data
+
+    def is_special_event(self, event):
+        return event["event"] in ("init", "close")
+
+    async def close(self):
+        await self.sub_pipe.aclose()
+
+    def __str__(self):
+        return "AsyncStreamChannelSubscriber: {}".format(self.channel_id)
+
+
+class RedisStreamChannel(StreamChannel):
+    """A stream channel stored in a Redis Stream (requires redis >= 7.0), an alternative to StreamChannel
+
+    The events are appended by XADD, which takes one command for an event instead of a counter, a list and a
+    pub/sub message, and the subscribers read them by id with XREAD, so no event is lost when they reconnect.
+    The ids of events are integers increasing from 1, which are the sequence numbers of the stream entries "0-<id>".
+
+    :param int max_history: If given, trim the stream to about this number of the latest events by MAXLEN,
+        which removes whole macro nodes of the stream only, so more events may be kept
+    """
+
+    def initialize(self):
+        """Initialize channel"""
+        if self.redis_db.exists(self.keys.stream):
+            return
+
+        # Always update state first
+        self.redis_db.set(self.keys.state, "open")
+        self.publish("init")
+
+        # Set expires
+        pipe = self.redis_db.pipeline()
+        for key in self.keys.stream_entities():
+            pipe.expire(key, self.expires_seconds)
+        pipe.execute()
+
+    def publish_many(self, events: Iterable[Tuple[str, Any]]) -> List[int]:
+        """Publish many events of (event, data) atomically in one round trip, return the ids of them"""
+        events = list(events)
+        # A single XADD is atomic already, save the MULTI/EXEC around it
+        pipe = self.redis_db.pipeline(transaction=len(events) > 1)
+        for event, data in events:
+            pipe.xadd(
+                self.keys.stream,
+                {"event": event, "data": json.dumps(data)},
+                id="0-*",
+                maxlen=self.max_history,
+                approximate=True,
+            )
+        return [_parse_stream_id(entry_id) for entry_id in pipe.execute()]
+
+    def destroy(self):
+        """Destory this channel, every history events will be deleted!"""
+        self.redis_db.delete(*self.keys.stream_entities())
+
+    def __str__(self):
+        return "RedisStreamChannel: {}".format(self.channel_id)
+
+
+class RedisStreamChannelSubscriber:
+    """Subscriber for RedisStreamChannel, which has the same interface as StreamChannelSubscriber"""
+
+    # The number of history events read in every round trip
+    history_page_size = 500
+
+    def __init__(self, channel_id, redis_db=None):
+        self.channel_id = channel_id
+        self.keys = KeyManager(channel_id)
+        self.redis_db = redis_db
+
+        # Like subscribing a pub/sub channel, get_event() only returns the events published after now
+        pipe = self.redis_db.pipeline(transaction=False)
+        pipe.get(self.keys.state)
+        pipe.xrevrange(self.keys.stream, count=1)
+        state, last_entries = pipe.execute()
+        self._channel_state = _parse_channel_state(state)
+        self._last_event_id = _parse_stream_id(last_entries[0][0]) if last_entries else 0
+
+    def get_channel_state(self):
+        return self._channel_state
+
+    def update_channel_state(self):
+        self._channel_state = self.read_channel_state()
+
+    def read_channel_state(self):
+        return _parse_channel_state(self.redis_db.get(self.keys.state))
+
+    def is_closed(self):
+        return self.get_channel_state() == "closed"
+
+    def get_history_events(self, last_event_id=0, ignore_special=True):
+        """Get history events
+
+        :param int last_event_id: If given, result will start from last_event_id
+        """
+        return list(self.iter_history_events(last_event_id=last_event_id, ignore_special=ignore_special))
+
+    def iter_history_events(self, last_event_id=0, ignore_special=True, page_size=None):
+        """Iterate history events, which are read page by page and yielded once a page arrives
+
+        :param int last_event_id: If given, result will start from last_event_id
+        :param int page_size: The number of events read in every round trip, default to `history_page_size`
+        """
+        page_size = page_size or self.history_page_size
+        while True:
+            entries = self.redis_db.xrange(self.keys.stream, "(0-{}".format(last_event_id), count=page_size)
+            for entry_id, fields in entries:
+                event = _parse_stream_entry(entry_id, fields)
+                last_event_id = event["id"]
+                # Update Channel status if event is special
+                if self.is_special_event(event):
+                    self.update_channel_state()
+                if ignore_special and self.is_special_event(event):
+                    continue
+                yield event
+            if len(entries) < page_size:
+                return
+
+    def get_events(self, last_event_id=0, wait=0.05, ignore_special=True, block_timeout=None):
+        """Get all history events and follow new one.
+
+        :param int last_event_id: Ignore every events whose id is lower than this
+        :param int wait: Wait for seconds for every cycle
+        :param float block_timeout: If given, block on XREAD for at most these seconds in every cycle instead of
+            polling it every `wait` seconds
+        """
+        self._last_event_id = last_event_id
+        for event in self.iter_history_events(last_event_id=last_event_id, ignore_special=ignore_special):
+            self._last_event_id = event["id"]
+            yield event
+
+        while True:
+            if self.is_closed():
+                break
+            if block_timeout is not None:
+                event = self.get_event(timeout=block_timeout)
+                if not event:
+                    continue
+            else:
+                event = self.get_event(block=False)
+                # Be nice to your system, sleep for a while
+                if not event:
+                    time.sleep(wait)
+                    continue
+            if ignore_special and self.is_special_event(event):
+                continue
+            yield event
+
+    def get_event(self, block=False, timeout=0.0):
+        """Get the event next to the last one got
+
+        :param block bool: if True, wait until an event arrives
+        :param timeout float: when not blocking, wait for at most these seconds
+        """
+        block_ms: Optional[int]
+        if block:
+            block_ms = 0
+        else:
+            # XREAD blocks forever with "BLOCK 0", wait for at least 1ms instead
+            block_ms = max(int(timeout * 1000), 1) if timeout else None
+        result = self.redis_db.xread({self.keys.stream: "0-{}".format(self._last_event_id)}, count=1, block=block_ms)
+        if not result:
+            return None
+
+        entry_id, fields = result[0][1][0]
+        data = _parse_stream_entry(entry_id, fields)
+        self._last_event_id = data["id"]
+
+        # Update Channel status if event is special
+        if self.is_special_event(data):
+            self.update_channel_state()
+        return data
+
+    def is_special_event(self, event):
+        return event["event"] in ("init", "close")
+
+    def close(self):
+        """Nothing to release, the events are read by the commands of the redis client"""
+
+    def __str__(self):
+        return "RedisStreamChannelSubscriber: {}".format(self.channel_id)
+
+
+def _parse_stream_id(entry_id) -> int:
+    """Parse the id of event from the id of stream entry, such as "0-12" """
+    return int(force_text(entry_id).split("-")[1])
+
+
+def _parse_stream_entry(entry_id, fields) -> dict:
+    # The field names are bytes unless the client decodes the responses
+    fields = {force_text(name): value for name, value in fields.items()}
+    return {"id": _parse_stream_id(entry_id), "event": force_text(fields["event"]), "data": json.loads(fields["data"])}
+
+
+def _parse_channel_state(state) -> str:
+    state = force_text(state)
+    if state is None:
+        return "none"
+    elif state == "open":
+        return "open"
+    elif state == "closed":
+        return "closed"
+    return "unknown"
+
+
 class KeyManager(object):
     """Redis key manager for channel"""
 
@@ -190,6 +595,11 @@ class KeyManager(object):
         self.counter = "{}evtch::{}::cnt".format(prefix, channel_id)
         self.history = "{}evtch::{}::his".format(prefix, channel_id)
         self.channel = "{}evtch::{}::cha".format(prefix, channel_id)
+        self.stream = "{}evtch::{}::stm".format(prefix, channel_id)
 
     def entities(self):
         return [self.state, self.counter, self.history]
+
+    def stream_entities(self):
+        """Keys of the channel stored in a Redis Stream"""
+        return [self.state, self.stream]
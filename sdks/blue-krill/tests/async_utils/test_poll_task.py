@@ -15,20 +15,26 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import os
 import time
 from unittest import mock
 
 import pytest
 
 from blue_krill.async_utils.poll_task import (
+    BatchPollingEntry,
+    BatchPollTaskScheduler,
     CallbackHandler,
     CallbackStatus,
+    InMemoryBatchPollingStore,
     NullResultHandler,
     PollingMetadata,
     PollingResult,
     PollTaskScheduler,
+    RedisBatchPollingStore,
     TaskPoller,
     check_status_until_finished,
+    check_statuses_in_batch,
 )
 
 
@@ -196,3 +202,191 @@ class TestTaskPoller:
 
         DonePoller.start({}, NullResultHandler)
         assert not BasePoller.get_async_task().subtask().apply_async.called
+
+
+_batch_store = InMemoryBatchPollingStore()
+
+
+class BatchPoller(BasePoller):
+    """Poller in batch mode, the result of polling is decided by params"""
+
+    batch_size = 10
+    max_retries_on_error = 1
+    queried_batches: list = []
+
+    def query(self) -> PollingResult:
+        if self.params.get("error"):
+            raise ValueError("query failed")
+        if self.params.get("done"):
+            return PollingResult.done(data={"param": self.params["param"]})
+        return PollingResult.doing(data={"queried_count": self.metadata.queried_count})
+
+    @classmethod
+    def query_many(cls, pollers):
+        cls.queried_batches.append([poller.params["param"] for poller in pollers])
+        return super().query_many(pollers)
+
+    def get_retry_delay(self) -> int:
+        return self.params.get("delay", 0)
+
+    @classmethod
+    def get_batch_store(cls):
+        return _batch_store
+
+
+class BatchHandler(CallbackHandler):
+    results: list = []
+
+    def handle(self, result, poller):
+        BatchHandler.results.append((poller.params["param"], result))
+
+
+class TestBatchPollTaskScheduler:
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        _batch_store._entries.clear()
+        BatchPoller.queried_batches = []
+        BatchHandler.results = []
+
+    def test_start(self):
+        BatchPoller.start({"param": 1}, BatchHandler)
+        # No celery task is started for the poller
+        assert not BasePoller.get_async_task().subtask().apply_async.called
+
+        check_statuses_in_batch(BatchPoller.__name__)
+        assert BatchPoller.queried_batches == [[1]]
+
+    def test_poll_in_batches(self):
+        for i in range(25):
+            BatchPoller.start({"param": i}, BatchHandler)
+
+        assert BatchPollTaskScheduler(BatchPoller).tick() == 25
+        assert BatchPoller.queried_batches == [list(range(10)), list(range(10, 20)), list(range(20, 25))]
+
+    def test_done(self):
+        BatchPoller.start({"param": 1, "done": True}, BatchHandler)
+        BatchPoller.start({"param": 2}, BatchHandler)
+
+        scheduler = BatchPollTaskScheduler(BatchPoller)
+        scheduler.tick()
+        assert [(param, result.status, result.data) for param, result in BatchHandler.results] == [
+            (1, CallbackStatus.NORMAL, {"param": 1})
+        ]
+
+        # The finished poller is removed, the other one is polled again with the metadata of last polling
+        scheduler.tick()
+        assert BatchPoller.queried_batches == [[1, 2], [2]]
+        entry, _ = _batch_store._entries[BatchPoller.__name__].popitem()[1]
+        assert entry.metadata.queried_count == 2
+        assert entry.metadata.last_polling_data == {"queried_count": 1}
+
+    def test_retry_delay_of_every_poller(self):
+        BatchPoller.start({"param": 1, "delay": 3600}, BatchHandler)
+        BatchPoller.start({"param": 2}, BatchHandler)
+
+        scheduler = BatchPollTaskScheduler(BatchPoller)
+        assert scheduler.tick() == 2
+        assert scheduler.tick() == 1
+        assert BatchPoller.queried_batches == [[1, 2], [2]]
+
+    def test_exception(self):
+        BatchPoller.start({"param": 1, "error": True}, BatchHandler)
+
+        scheduler = BatchPollTaskScheduler(BatchPoller)
+        scheduler.tick()
+        # Retry the failed polling until exceeding max retries
+        assert BatchHandler.results == []
+        scheduler.tick()
+        param, result = BatchHandler.results[0]
+        assert result.status == CallbackStatus.EXCEPTION
+        assert result.message == "exception: query failed"
+        assert scheduler.tick() == 0
+
+    def test_query_many_exception(self):
+        BatchPoller.start({"param": 1}, BatchHandler)
+        BatchPoller.start({"param": 2}, BatchHandler)
+
+        scheduler = BatchPollTaskScheduler(BatchPoller)
+        with mock.patch.object(BatchPoller, "query_many", side_effect=ValueError("bulk query failed")):
+            scheduler.tick()
+        entries = [entry for entry, _ in _batch_store._entries[BatchPoller.__name__].values()]
+        assert [entry.metadata.retries for entry in entries] == [1, 1]
+
+    def test_invalid_result(self):
+        BatchPoller.start({"param": 1}, BatchHandler)
+        BatchPoller.start({"param": 2}, BatchHandler)
+
+        scheduler = BatchPollTaskScheduler(BatchPoller)
+        with mock.patch.object(BatchPoller, "query_many", return_value=[None, PollingResult.done()]):
+            scheduler.tick()
+        # The missing result is retried as a query error instead of being treated as timeout
+        assert [param for param, _ in BatchHandler.results] == [2]
+        entry, _ = _batch_store._entries[BatchPoller.__name__].popitem()[1]
+        assert entry.params["param"] == 1
+        assert entry.metadata.retries == 1
+
+    def test_invalid_entry(self):
+        BatchPoller.start({"param": 1, "done": True}, BatchHandler)
+        BatchPollTaskScheduler(BatchPoller).add({"param": 2, "done": True}, handler_name="UnknownHandler")
+        BatchPoller.start({"param": 3, "done": True}, BatchHandler)
+
+        scheduler = BatchPollTaskScheduler(BatchPoller)
+        assert scheduler.tick() == 3
+        # The entry whose handler is not registered is removed without affecting others
+        assert BatchPoller.queried_batches == [[1, 3]]
+        assert [param for param, _ in BatchHandler.results] == [1, 3]
+        assert scheduler.tick() == 0
+
+    @pytest.mark.parametrize("batch_size", [0, -1])
+    def test_invalid_batch_size(self, batch_size):
+        with mock.patch.object(BatchPoller, "batch_size", batch_size), pytest.raises(ValueError, match="batch_size"):
+            BatchPollTaskScheduler(BatchPoller)
+
+    def test_timeout(self):
+        BatchPoller.start({"param": 1}, BatchHandler)
+
+        with mock.patch.object(BatchPoller, "overall_timeout_seconds", -1):
+            BatchPollTaskScheduler(BatchPoller).tick()
+        assert BatchPoller.queried_batches == []
+        assert BatchHandler.results[0][1].status == CallbackStatus.TIMEOUT
+
+    def test_handler_exception(self):
+        BatchPoller.start({"param": 1, "done": True}, BatchHandler)
+        BatchPoller.start({"param": 2, "done": True}, BatchHandler)
+
+        scheduler = BatchPollTaskScheduler(BatchPoller)
+        with mock.patch.object(BatchHandler, "handle", side_effect=[ValueError("callback failed"), None]) as handle:
+            scheduler.tick()
+        # The failed callback does not affect others
+        assert handle.call_count == 2
+        assert scheduler.tick() == 0
+
+
+class TestRedisBatchPollingStore:
+    @pytest.fixture
+    def store(self):
+        if not os.environ.get("REDIS_URL"):
+            raise pytest.skip("MISSING REDIS_URL")
+
+        import redis
+
+        store = RedisBatchPollingStore(redis.Redis.from_url(os.environ["REDIS_URL"]), key_prefix="test_poll_task::")
+        yield store
+        store.redis_db.delete(*store._make_keys("Poller"))
+
+    def test_claim_due(self, store):
+        entries = [
+            BatchPollingEntry(
+                id=str(i), handler_name=None, params={"i": i}, metadata=PollingMetadata(0, time.time(), 0)
+            )
+            for i in range(3)
+        ]
+        store.save("Poller", [(entries[0], 100), (entries[1], 200), (entries[2], 300)])
+
+        assert store.claim_due("Poller", now=250, limit=10, lease_seconds=100) == entries[:2]
+        # The claimed entries are postponed until the lease expires
+        assert store.claim_due("Poller", now=300, limit=10, lease_seconds=100) == entries[2:]
+        assert store.claim_due("Poller", now=350, limit=1, lease_seconds=100) == entries[:1]
+
+        store.remove("Poller", ["0", "1", "2"])
+        assert store.claim_due("Poller", now=1000, limit=10, lease_seconds=100) == []
@@ -15,7 +15,10 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import datetime
+import threading
 import time
+from unittest import mock
 from unittest.mock import MagicMock
 
 import jwt
@@ -24,11 +27,19 @@ import requests
 import requests_mock as requests_mock_mod
 from django.utils.crypto import get_random_string
 
-from blue_krill.auth.client import VerifiedClientMiddleware
+from blue_krill.auth import client as client_mod
+from blue_krill.auth import jwt as jwt_mod
+from blue_krill.auth.client import AuthFailedError, JWTClientAuthenticator, VerifiedClientMiddleware
 from blue_krill.auth.jwt import ClientJWTAuth, JWTAuthConf
 
 
 class TestClientJWTAuth:
+    @pytest.fixture(autouse=True)
+    def _clear_token_cache(self):
+        jwt_mod._token_cache.clear()
+        yield
+        jwt_mod._token_cache.clear()
+
     @pytest.mark.parametrize(("prefix", "expected_prefix"), [(None, "Bearer "), ("Basic", "Basic ")])
     def test_prefix(self, requests_mock, prefix, expected_prefix):
         conf = JWTAuthConf(iss="foo", key="bar", algorithm="HS256")
@@ -59,6 +70,95 @@ class TestClientJWTAuth:
         payload = jwt.decode(token, key, algorithms=[algorithm])
         assert payload["role"] == "default"
 
+    def test_reuse_token(self):
+        conf = JWTAuthConf(iss="foo", key="bar")
+        with mock.patch.object(jwt_mod.jwt, "encode", wraps=jwt.encode) as encode:
+            values = {ClientJWTAuth(conf).make_authorization_header_value({"user": "admin"}) for _ in range(10)}
+            assert len(values) == 1
+            assert encode.call_count == 1
+
+            # Tokens with different claims are signed separately
+            ClientJWTAuth(conf).make_authorization_header_value({"user": "foo"})
+            ClientJWTAuth(JWTAuthConf(iss="foo", key="bar", role="foo")).make_authorization_header_value(
+                {"user": "admin"}
+            )
+            assert encode.call_count == 3
+
+    def test_refresh_token(self):
+        auth = ClientJWTAuth(JWTAuthConf(iss="foo", key="bar"), expires_in=100, reuse_ratio=0.5)
+        with mock.patch.object(jwt_mod, "time") as mocked_time:
+            mocked_time.time.return_value = mocked_time.monotonic.return_value = 1000
+            value = auth.make_authorization_header_value()
+
+            mocked_time.monotonic.return_value = 1049
+            assert auth.make_authorization_header_value() == value
+
+            mocked_time.time.return_value = mocked_time.monotonic.return_value = 1050
+            new_value = auth.make_authorization_header_value()
+            assert new_value != value
+
+        payload = jwt.decode(new_value.split()[1], "bar", algorithms=["HS256"])
+        assert payload["expires_at"] == 1150
+
+    @pytest.mark.parametrize(
+        ("reuse_ratio", "extra_payload"),
+        [(0, None), (0.5, {"expires_at": 1})],
+    )
+    def test_sign_every_time(self, reuse_ratio, extra_payload):
+        auth = ClientJWTAuth(JWTAuthConf(iss="foo", key="bar"), reuse_ratio=reuse_ratio)
+        with mock.patch.object(jwt_mod.jwt, "encode", wraps=jwt.encode) as encode:
+            for _ in range(3):
+                auth.make_authorization_header_value(extra_payload)
+        assert encode.call_count == 3
+
+    def test_sign_once_concurrently(self):
+        auth = ClientJWTAuth(JWTAuthConf(iss="foo", key="bar"))
+        values = []
+        with mock.patch.object(jwt_mod.jwt, "encode", wraps=jwt.encode) as encode:
+            threads = [
+                threading.Thread(target=lambda: values.append(auth.make_authorization_header_value()))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert encode.call_count == 1
+        assert len(set(values)) == 1
+
+    def test_sign_other_key_concurrently(self):
+        auth = ClientJWTAuth(JWTAuthConf(iss="foo", key="bar"))
+        signing, release = threading.Event(), threading.Event()
+        encode = jwt.encode
+
+        def slow_encode(payload, *args, **kwargs):
+            if payload.get("user") == "slow":
+                signing.set()
+                release.wait(timeout=5)
+            return encode(payload, *args, **kwargs)
+
+        with mock.patch.object(jwt_mod.jwt, "encode", side_effect=slow_encode):
+            thread = threading.Thread(target=auth.make_authorization_header_value, args=({"user": "slow"},))
+            thread.start()
+            assert signing.wait(timeout=5)
+
+            # Signing the slow token does not block the tokens of other claims
+            assert auth.make_authorization_header_value({"user": "fast"})
+            release.set()
+            thread.join()
+
+    def test_not_json_serializable_payload(self):
+        auth = ClientJWTAuth(JWTAuthConf(iss="foo", key="bar"))
+        exp = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=1)
+        with mock.patch.object(jwt_mod.jwt, "encode", wraps=jwt.encode) as encode:
+            for _ in range(2):
+                value = auth.make_authorization_header_value({"exp": exp})
+        assert encode.call_count == 2
+
+        payload = jwt.decode(value.split()[1], "bar", algorithms=["HS256"])
+        assert payload["exp"] == int(exp.timestamp())
+
 
 _JWT_CLIENT = {
     "iss": "foo",
@@ -100,3 +200,109 @@ class TestVerifiedClientMiddleware:
         request = rf.get("/", HTTP_AUTHORIZATION="Bearer not-a-jwt-token")
         VerifiedClientMiddleware(MagicMock())(request)
         assert request.client is None
+
+    def test_reuse_authenticator(self, settings, rf):
+        payload = {"iss": _JWT_CLIENT["iss"], "expires_at": time.time() + 3600}
+        token = jwt.encode(payload, key=_JWT_CLIENT["key"], algorithm=_JWT_CLIENT["algorithm"])
+        middleware = VerifiedClientMiddleware(MagicMock())
+
+        with mock.patch.object(client_mod, "JWTClientAuthenticator", wraps=JWTClientAuthenticator) as cls:
+            for _ in range(3):
+                middleware(rf.get("/", HTTP_AUTHORIZATION=f"Bearer {token}"))
+            assert cls.call_count == 1
+
+            # Rebuild the authenticator when the clients in settings changed
+            settings.PAAS_SERVICE_JWT_CLIENTS = [{**_JWT_CLIENT, "key": "another_random_key"}]
+            request = rf.get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+            middleware(request)
+            assert cls.call_count == 2
+            assert request.client is None
+
+
+def _make_clients(count):
+    return [
+        {"iss": f"client-{i}", "key": get_random_string(length=12), "algorithm": "HS256", "role": "default"}
+        for i in range(count)
+    ]
+
+
+def _make_token(client, headers=None, **extra_payload):
+    payload = {"iss": client["iss"], "expires_at": time.time() + 3600, **extra_payload}
+    return jwt.encode(payload, key=client["key"], algorithm=client["algorithm"], headers=headers)
+
+
+class TestJWTClientAuthenticator:
+    def test_verify_by_issuer(self):
+        clients = _make_clients(20)
+        authenticator = JWTClientAuthenticator(clients)
+
+        with mock.patch.object(client_mod, "_prepare_key", wraps=client_mod._prepare_key) as prepare_key:
+            result = authenticator.authenticate(_make_token(clients[10], role="foo_role"))
+
+        assert result.client.name == "client-10"
+        assert result.client.role == "foo_role"
+        # Only the key of the issuer is used to verify the token
+        prepare_key.assert_called_once_with("HS256", clients[10]["key"])
+
+    def test_verify_by_kid(self):
+        clients = _make_clients(3)
+        clients[1]["kid"] = "key-1"
+        authenticator = JWTClientAuthenticator(clients)
+
+        with mock.patch.object(client_mod, "_prepare_key", wraps=client_mod._prepare_key) as prepare_key:
+            result = authenticator.authenticate(_make_token(clients[1], headers={"kid": "key-1"}))
+
+        assert result.client.name == "client-1"
+        prepare_key.assert_called_once_with("HS256", clients[1]["key"])
+
+    def test_kid_of_another_client(self):
+        clients = _make_clients(2)
+        clients[1]["kid"] = "key-1"
+        authenticator = JWTClientAuthenticator(clients)
+
+        # The issuer in payload still has to match the client found by kid
+        token = _make_token({**clients[0], "key": clients[1]["key"]}, headers={"kid": "key-1"})
+        with pytest.raises(AuthFailedError):
+            authenticator.authenticate(token)
+
+    def test_rotated_keys_of_same_issuer(self):
+        old_client, new_client = _make_clients(1) * 2
+        new_client = {**new_client, "key": get_random_string(length=12)}
+        authenticator = JWTClientAuthenticator([old_client, new_client])
+
+        assert authenticator.authenticate(_make_token(old_client)).client.name == "client-0"
+        assert authenticator.authenticate(_make_token(new_client)).client.name == "client-0"
+
+    @pytest.mark.parametrize(
+        "token",
+        [
+            jwt.encode({"iss": "unknown", "expires_at": time.time() + 3600}, key="foo", algorithm="HS256"),
+            jwt.encode({"expires_at": time.time() + 3600}, key="foo", algorithm="HS256"),
+            "not.a.token",
+        ],
+    )
+    def test_invalid_token(self, token):
+        authenticator = JWTClientAuthenticator(_make_clients(3))
+
+        with mock.patch.object(client_mod, "_prepare_key") as prepare_key, pytest.raises(AuthFailedError):
+            authenticator.authenticate(token)
+        prepare_key.assert_not_called()
+
+    def test_cache_rsa_key(self):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        public_pem = (
+            private_key.public_key()
+            .public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+            .decode()
+        )
+        client = {"iss": "rsa-client", "key": public_pem, "algorithm": "RS256"}
+        authenticator = JWTClientAuthenticator([client])
+        token = jwt.encode({"iss": "rsa-client", "expires_at": time.time() + 3600}, private_key, algorithm="RS256")
+
+        client_mod._prepare_key.cache_clear()
+        for _ in range(3):
+            assert authenticator.authenticate(token).client.name == "rsa-client"
+        assert client_mod._prepare_key.cache_info().misses == 1
@@ -20,6 +20,7 @@ class Migration(migrations.Migration):
                 ('data', blue_krill.models.fields.EncryptField(blank=True, help_text='without any explicit cipher type', null=True)),
                 ('data_fernet', blue_krill.models.fields.EncryptField(blank=True, null=True)),
                 ('data_sm4', blue_krill.models.fields.EncryptField(blank=True, null=True)),
+                ('data_lazy', blue_krill.models.fields.EncryptField(blank=True, null=True)),
             ],
         ),
     ]
@@ -26,3 +26,4 @@ class TestEncryptFieldModel(models.Model):
     data = EncryptField(help_text="without any explicit cipher type", null=True, blank=True)
     data_fernet = EncryptField(encrypt_cipher_type="FernetCipher", null=True, blank=True)
     data_sm4 = EncryptField(encrypt_cipher_type="SM4CTR", null=True, blank=True)
+    data_lazy = EncryptField(encrypt_cipher_type="FernetCipher", decrypt_lazily=True, null=True, blank=True)
@@ -15,7 +15,10 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+from unittest import mock
+
 import pytest
+from django.db import connection
 
 from blue_krill.models.fields import EncryptField
 from tests.models.apps.test_encrypt.models import TestEncryptFieldModel
@@ -97,3 +100,58 @@ class TestEncryptField:
         value = field.get_prep_value(value)
 
         assert field.from_db_value(value, None, None) == test_data, "Value should not be re-encrypted"
+
+
+class TestLazyEncryptField:
+    @pytest.fixture
+    def field(self):
+        return TestEncryptFieldModel._meta.get_field("data_lazy")
+
+    @pytest.fixture
+    def obj(self):
+        return TestEncryptFieldModel.objects.create(name="test_lazy", data_lazy="This is sensitive information")
+
+    @staticmethod
+    def get_raw_value(obj):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT data_lazy FROM test_encrypt_testencryptfieldmodel WHERE id = %s", [obj.id])
+            return cursor.fetchone()[0]
+
+    def test_decrypt_on_access(self, field, obj):
+        with mock.patch.object(field.handler, "decrypt", wraps=field.handler.decrypt) as decrypt:
+            objs = list(TestEncryptFieldModel.objects.all())
+            decrypt.assert_not_called()
+
+            assert objs[0].data_lazy == "This is sensitive information"
+            assert objs[0].data_lazy == "This is sensitive information"
+            decrypt.assert_called_once()
+
+    def test_deferred_field(self, obj):
+        obj_from_db = TestEncryptFieldModel.objects.only("name").get(id=obj.id)
+        assert obj_from_db.data_lazy == "This is sensitive information"
+
+    def test_none_value_handling(self):
+        obj = TestEncryptFieldModel.objects.create(name="test_none", data_lazy=None)
+        assert TestEncryptFieldModel.objects.get(id=obj.id).data_lazy is None
+
+    def test_save_without_access(self, field, obj):
+        raw_value = self.get_raw_value(obj)
+        obj_from_db = TestEncryptFieldModel.objects.get(id=obj.id)
+        obj_from_db.name = "updated"
+
+        with mock.patch.object(field.handler, "encrypt") as encrypt:
+            obj_from_db.save()
+        encrypt.assert_not_called()
+        assert self.get_raw_value(obj) == raw_value
+
+        # The updated value is encrypted again
+        obj_from_db.data_lazy = "updated information"
+        obj_from_db.save()
+        assert self.get_raw_value(obj) != raw_value
+        assert TestEncryptFieldModel.objects.get(id=obj.id).data_lazy == "updated information"
+
+    def test_decrypt_many(self, field, obj):
+        TestEncryptFieldModel.objects.create(name="test_none", data_lazy=None)
+
+        values = TestEncryptFieldModel.objects.order_by("id").values_list("data_lazy", flat=True)
+        assert field.decrypt_many(values) == ["This is sensitive information", None]
@@ -16,10 +16,12 @@
 # to the current version of the project delivered to anyone in the future.
 
 import unittest
+from unittest import mock
 
 from cryptography.fernet import Fernet
 from django.test.utils import override_settings
 
+from blue_krill.encrypt import handler as handler_mod
 from blue_krill.encrypt.handler import EncryptHandler
 from blue_krill.encrypt.legacy import legacy_decrypt, legacy_encrypt
 
@@ -47,6 +49,22 @@ class TestEncrypt:
         assert sm4ctr_handler.decrypt(fernet_handler.encrypt(text)) == text
         assert fernet_handler.decrypt(sm4ctr_handler.encrypt(text)) == text
 
+    def test_reuse_cipher(self):
+        secret_key = Fernet.generate_key()
+        with mock.patch.object(handler_mod, "Fernet", wraps=Fernet) as fernet_cls:
+            for _ in range(10):
+                encrypt_handler = EncryptHandler(encrypt_cipher_type="FernetCipher", secret_key=secret_key)
+                assert encrypt_handler.decrypt(encrypt_handler.encrypt("foo")) == "foo"
+
+        fernet_cls.assert_called_once_with(secret_key)
+
+    def test_decrypt_many(self):
+        encrypt_handler = EncryptHandler(encrypt_cipher_type="FernetCipher", secret_key=Fernet.generate_key())
+        texts = [random_string(10) for _ in range(5)]
+        encrypted_values = [encrypt_handler.encrypt(text) for text in texts]
+
+        assert encrypt_handler.decrypt_many([*encrypted_values, None, "plain"]) == [*texts, None, "plain"]
+
 
 class TestEncryptFromDjangoSetting:
     def test_fernetcipher_encrypt(self):
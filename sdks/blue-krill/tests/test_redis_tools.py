@@ -15,15 +15,25 @@
 # We undertake not to change the open source license (MIT license) applicable
 # to the current version of the project delivered to anyone in the future.
 
+import asyncio
+import json
 import os
 import random
 import time
 import uuid
+from unittest import mock
 
 import pytest
 import redis
-
-from blue_krill.redis_tools.messaging import StreamChannel, StreamChannelSubscriber
+import redis.asyncio
+
+from blue_krill.redis_tools.messaging import (
+    AsyncStreamChannelSubscriber,
+    RedisStreamChannel,
+    RedisStreamChannelSubscriber,
+    StreamChannel,
+    StreamChannelSubscriber,
+)
 from blue_krill.redis_tools.sentinel import SentinelBackend
 from tests.utils import generate_random_string
 
@@ -95,6 +105,87 @@ class TestMessageChannel:
         assert len(subscriber.get_history_events(last_event_id=7)) == 4
         channel.destroy()
 
+    def test_publish(self):
+        channel = StreamChannel(self.channel_id, self.redis_db)
+        channel.initialize()
+        assert channel.publish("msg", data={"foo": "bar"}) == 2
+
+        raw_event = self.redis_db.lrange(channel.keys.history, -1, -1)[0]
+        assert raw_event == json.dumps({"id": 2, "event": "msg", "data": {"foo": "bar"}}).encode()
+        channel.destroy()
+
+    def test_publish_many(self):
+        channel = StreamChannel(self.channel_id, self.redis_db)
+        channel.initialize()
+        subscriber = StreamChannelSubscriber(self.channel_id, self.redis_db)
+
+        assert channel.publish_msgs([]) == []
+        assert channel.publish_msgs("Hello, I am %s." % (i + 1) for i in range(2500)) == list(range(2, 2502))
+        assert channel.publish_msg(message="bye") == 2502
+
+        events = subscriber.get_history_events()
+        assert [event["id"] for event in events] == list(range(2, 2503))
+        assert events[-1] == {"id": 2502, "event": "msg", "data": "bye"}
+
+        # Every event is published to the subscribers one by one
+        received = [subscriber.get_event(block=True) for _ in range(2501)]
+        assert [event["id"] for event in received] == list(range(2, 2503))
+        subscriber.close()
+        channel.destroy()
+
+    def test_publish_in_one_round_trip(self):
+        channel = StreamChannel(self.channel_id, self.redis_db)
+        channel.initialize()
+
+        with mock.patch.object(self.redis_db, "execute_command", wraps=self.redis_db.execute_command) as execute:
+            channel.publish_msgs(["foo", "bar"])
+        assert execute.call_count == 1
+        channel.destroy()
+
+    def test_history_in_pages(self):
+        channel = StreamChannel(self.channel_id, self.redis_db)
+        channel.initialize()
+        channel.publish_msgs(range(25))
+        subscriber = StreamChannelSubscriber(self.channel_id, self.redis_db)
+        assert [event["id"] for event in subscriber.get_history_events(last_event_id=20)] == list(range(21, 27))
+
+        with mock.patch.object(self.redis_db, "execute_command", wraps=self.redis_db.execute_command) as execute:
+            events = subscriber.iter_history_events(last_event_id=3, page_size=10)
+            # The events are yielded once the first page arrives
+            assert next(events)["id"] == 4
+            assert execute.call_count == 1
+            assert [event["id"] for event in events] == list(range(5, 27))
+        assert execute.call_count == 3
+        channel.destroy()
+
+    def test_max_history(self):
+        channel = StreamChannel(self.channel_id, self.redis_db, max_history=10)
+        channel.initialize()
+        assert channel.publish_msgs(range(25))[-1] == 26
+        assert self.redis_db.llen(channel.keys.history) == 10
+
+        subscriber = StreamChannelSubscriber(self.channel_id, self.redis_db)
+        # The trimmed events are skipped
+        assert [event["id"] for event in subscriber.get_history_events()] == list(range(17, 27))
+        assert [event["id"] for event in subscriber.get_history_events(last_event_id=20)] == list(range(21, 27))
+        assert [event["id"] for event in subscriber.iter_history_events(page_size=3)] == list(range(17, 27))
+        channel.destroy()
+
+    def test_async_history_in_pages(self):
+        channel = StreamChannel(self.channel_id, self.redis_db, max_history=10)
+        channel.initialize()
+        channel.publish_msgs(range(25))
+
+        async def read():
+            async_redis_db = redis.asyncio.Redis.from_url(os.environ["REDIS_URL"])
+            subscriber = AsyncStreamChannelSubscriber(self.channel_id, async_redis_db)
+            events = [event async for event in subscriber.iter_history_events(last_event_id=12, page_size=4)]
+            await async_redis_db.aclose()
+            return events
+
+        assert [event["id"] for event in asyncio.run(read())] == list(range(17, 27))
+        channel.destroy()
+
     def test_consumer_concurrent(self):
         import threading
 
@@ -172,6 +263,60 @@ class TestMessageChannel:
         for t in [t1, t2]:
             t.join()
 
+    @pytest.mark.parametrize("last_event_id", [0, 2])
+    def test_consumer_blocking(self, last_event_id):
+        import threading
+
+        batch = 4
+        events = []
+
+        def consumer():
+            subscriber = StreamChannelSubscriber(self.channel_id, self.redis_db)
+            events.extend(subscriber.get_events(last_event_id=last_event_id, block_timeout=0.5))
+
+        t1 = threading.Thread(target=self.producer, args=(batch, 0.1))
+        t2 = threading.Thread(target=consumer)
+        t2.start()
+        time.sleep(0.2)
+        t1.start()
+        for t in [t1, t2]:
+            t.join()
+
+        expected = list(range(2, batch + 2))
+        assert [event["id"] for event in events] == [i for i in expected if i > last_event_id]
+
+    def test_async_consumer(self):
+        batch = 4
+
+        async def consume():
+            async_redis_db = redis.asyncio.Redis.from_url(os.environ["REDIS_URL"])
+            async with AsyncStreamChannelSubscriber(self.channel_id, async_redis_db) as subscriber:
+                events = [event async for event in subscriber.get_events(block_timeout=0.5)]
+            await async_redis_db.aclose()
+            return events
+
+        async def main():
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.2)
+            await asyncio.to_thread(self.producer, batch, 0.1)
+            return await task
+
+        events = asyncio.run(main())
+        assert [event["data"] for event in events] == ["Hello, I am %s." % (i + 1) for i in range(batch)]
+
+    def test_async_consumer_start_late(self):
+        batch = 4
+        self.producer(batch, wait=0)
+
+        async def consume():
+            async_redis_db = redis.asyncio.Redis.from_url(os.environ["REDIS_URL"])
+            async with AsyncStreamChannelSubscriber(self.channel_id, async_redis_db) as subscriber:
+                events = [event async for event in subscriber.get_events(last_event_id=2)]
+            await async_redis_db.aclose()
+            return events
+
+        assert len(asyncio.run(consume())) == batch - 1
+
     def test_consumer_start_too_early(self):
         import threading
 
@@ -191,6 +336,105 @@ class TestMessageChannel:
             t.join()
 
 
+class TestRedisStreamChannel:
+    @pytest.fixture(autouse=True)
+    def setUp(self, redis_db, channel_id):
+        self.redis_db = redis_db
+        self.channel_id = channel_id
+        yield
+        RedisStreamChannel(self.channel_id, self.redis_db).destroy()
+
+    def producer(self, batch=4, wait=0.1):
+        channel = RedisStreamChannel(self.channel_id, self.redis_db)
+        channel.initialize()
+        for i in range(batch):
+            channel.publish_msg(message="Hello, I am %s." % (i + 1))
+            time.sleep(wait)
+        channel.close()
+
+    def test_normal(self):
+        channel = RedisStreamChannel(self.channel_id, self.redis_db)
+        channel.initialize()
+        assert channel.publish_msgs("Hello, I am %s." % (i + 1) for i in range(10)) == list(range(2, 12))
+        assert channel.publish("msg", data={"foo": "bar"}) == 12
+
+        subscriber = RedisStreamChannelSubscriber(self.channel_id, self.redis_db)
+        events = subscriber.get_history_events()
+        assert [event["id"] for event in events] == list(range(2, 13))
+        assert events[0] == {"id": 2, "event": "msg", "data": "Hello, I am 1."}
+        assert events[-1] == {"id": 12, "event": "msg", "data": {"foo": "bar"}}
+        assert len(subscriber.get_history_events(last_event_id=7)) == 5
+        assert [event["id"] for event in subscriber.iter_history_events(last_event_id=3, page_size=4)] == list(
+            range(4, 13)
+        )
+
+    def test_max_history(self):
+        channel = RedisStreamChannel(self.channel_id, self.redis_db, max_history=100)
+        channel.initialize()
+        channel.publish_msgs(range(2500))
+
+        # The stream is trimmed by whole nodes, which hold 100 entries by default
+        assert 100 <= self.redis_db.xlen(channel.keys.stream) < 200
+        ids = [
+            event["id"] for event in RedisStreamChannelSubscriber(self.channel_id, self.redis_db).get_history_events()
+        ]
+        assert ids[-1] == 2501
+        assert ids == list(range(ids[0], 2502))
+
+    def test_get_event(self):
+        channel = RedisStreamChannel(self.channel_id, self.redis_db)
+        channel.initialize()
+        channel.publish_msg(message="foo")
+
+        # Only the events published after subscribing are got
+        subscriber = RedisStreamChannelSubscriber(self.channel_id, self.redis_db)
+        assert subscriber.get_event() is None
+        channel.publish_msg(message="bar")
+        assert subscriber.get_event() == {"id": 3, "event": "msg", "data": "bar"}
+        assert subscriber.get_event(timeout=0.1) is None
+
+        channel.close()
+        assert subscriber.get_event(block=True)["event"] == "close"
+        assert subscriber.is_closed()
+
+    @pytest.mark.parametrize("block_timeout", [None, 0.5])
+    def test_consumer_concurrent(self, block_timeout):
+        import threading
+
+        batch = 4
+        events = []
+
+        def consumer():
+            subscriber = RedisStreamChannelSubscriber(self.channel_id, self.redis_db)
+            events.extend(subscriber.get_events(block_timeout=block_timeout))
+
+        t1 = threading.Thread(target=self.producer, args=(batch,))
+        t2 = threading.Thread(target=consumer)
+        t2.start()
+        time.sleep(0.2)
+        t1.start()
+        for t in [t1, t2]:
+            t.join()
+
+        assert [event["data"] for event in events] == ["Hello, I am %s." % (i + 1) for i in range(batch)]
+
+    def test_consumer_resume(self):
+        channel = RedisStreamChannel(self.channel_id, self.redis_db)
+        channel.initialize()
+        channel.publish_msgs(["foo", "bar"])
+
+        subscriber = RedisStreamChannelSubscriber(self.channel_id, self.redis_db)
+        events = subscriber.get_events(block_timeout=0.1)
+        assert next(events)["data"] == "foo"
+        subscriber.close()
+
+        # The events published while the consumer is disconnected are not lost
+        channel.publish_msg(message="baz")
+        channel.close()
+        subscriber = RedisStreamChannelSubscriber(self.channel_id, self.redis_db)
+        assert [event["data"] for event in subscriber.get_events(last_event_id=2)] == ["bar", "baz"]
+
+
 class TestSentinel:
     @pytest.fixture
     def sentinel_hosts(self):
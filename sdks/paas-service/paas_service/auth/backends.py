@@ -17,7 +17,8 @@
 
 import logging
 import time
-from typing import Dict, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 import jwt
 from django.conf import settings
@@ -66,8 +67,18 @@ class AuthResult:
         self.extra_payload = extra_payload
 
 
+@lru_cache(maxsize=128)
+def _prepare_key(algorithm: str, key: str) -> Any:
+    """Load the key material of a client, such as parsing the PEM of a RSA public key, only once"""
+    return jwt.get_algorithm_by_name(algorithm).prepare_key(key)
+
+
 class JWTClientAuthenticator:
-    """Authenticator using JWT clients"""
+    """Authenticator using JWT clients
+
+    The client is identified by the unverified `kid` header or `iss` claim of the token, then the token is
+    verified against only the keys of that client, instead of trying the keys of all clients one by one.
+    """
 
     def __init__(self):
         try:
@@ -75,6 +86,14 @@ class JWTClientAuthenticator:
         except AttributeError:
             raise ImproperlyConfigured("PAAS_SERVICE_JWT_CLIENTS is not configured")
 
+        self._clients_by_kid: Dict[str, Dict] = {}
+        self._clients_by_iss: Dict[str, List[Dict]] = {}
+        for client in self.jwt_clients:
+            if client.get("kid"):
+                self._clients_by_kid[client["kid"]] = client
+            # Multiple clients may share an issuer, e.g. when the key is being rotated
+            self._clients_by_iss.setdefault(client.get("iss"), []).append(client)
+
     def authenticate(self, token: str) -> AuthResult:
         """Authenticate a given token
 
@@ -94,9 +113,11 @@ class JWTClientAuthenticator:
 
         :raises: ValueError when token is invalid
         """
-        for client in self.jwt_clients:
+        for client in self._get_candidate_clients(token):
             try:
-                payload = jwt.decode(token, client["key"], algorithms=[client["algorithm"]])
+                payload = jwt.decode(
+                    token, _prepare_key(client["algorithm"], client["key"]), algorithms=[client["algorithm"]]
+                )
             except DecodeError:
                 logger.debug(f"Unable to decode token using {client['iss']}'s secret")
                 continue
@@ -110,6 +131,24 @@ class JWTClientAuthenticator:
             return payload, client_ins
         raise ValueError("token is not a valid JWT token")
 
+    def _get_candidate_clients(self, token: str) -> List[Dict]:
+        """Get the clients which may have issued the token, by the unverified header and payload"""
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            unverified_payload = jwt.decode(token, options={"verify_signature": False})
+        except DecodeError:
+            logger.debug("Unable to decode the header or payload of token")
+            return []
+
+        if kid and kid in self._clients_by_kid:
+            return [self._clients_by_kid[kid]]
+
+        # A valid payload must contain the issuer of the client, the clients of other issuers never match
+        iss = unverified_payload.get("iss")
+        if not isinstance(iss, str):
+            return []
+        return self._clients_by_iss.get(iss, [])
+
     @staticmethod
     def _validate_payload(client: Dict, payload: Dict) -> bool:
         """Validates given JWT payload, a valid payload must contain at least 2 fields:
@@ -132,11 +171,24 @@ class JWTClientAuthenticator:
         return True
 
 
+_jwt_client_authenticator: Optional[JWTClientAuthenticator] = None
+
+
+def get_jwt_client_authenticator() -> JWTClientAuthenticator:
+    """Get the authenticator shared in current process, rebuild it only when the clients in settings changed"""
+    global _jwt_client_authenticator
+
+    authenticator = _jwt_client_authenticator
+    if authenticator is None or authenticator.jwt_clients is not getattr(settings, "PAAS_SERVICE_JWT_CLIENTS", None):
+        authenticator = _jwt_client_authenticator = JWTClientAuthenticator()
+    return authenticator
+
+
 class InstanceAuthBackend:
     TOKEN_KEY = "token"
 
     def __init__(self):
-        self.authenticators = [JWTClientAuthenticator()]
+        self.authenticators = [get_jwt_client_authenticator()]
 
     def get_token(self, request: WSGIRequest):
         return request.GET.get(self.TOKEN_KEY, None)
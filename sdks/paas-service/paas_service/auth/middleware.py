@@ -18,7 +18,7 @@
 import logging
 from typing import Optional
 
-from .backends import AuthFailedError, JWTClientAuthenticator
+from .backends import AuthFailedError, get_jwt_client_authenticator
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +51,7 @@ class VerifiedClientMiddleware(object):
         request.client = None
         if token:
             try:
-                ret = JWTClientAuthenticator().authenticate(token=token)
+                ret = get_jwt_client_authenticator().authenticate(token=token)
                 request.client = ret.client
             except AuthFailedError:
                 pass
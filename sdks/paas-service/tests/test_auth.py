@@ -16,11 +16,19 @@
 # to the current version of the project delivered to anyone in the future.
 
 import time
+from unittest import mock
 
 import jwt
 import pytest
 from django.test.utils import override_settings
-from paas_service.auth.backends import InstanceAuthBackend, InstanceAuthFailed
+from paas_service.auth import backends
+from paas_service.auth.backends import (
+    AuthFailedError,
+    InstanceAuthBackend,
+    InstanceAuthFailed,
+    JWTClientAuthenticator,
+    get_jwt_client_authenticator,
+)
 
 pytestmark = pytest.mark.django_db
 PAAS_SERVICE_JWT_CLIENTS = [{"iss": "c1", "key": "foobar", "algorithm": "HS256"}]
@@ -62,3 +70,35 @@ class TestInstanceAuthBackend:
 
         invoked_instance = InstanceAuthBackend().invoke(request)
         assert invoked_instance.uuid == instance.uuid
+
+
+MULTIPLE_JWT_CLIENTS = [{"iss": f"c{i}", "key": f"foobar-{i}", "algorithm": "HS256"} for i in range(10)]
+
+
+class TestJWTClientAuthenticator:
+    @override_settings(PAAS_SERVICE_JWT_CLIENTS=MULTIPLE_JWT_CLIENTS)
+    def test_verify_by_issuer(self):
+        token = jwt.encode({"iss": "c5", "expires_at": time.time() + 3600}, key="foobar-5", algorithm="HS256")
+
+        with mock.patch.object(backends, "_prepare_key", wraps=backends._prepare_key) as prepare_key:
+            result = JWTClientAuthenticator().authenticate(token)
+
+        assert result.client.name == "c5"
+        prepare_key.assert_called_once_with("HS256", "foobar-5")
+
+    @override_settings(PAAS_SERVICE_JWT_CLIENTS=MULTIPLE_JWT_CLIENTS)
+    def test_unknown_issuer(self):
+        token = jwt.encode({"iss": "c100", "expires_at": time.time() + 3600}, key="foobar-5", algorithm="HS256")
+
+        with mock.patch.object(backends, "_prepare_key") as prepare_key, pytest.raises(AuthFailedError):
+            JWTClientAuthenticator().authenticate(token)
+        prepare_key.assert_not_called()
+
+    def test_shared_authenticator(self):
+        with override_settings(PAAS_SERVICE_JWT_CLIENTS=PAAS_SERVICE_JWT_CLIENTS):
+            authenticator = get_jwt_client_authenticator()
+            assert get_jwt_client_authenticator() is authenticator
+
+        with override_settings(PAAS_SERVICE_JWT_CLIENTS=MULTIPLE_JWT_CLIENTS):
+            assert get_jwt_client_authenticator() is not authenticator
+            assert get_jwt_client_authenticator().jwt_clients is MULTIPLE_JWT_CLIENTS